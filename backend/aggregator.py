@@ -9,13 +9,26 @@ import aiohttp
 import sqlite3
 import hashlib
 import re
+import time
+import uuid
 from datetime import datetime
-from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from abc import ABC, abstractmethod
 import logging
 from urllib.parse import urljoin
 
+from metrics import record_sync
+from profiler import connection_factory
+import changefeed
+import event_calendar
+import funnel
+import geo
+import sync_daemon
+import sync_history
+from sync_history import SourceRun
+
 try:
     import feedparser
     FEEDPARSER_AVAILABLE = True
@@ -32,7 +45,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger('EventAggregator')
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     id: Optional[int] = None
     external_id: str = ""
@@ -59,13 +72,38 @@ class Event:
     updated_at: str = ""
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return dict(zip(EVENT_FIELDS, _event_values(self)))
+    
+    def to_tuple(self) -> tuple:
+        return _event_values(self)
+    
+    @classmethod
+    def from_row(cls, row) -> 'Event':
+        """Tworzy Event z wiersza w kolejności EVENT_FIELDS (SELECT {EVENT_COLUMNS})"""
+        return cls(*row)
     
     def calculate_hash(self) -> str:
         content = f"{self.name}{self.date_start}{self.location}{self.organizer}"
         return hashlib.md5(content.encode()).hexdigest()
 
 
+# Stała kolejność kolumn - mapowanie wiersz <-> Event bez asdict() i bez kluczy
+EVENT_FIELDS = tuple(f.name for f in fields(Event))
+EVENT_COLUMNS = ', '.join(EVENT_FIELDS)
+_event_values = attrgetter(*EVENT_FIELDS)
+
+
+def _event_row_factory(cursor, row) -> Event:
+    return Event(*row)
+
+
+# Pola odświeżane przy ponownym znalezieniu wydarzenia (status, notatki i scoring zostają)
+SCRAPED_FIELDS = ('external_id', 'organizer_contact', 'date_end', 'city', 'country', 'category',
+                  'subcategory', 'source', 'source_url', 'estimated_audience')
+# Pola edytowalne w API (EventUpdate) - synchronizacja tylko uzupełnia puste, nigdy nie nadpisuje
+FILL_ONLY_FIELDS = ('description', 'organizer_email', 'organizer_phone')
+
+
 class Database:
     def __init__(self, db_path: str = "streamflow.db"):
         self.db_path = db_path
@@ -73,7 +111,7 @@ class Database:
         self.init_db()
     
     def init_db(self):
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, factory=connection_factory())
         self.conn.row_factory = sqlite3.Row
         self.conn.executescript('''
             CREATE TABLE IF NOT EXISTS events (
@@ -92,12 +130,57 @@ class Database:
                 follow_up_date TEXT, created_at TEXT, updated_at TEXT,
                 FOREIGN KEY (event_id) REFERENCES events(id)
             );
+            CREATE TABLE IF NOT EXISTS offers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, number TEXT, lead_id INTEGER, event_id INTEGER,
+                package TEXT, base_price REAL, additional_services TEXT, total_price REAL,
+                valid_until TEXT, status TEXT DEFAULT 'draft', pdf_path TEXT,
+                created_at TEXT, sent_at TEXT
+            );
             CREATE INDEX IF NOT EXISTS idx_events_status ON events(status);
             CREATE INDEX IF NOT EXISTS idx_events_date ON events(date_start);
+            CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
+            CREATE INDEX IF NOT EXISTS idx_events_updated ON events(updated_at);
+            CREATE INDEX IF NOT EXISTS idx_leads_updated ON leads(updated_at);
+            CREATE INDEX IF NOT EXISTS idx_leads_follow_up ON leads(follow_up_date, status);
         ''')
+        self.conn.executescript(sync_history.SCHEMA)
+        self.conn.executescript(sync_daemon.SCHEMA)
+        self.conn.executescript(changefeed.SCHEMA)
+        changefeed.backfill(self.conn)
+        self._migrate()
         self.conn.commit()
         logger.info("Baza danych zainicjalizowana")
     
+    def _migrate(self):
+        offer_columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(offers)")}
+        if 'number' not in offer_columns:
+            self.conn.execute("ALTER TABLE offers ADD COLUMN number TEXT")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_offers_number ON offers(number)")
+        event_calendar.add_date_columns(self.conn)
+        geo.install(self.conn)
+        funnel.install(self.conn)
+    
+    _INSERT_EVENT = '''
+        INSERT {conflict} INTO events (external_id, hash, name, description, organizer,
+            organizer_contact, organizer_email, organizer_phone, date_start, date_end, location,
+            city, country, category, subcategory, source, source_url, potential_score,
+            estimated_audience, status, discovered_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new', ?, ?)
+    '''
+    
+    @staticmethod
+    def _insert_params(event: Event, event_hash: str, now: str) -> tuple:
+        return (event.external_id, event_hash, event.name, event.description, event.organizer,
+                event.organizer_contact, event.organizer_email, event.organizer_phone,
+                event.date_start, event.date_end, event.location, event.city, event.country,
+                event.category, event.subcategory, event.source, event.source_url,
+                event.potential_score, event.estimated_audience, now, now)
+    
+    def _insert_event(self, event: Event, event_hash: str, now: str) -> int:
+        cursor = self.conn.execute(self._INSERT_EVENT.format(conflict=''),
+                                   self._insert_params(event, event_hash, now))
+        return cursor.lastrowid
+    
     def save_event(self, event: Event) -> int:
         event_hash = event.calculate_hash()
         now = datetime.now().isoformat()
@@ -105,22 +188,49 @@ class Database:
         existing = cursor.fetchone()
         if existing:
             return existing['id']
-        cursor = self.conn.execute('''
-            INSERT INTO events (external_id, hash, name, description, organizer, organizer_contact,
-                organizer_email, organizer_phone, date_start, date_end, location, city, country,
-                category, subcategory, source, source_url, potential_score, estimated_audience,
-                status, discovered_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'new', ?, ?)
-        ''', (event.external_id, event_hash, event.name, event.description, event.organizer,
-              event.organizer_contact, event.organizer_email, event.organizer_phone,
-              event.date_start, event.date_end, event.location, event.city, event.country,
-              event.category, event.subcategory, event.source, event.source_url,
-              event.potential_score, event.estimated_audience, now, now))
+        event_id = self._insert_event(event, event_hash, now)
         self.conn.commit()
-        return cursor.lastrowid
+        return event_id
+    
+    def save_events(self, events: Iterable[Event]) -> int:
+        """Zapis wsadowy w jednej transakcji (duplikaty pomijane); zwraca liczbę nowych"""
+        now = datetime.now().isoformat()
+        # rowcount (nie total_changes) - bez wierszy dopisanych przez triggery changefeed
+        cursor = self.conn.executemany(self._INSERT_EVENT.format(conflict='OR IGNORE'),
+                                       (self._insert_params(e, e.calculate_hash(), now) for e in events))
+        self.conn.commit()
+        funnel.refresh(self.conn)
+        return cursor.rowcount
+    
+    def upsert_event(self, event: Event, commit: bool = True) -> Tuple[int, str]:
+        """Zapisuje wydarzenie; zwraca (id, 'new' | 'updated' | 'unchanged')"""
+        event_hash = event.calculate_hash()
+        now = datetime.now().isoformat()
+        existing = self.conn.execute(
+            f"SELECT id, {', '.join(SCRAPED_FIELDS + FILL_ONLY_FIELDS)} FROM events WHERE hash = ?", (event_hash,)
+        ).fetchone()
+        if existing is None:
+            event_id, outcome = self._insert_event(event, event_hash, now), 'new'
+        else:
+            event_id = existing[0]
+            current = dict(zip(SCRAPED_FIELDS + FILL_ONLY_FIELDS, tuple(existing)[1:]))
+            changes = {name: getattr(event, name) for name in SCRAPED_FIELDS
+                       if getattr(event, name) != current[name]}
+            changes.update({name: getattr(event, name) for name in FILL_ONLY_FIELDS
+                            if getattr(event, name) and not current[name]})
+            if not changes:
+                return event_id, 'unchanged'
+            assignments = ', '.join(f"{name} = ?" for name in changes)
+            self.conn.execute(f"UPDATE events SET {assignments}, updated_at = ? WHERE id = ?",
+                              (*changes.values(), now, event_id))
+            outcome = 'updated'
+        if commit:
+            self.conn.commit()
+        return event_id, outcome
     
     def get_events(self, status: str = None, limit: int = 100) -> List[Dict]:
-        query = "SELECT * FROM events"
+        # Jawne kolumny - bez generowanych start_year/start_month/start_week
+        query = f"SELECT {EVENT_COLUMNS}, hash FROM events"
         params = []
         if status:
             query += " WHERE status = ?"
@@ -130,6 +240,19 @@ class Database:
         cursor = self.conn.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
     
+    def get_event_records(self, status: str = None, limit: int = 100) -> List[Event]:
+        """Jak get_events, ale zwraca lekkie obiekty Event zamiast słowników"""
+        query = f"SELECT {EVENT_COLUMNS} FROM events"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY date_start ASC LIMIT ?"
+        params.append(limit)
+        cursor = self.conn.cursor()
+        cursor.row_factory = _event_row_factory
+        return cursor.execute(query, params).fetchall()
+    
     def get_stats(self) -> Dict:
         cursor = self.conn.execute('''
             SELECT COUNT(*) as total,
@@ -146,9 +269,13 @@ class BaseScraper(ABC):
         self.name = name
         self.base_url = base_url
         self.session = None
+        self.http_seconds = 0.0
+        self.bytes_downloaded = 0
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession(headers={'User-Agent': 'StreamFlow/1.0'})
+        self.http_seconds = 0.0
+        self.bytes_downloaded = 0
         return self
     
     async def __aexit__(self, *args):
@@ -160,12 +287,17 @@ class BaseScraper(ABC):
         pass
     
     async def fetch(self, url: str) -> str:
+        start = time.perf_counter()
         try:
             async with self.session.get(url, timeout=30) as response:
-                return await response.text()
+                body = await response.read()
+                self.bytes_downloaded += len(body)
+                return body.decode(response.get_encoding(), errors='replace')
         except Exception as e:
             logger.error(f"Błąd pobierania {url}: {e}")
             return ""
+        finally:
+            self.http_seconds += time.perf_counter() - start
 
 
 class RunmageddonScraper(BaseScraper):
@@ -259,19 +391,50 @@ class EventAggregator:
         self.register_scraper(GoOutScraper())
         self.register_scraper(MTPScraper())
     
-    async def sync_all(self) -> Dict[str, int]:
-        results = {'total_found': 0, 'sources_synced': 0}
+    async def sync_source(self, scraper: BaseScraper, run_id: str) -> SourceRun:
+        """Synchronizuje jedno źródło i zapisuje przebieg w sync_runs"""
+        run = SourceRun(run_id=run_id, source=scraper.name, started_at=datetime.now().isoformat())
+        start = time.perf_counter()
+        try:
+            async with scraper:
+                scrape_start = time.perf_counter()
+                events = await scraper.scrape()
+                run.http_seconds = scraper.http_seconds
+                run.bytes_downloaded = scraper.bytes_downloaded
+                run.parse_seconds = max(0.0, time.perf_counter() - scrape_start - scraper.http_seconds)
+            run.found = len(events)
+            write_start = time.perf_counter()
+            for event in events:
+                try:
+                    _, outcome = self.db.upsert_event(event, commit=False)
+                    setattr(run, outcome, getattr(run, outcome) + 1)
+                except Exception as e:
+                    run.failed += 1
+                    logger.error(f"Błąd zapisu {scraper.name}/{event.name}: {e}")
+            self.db.conn.commit()
+            funnel.refresh(self.db.conn)
+            run.write_seconds = time.perf_counter() - write_start
+            logger.info(f"{scraper.name}: {len(events)} wydarzeń")
+        except Exception as e:
+            run.status = 'error'
+            run.error = str(e)
+            logger.error(f"Błąd {scraper.name}: {e}")
+        run.total_seconds = time.perf_counter() - start
+        run.finished_at = datetime.now().isoformat()
+        record_sync(scraper.name, run.total_seconds, run.found, ok=run.status == 'ok')
+        sync_history.record_run(self.db.conn, run)
+        return run
+    
+    async def sync_all(self) -> Dict[str, Any]:
+        results = {'run_id': uuid.uuid4().hex[:12], 'total_found': 0, 'sources_synced': 0,
+                   'new_events': 0, 'updated_events': 0}
         for scraper in self.scrapers:
-            try:
-                async with scraper:
-                    events = await scraper.scrape()
-                    for event in events:
-                        self.db.save_event(event)
-                        results['total_found'] += 1
-                    results['sources_synced'] += 1
-                    logger.info(f"{scraper.name}: {len(events)} wydarzeń")
-            except Exception as e:
-                logger.error(f"Błąd {scraper.name}: {e}")
+            run = await self.sync_source(scraper, results['run_id'])
+            if run.status == 'ok':
+                results['total_found'] += run.found
+                results['new_events'] += run.new
+                results['updated_events'] += run.updated
+                results['sources_synced'] += 1
         return results
 
 
@@ -280,8 +443,20 @@ async def main():
     parser = argparse.ArgumentParser(description='StreamFlow Event Aggregator')
     parser.add_argument('--init-db', action='store_true', help='Inicjalizuj bazę')
     parser.add_argument('--sync', action='store_true', help='Synchronizuj źródła')
+    parser.add_argument('--daemon', action='store_true', help='Synchronizuj cyklicznie (interwał per źródło)')
+    parser.add_argument('--intervals', default='', help='Nadpisz interwały demona, np. HYROX.com=900,MTP.pl=7200')
     parser.add_argument('--stats', action='store_true', help='Statystyki')
     parser.add_argument('--list', action='store_true', help='Lista wydarzeń')
+    parser.add_argument('--rescore', action='store_true', help='Przelicz potential_score wszystkich wydarzeń')
+    parser.add_argument('--generate', type=int, metavar='N',
+                        help='Wygeneruj N syntetycznych wydarzeń z leadami i ofertami')
+    parser.add_argument('--seed', type=int, default=42, help='Ziarno generatora (--generate)')
+    parser.add_argument('--archive', action='store_true',
+                        help='Przenieś minione wydarzenia (z leadami i ofertami) do archiwum')
+    parser.add_argument('--retention-days', type=int, default=180,
+                        help='Horyzont retencji dla --archive (dni po date_start)')
+    parser.add_argument('--snapshot', metavar='DIR', help='Zapisz events, leads i offers do plików kolumnowych w DIR')
+    parser.add_argument('--snapshot-format', choices=['parquet', 'arrow'], default='parquet', help='Format --snapshot')
     args = parser.parse_args()
     
     db = Database()
@@ -293,15 +468,50 @@ async def main():
         results = await aggregator.sync_all()
         print(f"Znaleziono: {results['total_found']} wydarzeń z {results['sources_synced']} źródeł")
     
+    if args.daemon:
+        import signal
+        scheduler = sync_daemon.SyncScheduler(aggregator, intervals=sync_daemon.parse_intervals(args.intervals))
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        print("Demon synchronizacji (Ctrl+C kończy)...")
+        await scheduler.run(stop)
+    
+    if args.generate:
+        from datagen import generate
+        results = generate(db.conn, args.generate, seed=args.seed)
+        print(f"Wygenerowano: {results['events']} wydarzeń, {results['leads']} leadów, "
+              f"{results['offers']} ofert ({results['rows_per_second']} wierszy/s zapisu, "
+              f"łącznie {results['duration_seconds']}s)")
+    
+    if args.rescore:
+        from scoring import rescore_events
+        results = rescore_events(db.conn)
+        print(f"Rescoring: {results['updated']} zmienionych z {results['scanned']} wydarzeń "
+              f"({results['duration_seconds']}s)")
+    
+    if args.archive:
+        from archive import archive_events
+        results = archive_events(db.conn, retention_days=args.retention_days)
+        print(f"Archiwum: {results['events']} wydarzeń, {results['leads']} leadów, {results['offers']} ofert "
+              f"sprzed {results['before']} ({results['batches']} paczek, {results['duration_seconds']}s)")
+    
+    if args.snapshot:
+        from snapshot import export_snapshot
+        results = export_snapshot(db.conn, args.snapshot, fmt=args.snapshot_format)
+        for table, info in results['tables'].items():
+            print(f"Snapshot: {info['path']} ({info['rows']} wierszy, {info['bytes'] / 1024:.0f} KB)")
+    
     if args.stats:
         stats = db.get_stats()
         print(f"\n=== STATYSTYKI ===\nWszystkie: {stats['total']}\nNowe: {stats['new']}\nWygrane: {stats['won']}")
     
     if args.list:
-        events = db.get_events(limit=20)
+        events = db.get_event_records(limit=20)
         print("\n=== WYDARZENIA ===")
         for e in events:
-            print(f"[{e['potential_score']}★] {e['name']} | {e['date_start']} | {e['location']}")
+            print(f"[{e.potential_score}★] {e.name} | {e.date_start} | {e.location}")
 
 
 if __name__ == "__main__":
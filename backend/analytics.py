@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Analityka pipeline'u
+Agregaty liczone w bazie (GROUP BY) zamiast ładowania wszystkich leadów do Pythona.
+Zapytania przenośne - te same funkcje działają na połączeniu DuckDB (olap.py)
+"""
+
+import sqlite3
+from typing import Dict, List, Any
+
+from utils import LeadStatus, calculate_conversion_rate
+
+
+# Dozwolone wymiary podziału -> wyrażenie SQL (whitelist, nigdy z danych użytkownika)
+BREAKDOWN_DIMENSIONS = {
+    "package": "l.package",
+    "category": "e.category",
+    "source": "e.source",
+}
+
+_PIPELINE_QUERY = '''
+    SELECT COALESCE(status, 'new') AS status, COALESCE(SUM(value), 0) AS value
+    FROM leads GROUP BY COALESCE(status, 'new')
+'''
+
+_CONVERSION_QUERY = '''
+    SELECT COUNT(*) AS total,
+        COALESCE(SUM(CASE WHEN status = 'won' THEN 1 ELSE 0 END), 0) AS won,
+        COALESCE(SUM(CASE WHEN status = 'lost' THEN 1 ELSE 0 END), 0) AS lost
+    FROM leads
+'''
+
+_BREAKDOWN_QUERY = '''
+    SELECT {key} AS key, COUNT(*) AS leads,
+        COALESCE(SUM(CASE WHEN l.status = 'won' THEN 1 ELSE 0 END), 0) AS won,
+        COALESCE(SUM(l.value), 0) AS value,
+        COALESCE(SUM(CASE WHEN l.status = 'won' THEN l.value ELSE 0 END), 0) AS won_value
+    FROM leads l LEFT JOIN events e ON e.id = l.event_id
+    GROUP BY {key} ORDER BY value DESC, leads DESC, key NULLS FIRST
+'''
+
+
+def pipeline_value(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Wartość pipeline'u wg statusu (odpowiednik calculate_pipeline_value)"""
+    pipeline = {status.value: 0.0 for status in LeadStatus}
+    pipeline['total'] = 0.0
+    for status, value in conn.execute(_PIPELINE_QUERY).fetchall():
+        if status in pipeline:
+            pipeline[status] += value
+        pipeline['total'] += value
+    return pipeline
+
+
+def conversion(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Globalny współczynnik konwersji leadów"""
+    total, won, lost = conn.execute(_CONVERSION_QUERY).fetchone()
+    return {
+        "total_leads": total,
+        "won": won,
+        "lost": lost,
+        "conversion_rate": calculate_conversion_rate(total, won),
+    }
+
+
+def breakdown(conn: sqlite3.Connection, dimension: str) -> List[Dict[str, Any]]:
+    """Podział leadów wg pakietu, kategorii lub źródła wydarzenia"""
+    if dimension not in BREAKDOWN_DIMENSIONS:
+        raise ValueError(f"Nieznany wymiar: {dimension}")
+    query = _BREAKDOWN_QUERY.format(key=BREAKDOWN_DIMENSIONS[dimension])
+    return [
+        {
+            "key": key,
+            "leads": leads,
+            "won": won,
+            "value": value,
+            "won_value": won_value,
+            "conversion_rate": calculate_conversion_rate(leads, won),
+        }
+        for key, leads, won, value, won_value in conn.execute(query).fetchall()
+    ]
+
+
+def pipeline_report(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Pełny raport pipeline'u: wartości, konwersja i podziały"""
+    return {
+        "pipeline": pipeline_value(conn),
+        "conversion": conversion(conn),
+        "by_package": breakdown(conn, "package"),
+        "by_category": breakdown(conn, "category"),
+        "by_source": breakdown(conn, "source"),
+    }
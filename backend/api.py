@@ -6,25 +6,68 @@ REST API do zarządzania wydarzeniami, leadami i ofertami
 Autor: Softreck / prototypowanie.pl
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Query, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, create_model, field_validator
+from typing import Annotated, List, Optional, Dict, Any, Union
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 from enum import Enum
 import asyncio
 import sqlite3
 import json
 import os
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+import analytics
+import archive
+import changefeed
+import event_calendar
+import funnel
+import geo
+from followups import FollowUpScheduler, due_leads
+from broadcast import Broadcaster, ChangeWatcher, format_event
+import pricing
+from compression import CompressionMiddleware, PrecompressedPayload, DEFAULT_MINIMUM_SIZE
+import metrics
+import olap
+import profiler
+from sequencer import NumberSequencer
+import sync_daemon
+import sync_history
+import workers
+from workers import VersionedCache
+
 # ============= KONFIGURACJA =============
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start workera: WAL i zadania w tle - przypomnienia follow-up (FOLLOW_UP_REMINDERS=0 wyłącza)"""
+    workers.enable_wal(DATABASE_PATH)
+    stop = asyncio.Event()
+    task = None
+    if os.getenv("FOLLOW_UP_REMINDERS", "1") == "1":
+        task = asyncio.create_task(follow_up_scheduler.run(connect_background, stop))
+    yield
+    stop.set()
+    if task:
+        await task
+    if analytics_engine:
+        analytics_engine.close()
+
 app = FastAPI(
     title="StreamFlow Event Aggregator API",
     description="API do agregacji wydarzeń i zarządzania leadami sprzedażowymi",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS - pozwól na dostęp z frontendu
@@ -36,6 +79,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Kompresja gzip/brotli - małe odpowiedzi (poniżej progu) idą bez kompresji
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", str(DEFAULT_MINIMUM_SIZE))),
+)
+
+# Metryki Prometheus (/metrics) - najbardziej zewnętrzna warstwa, mierzy całe żądanie
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ============= MODELE PYDANTIC =============
 
 class EventStatus(str, Enum):
@@ -150,6 +202,19 @@ class LeadResponse(LeadBase):
     class Config:
         from_attributes = True
 
+class DueLeadResponse(BaseModel):
+    id: int
+    event_id: Optional[int] = None
+    company: Optional[str] = None
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    status: str
+    value: Optional[float] = None
+    package: Optional[str] = None
+    follow_up_date: str
+    overdue: bool
+
 class OfferBase(BaseModel):
     lead_id: int
     event_id: int
@@ -162,8 +227,37 @@ class OfferBase(BaseModel):
 class OfferCreate(OfferBase):
     pass
 
+class QuoteRequest(BaseModel):
+    package: ServicePackage
+    additional_services: List[str] = []
+    discount: float = Field(0.0, ge=0, le=100)
+
+    @field_validator('additional_services')
+    @classmethod
+    def known_services(cls, services: List[str]) -> List[str]:
+        unknown = sorted(set(services) - set(pricing.SERVICES))
+        if unknown:
+            raise ValueError(f"Nieznane usługi: {', '.join(unknown)}")
+        return services
+
+class QuoteBatchRequest(BaseModel):
+    items: List[QuoteRequest] = Field(..., max_length=1000)
+
+class QuoteResponse(BaseModel):
+    package: ServicePackage
+    additional_services: List[str]
+    discount_percent: float
+    base_price: float
+    additional_total: float
+    subtotal: float
+    discount: float
+    net: float
+    vat: float
+    gross: float
+
 class OfferResponse(BaseModel):
     id: int
+    number: Optional[str] = None
     lead_id: int
     event_id: int
     package: str
@@ -186,62 +280,231 @@ class SyncResponse(BaseModel):
     sources_synced: int
     duration_seconds: float
 
+class SyncRunResponse(BaseModel):
+    id: int
+    run_id: str
+    source: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+    http_seconds: float
+    bytes_downloaded: int
+    parse_seconds: float
+    write_seconds: float
+    total_seconds: float
+    found: int
+    new: int
+    updated: int
+    unchanged: int
+    failed: int
+
+class SyncSourceSummary(BaseModel):
+    source: str
+    runs: int
+    errors: int
+    avg_total_seconds: float
+    max_total_seconds: float
+    avg_http_seconds: float
+    avg_parse_seconds: float
+    avg_write_seconds: float
+    bytes_downloaded: int
+    new: int
+    updated: int
+    failed: int
+    last_run_at: Optional[str] = None
+
+class SyncScheduleEntry(BaseModel):
+    source: str
+    next_run_at: str
+    interval_seconds: Optional[float] = None
+    last_started_at: Optional[str] = None
+    last_status: Optional[str] = None
+    skipped: int = 0
+
+class ChangeEntry(BaseModel):
+    version: int
+    table: str
+    id: int
+    op: str
+    data: Optional[Dict[str, Any]] = None
+
+class ChangeFeedResponse(BaseModel):
+    since: int
+    version: int
+    current_version: int
+    has_more: bool
+    changes: List[ChangeEntry]
+
+class Granularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class CalendarEvent(BaseModel):
+    id: int
+    name: str
+    date_start: str
+    city: Optional[str] = None
+    category: Optional[str] = None
+    potential_score: Optional[int] = None
+    estimated_audience: Optional[int] = None
+
+class CalendarBucket(BaseModel):
+    key: str
+    start: str
+    events: int
+    audience: int
+    top: List[CalendarEvent]
+
+class CalendarResponse(BaseModel):
+    granularity: Granularity
+    date_from: str = Field(alias="from")
+    date_to: str = Field(alias="to")
+    buckets: List[CalendarBucket]
+
 class StatsResponse(BaseModel):
     events: Dict[str, int]
     leads: Dict[str, int]
     revenue: Dict[str, float]
     sources: List[Dict[str, Any]]
 
+class PipelineBreakdownItem(BaseModel):
+    key: Optional[str] = None
+    leads: int
+    won: int
+    value: float
+    won_value: float
+    conversion_rate: float
+
+class PipelineAnalyticsResponse(BaseModel):
+    pipeline: Dict[str, float]
+    conversion: Dict[str, float]
+    by_package: List[PipelineBreakdownItem]
+    by_category: List[PipelineBreakdownItem]
+    by_source: List[PipelineBreakdownItem]
+
+class FunnelGroup(BaseModel):
+    source: Optional[str] = None
+    category: Optional[str] = None
+    month: Optional[str] = None
+    events: int
+    engaged: int
+    leads: int
+    offered: int
+    won: int
+    won_value: float
+    lead_rate: float
+    offer_rate: float
+    win_rate: float
+    share: Optional[float] = None
+    won_delta: Optional[int] = None
+
+class FunnelResponse(BaseModel):
+    group_by: List[str]
+    total: FunnelGroup
+    groups: List[FunnelGroup]
+
 # ============= PAKIETY CENOWE =============
 
-PACKAGES = {
-    "basic": {
-        "name": "Pakiet BASIC",
-        "price": 990,
-        "features": ["1 kamera", "Do 2h transmisji", "YouTube/FB"]
-    },
-    "standard": {
-        "name": "Pakiet STANDARD", 
-        "price": 2490,
-        "features": ["2-3 kamery", "Do 4h", "Realizator", "Replay"]
-    },
-    "premium": {
-        "name": "Pakiet PREMIUM",
-        "price": 4990,
-        "features": ["4+ kamery", "Cały dzień", "Wóz OB", "Komentator"]
-    },
-    "enterprise": {
-        "name": "Pakiet ENTERPRISE",
-        "price": 0,
-        "features": ["Wycena indywidualna"]
-    }
-}
+# Jedno źródło cen: pricing.py. Tu tylko gotowe payloady endpointów konfiguracyjnych.
+PACKAGES = {code: package.to_dict() for code, package in pricing.PACKAGES.items()}
 
-ADDITIONAL_SERVICES = {
-    "drone": {"name": "Dron", "price": 800},
-    "commentator": {"name": "Komentator", "price": 600},
-    "graphics_custom": {"name": "Grafiki dedykowane", "price": 400},
-    "highlights": {"name": "Montaż highlights", "price": 500},
-    "multistream": {"name": "Multi-platform", "price": 300},
-    "vod": {"name": "Archiwum VOD", "price": 200}
-}
+ADDITIONAL_SERVICES = {code: service.to_dict() for code, service in pricing.SERVICES.items()}
 
 # ============= BAZA DANYCH =============
 
 DATABASE_PATH = os.getenv("DATABASE_PATH", "streamflow.db")
 
+# Numery ofert rezerwowane blokami - bez zapytania do bazy przy każdej ofercie
+sequencer = NumberSequencer(DATABASE_PATH, block_size=int(os.getenv("NUMBER_BLOCK_SIZE", "20")))
+
+# TimedConnection (metryki) albo ProfilingConnection gdy SQL_PROFILING=1,
+# z kolejką zapisujących wspólną dla workerów (flock obok bazy)
+DB_CONNECTION_FACTORY = workers.coordinated(profiler.connection_factory())
+
+# Agregaty per worker, ważne do następnego zapisu w events/leads/offers (z dowolnego procesu)
+stats_cache = VersionedCache("stats")
+
+# ANALYTICS_ENGINE=duckdb: /api/analytics/* z DuckDB (SQLite tylko do odczytu albo snapshot Parquet);
+# źródło otwierane przy imporcie - błąd kończy się ostrzeżeniem i analityką z SQLite
+analytics_engine = olap.engine_from_env(DATABASE_PATH)
+
+# Wersja wg źródła silnika - dla snapshotu Parquet zmienia ją nowy eksport, nie zapis w SQLite
+analytics_cache = VersionedCache(
+    "analytics", version=analytics_engine.version if analytics_engine else changefeed.current_version
+)
+
 async def get_db():
     """Generator połączenia z bazą"""
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = sqlite3.connect(DATABASE_PATH, factory=DB_CONNECTION_FACTORY)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
     finally:
         conn.close()
 
+# ============= SZYBKA SERIALIZACJA =============
+
+# Kolejność kolumn = kolejność pól modeli odpowiedzi (ten sam JSON co przez Pydantic)
+EVENT_RESPONSE_COLUMNS = tuple(EventResponse.model_fields)
+LEAD_RESPONSE_COLUMNS = tuple(LeadResponse.model_fields)
+
+def dumps_json(content: Any) -> bytes:
+    """Serializuje do JSON (orjson jeśli dostępny)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class TrustedJSONResponse(Response):
+    """Odpowiedź z zaufanych wierszy bazy - bez walidacji Pydantic"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+# Presety dla fields= - kolumny potrzebne tabelom list w dashboardzie
+EVENT_FIELD_PRESETS = {
+    "summary": ("id", "name", "date_start", "city", "category", "potential_score", "status"),
+}
+LEAD_FIELD_PRESETS = {
+    "summary": ("id", "event_id", "company", "status", "value", "package", "follow_up_date"),
+}
+
+FIELDS_DESCRIPTION = "Lista pól po przecinku albo preset (np. 'summary'); domyślnie wszystkie"
+
+def partial_model(model: type, name: str) -> type:
+    """Kształt odpowiedzi z fields= - wymagane tylko id, pozostałe pola tylko gdy wybrane"""
+    return create_model(name, **{
+        field: (info.annotation, ...) if field == "id" else (Optional[info.annotation], None)
+        for field, info in model.model_fields.items()
+    })
+
+EventFieldsResponse = partial_model(EventResponse, "EventFieldsResponse")
+LeadFieldsResponse = partial_model(LeadResponse, "LeadFieldsResponse")
+
+def select_columns(fields: Optional[str], columns: tuple, presets: Dict[str, tuple]) -> tuple:
+    """Zwraca kolumny do SELECT dla parametru fields= (id zawsze, kolejność modelu)"""
+    if not fields:
+        return columns
+    if fields in presets:
+        return presets[fields]
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(requested - set(columns))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Nieznane pola: {', '.join(unknown)}")
+    return tuple(c for c in columns if c == "id" or c in requested)
+
+def fetch_rows(db: sqlite3.Connection, columns: tuple, query: str, params: list) -> List[Dict[str, Any]]:
+    """Wykonuje zapytanie i mapuje krotki na słowniki wg stałej listy kolumn"""
+    cursor = db.cursor()
+    cursor.row_factory = None
+    cursor.execute(query, params)
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
 # ============= ENDPOINTS - EVENTS =============
 
-@app.get("/api/events", response_model=List[EventResponse], tags=["Events"])
+@app.get("/api/events", response_model=Union[List[EventResponse], List[EventFieldsResponse]], tags=["Events"])
 async def list_events(
     status: Optional[EventStatus] = None,
     category: Optional[EventCategory] = None,
@@ -252,12 +515,26 @@ async def list_events(
     search: Optional[str] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    near: Annotated[Optional[str], Query(description="'lat,lon' albo nazwa miasta, np. Poznań")] = None,
+    radius_km: Annotated[float, Query(gt=0, le=1000, description="Promień dla near")] = 50.0,
+    include_archived: Annotated[bool, Query(description="Dołącz wydarzenia z archiwum")] = False,
     db: sqlite3.Connection = Depends(get_db)
 ):
     """Pobiera listę wydarzeń z filtrami"""
-    query = "SELECT * FROM events WHERE 1=1"
+    columns = select_columns(fields, EVENT_RESPONSE_COLUMNS, EVENT_FIELD_PRESETS)
+    source_table = archive.union_source(db, "events") if include_archived else "events"
+    query = f"SELECT {', '.join(columns)} FROM {source_table} WHERE 1=1"
     params = []
     
+    if near:
+        point = geo.parse_near(near)
+        if point is None:
+            raise HTTPException(status_code=400, detail=f"Nieznana lokalizacja: {near}")
+        clause, near_params = geo.near_filter(db, *point, radius_km)
+        query += f" AND {clause}"
+        params.extend(near_params)
+    
     if status:
         query += " AND status = ?"
         params.append(status.value)
@@ -283,13 +560,34 @@ async def list_events(
     query += " ORDER BY date_start ASC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
     
-    cursor = db.execute(query, params)
-    return [dict(row) for row in cursor.fetchall()]
+    return TrustedJSONResponse(fetch_rows(db, columns, query, params))
+
+@app.get("/api/calendar", response_model=CalendarResponse, tags=["Events"])
+async def get_calendar(
+    date_from: Optional[date] = Query(None, alias="from", description="Domyślnie pierwszy dzień bieżącego miesiąca"),
+    date_to: Optional[date] = Query(None, alias="to", description="Domyślnie ostatni dzień miesiąca z 'from'"),
+    granularity: Granularity = Granularity.DAY,
+    top: int = Query(3, ge=0, le=20, description="Najlepsze wydarzenia w kubełku (potential_score, widownia)"),
+    category: Optional[EventCategory] = None,
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Kubełki dzień/tydzień/miesiąc: liczba wydarzeń, łączna widownia i top wydarzenia"""
+    date_from = date_from or date.today().replace(day=1)
+    if date_to is None:
+        next_month = (date_from.replace(day=1) + timedelta(days=32)).replace(day=1)
+        date_to = next_month - timedelta(days=1)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' przed 'from'")
+    buckets = event_calendar.calendar(db, date_from, date_to, granularity.value, top,
+                                      category.value if category else None)
+    return TrustedJSONResponse({"granularity": granularity.value, "from": date_from.isoformat(),
+                                "to": date_to.isoformat(), "buckets": buckets})
 
 @app.get("/api/events/{event_id}", response_model=EventResponse, tags=["Events"])
-async def get_event(event_id: int, db: sqlite3.Connection = Depends(get_db)):
+async def get_event(event_id: int, db: sqlite3.Connection = Depends(get_db), include_archived: bool = False):
     """Pobiera szczegóły wydarzenia"""
-    cursor = db.execute("SELECT * FROM events WHERE id = ?", (event_id,))
+    source_table = archive.union_source(db, "events") if include_archived else "events"
+    cursor = db.execute(f"SELECT * FROM {source_table} WHERE id = ?", (event_id,))
     event = cursor.fetchone()
     if not event:
         raise HTTPException(status_code=404, detail="Wydarzenie nie znalezione")
@@ -315,6 +613,7 @@ async def create_event(event: EventCreate, db: sqlite3.Connection = Depends(get_
         event.estimated_audience, now, now
     ))
     db.commit()
+    change_watcher.wake()
     
     return await get_event(cursor.lastrowid, db)
 
@@ -339,6 +638,7 @@ async def update_event(event_id: int, update: EventUpdate, db: sqlite3.Connectio
         
         db.execute(f"UPDATE events SET {', '.join(updates)} WHERE id = ?", params)
         db.commit()
+        change_watcher.wake()
     
     return await get_event(event_id, db)
 
@@ -348,19 +648,24 @@ async def delete_event(event_id: int, db: sqlite3.Connection = Depends(get_db)):
     await get_event(event_id, db)
     db.execute("DELETE FROM events WHERE id = ?", (event_id,))
     db.commit()
+    change_watcher.wake()
     return {"message": "Wydarzenie usunięte"}
 
 # ============= ENDPOINTS - LEADS =============
 
-@app.get("/api/leads", response_model=List[LeadResponse], tags=["Leads"])
+@app.get("/api/leads", response_model=Union[List[LeadResponse], List[LeadFieldsResponse]], tags=["Leads"])
 async def list_leads(
     status: Optional[LeadStatus] = None,
     limit: int = Query(default=50, le=200),
     offset: int = 0,
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
+    include_archived: Annotated[bool, Query(description="Dołącz leady z archiwum")] = False,
     db: sqlite3.Connection = Depends(get_db)
 ):
     """Pobiera listę leadów"""
-    query = "SELECT * FROM leads WHERE 1=1"
+    columns = select_columns(fields, LEAD_RESPONSE_COLUMNS, LEAD_FIELD_PRESETS)
+    source_table = archive.union_source(db, "leads") if include_archived else "leads"
+    query = f"SELECT {', '.join(columns)} FROM {source_table} WHERE 1=1"
     params = []
     
     if status:
@@ -370,8 +675,21 @@ async def list_leads(
     query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
     
-    cursor = db.execute(query, params)
-    return [dict(row) for row in cursor.fetchall()]
+    return TrustedJSONResponse(fetch_rows(db, columns, query, params))
+
+@app.get("/api/leads/due", response_model=List[DueLeadResponse], tags=["Leads"])
+async def list_due_leads(
+    days: int = Query(7, ge=0, le=365, description="Nadchodzące follow-upy na tyle dni do przodu"),
+    overdue: bool = Query(True, description="Dołącz zaległe"),
+    status: Optional[LeadStatus] = None,
+    limit: int = Query(100, le=1000),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Zaległe i nadchodzące follow-upy otwartych leadów (najwcześniejsze pierwsze)"""
+    today = date.today()
+    rows = due_leads(db, until=today + timedelta(days=days), since=None if overdue else today,
+                     status=status.value if status else None, limit=limit)
+    return TrustedJSONResponse(rows)
 
 @app.post("/api/leads", response_model=LeadResponse, tags=["Leads"])
 async def create_lead(lead: LeadCreate, db: sqlite3.Connection = Depends(get_db)):
@@ -388,12 +706,12 @@ async def create_lead(lead: LeadCreate, db: sqlite3.Connection = Depends(get_db)
         lead.phone, lead.value, lead.package.value if lead.package else None,
         lead.notes, now, now
     ))
-    db.commit()
     
-    # Aktualizuj status wydarzenia
-    db.execute("UPDATE events SET status = 'contacted' WHERE id = ? AND status = 'new'",
-               (lead.event_id,))
+    # Aktualizuj status wydarzenia (updated_at - watermark ChangeWatcher)
+    db.execute("UPDATE events SET status = 'contacted', updated_at = ? WHERE id = ? AND status = 'new'",
+               (now, lead.event_id))
     db.commit()
+    change_watcher.wake()
     
     cursor = db.execute("SELECT * FROM leads WHERE id = ?", (cursor.lastrowid,))
     return dict(cursor.fetchone())
@@ -420,6 +738,7 @@ async def update_lead(lead_id: int, update: LeadUpdate, db: sqlite3.Connection =
         
         db.execute(f"UPDATE leads SET {', '.join(updates)} WHERE id = ?", params)
         db.commit()
+        change_watcher.wake()
     
     cursor = db.execute("SELECT * FROM leads WHERE id = ?", (lead_id,))
     return dict(cursor.fetchone())
@@ -429,43 +748,56 @@ async def update_lead(lead_id: int, update: LeadUpdate, db: sqlite3.Connection =
 @app.post("/api/offers", tags=["Offers"])
 async def create_offer(offer: OfferCreate, db: sqlite3.Connection = Depends(get_db)):
     """Generuje nową ofertę"""
-    package = PACKAGES.get(offer.package.value)
+    package = pricing.PACKAGES.get(offer.package.value)
     if not package:
         raise HTTPException(status_code=400, detail="Nieznany pakiet")
     
-    base_price = package["price"]
-    additional_total = sum(
-        ADDITIONAL_SERVICES.get(s, {}).get("price", 0) 
-        for s in offer.additional_services
-    )
-    subtotal = base_price + additional_total
-    discount_amount = subtotal * (offer.discount / 100)
-    total_price = subtotal - discount_amount
+    quote = pricing.quote(package.code, offer.additional_services, offer.discount)
+    base_price = quote.base_price
+    total_price = quote.net
     
     now = datetime.now()
     valid_until = (now + timedelta(days=offer.valid_days)).isoformat()
+    number = sequencer.offer_number(now)
     
     cursor = db.execute('''
         INSERT INTO offers (
-            lead_id, event_id, package, base_price, additional_services,
+            number, lead_id, event_id, package, base_price, additional_services,
             total_price, valid_until, status, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, 'draft', ?)
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'draft', ?)
     ''', (
-        offer.lead_id, offer.event_id, offer.package.value, base_price,
+        number, offer.lead_id, offer.event_id, offer.package.value, base_price,
         json.dumps(offer.additional_services), total_price, valid_until, now.isoformat()
     ))
     db.commit()
+    change_watcher.wake()
     
     return {
         "id": cursor.lastrowid,
-        "package": package["name"],
+        "number": number,
+        "package": package.name,
         "base_price": base_price,
         "additional_services": offer.additional_services,
         "discount": offer.discount,
         "total_price": total_price,
+        "vat": quote.vat,
+        "gross_price": quote.gross,
         "valid_until": valid_until
     }
 
+@app.post("/api/offers/quote", response_model=List[QuoteResponse], tags=["Offers"])
+async def quote_offers(request: QuoteBatchRequest):
+    """Wycenia wiele kombinacji pakiet/usługi/rabat w jednym wywołaniu"""
+    return [
+        QuoteResponse(
+            package=item.package,
+            additional_services=item.additional_services,
+            discount_percent=item.discount,
+            **pricing.quote(item.package.value, item.additional_services, item.discount).to_dict()
+        )
+        for item in request.items
+    ]
+
 @app.post("/api/offers/{offer_id}/send", tags=["Offers"])
 async def send_offer(offer_id: int, db: sqlite3.Connection = Depends(get_db)):
     """Wysyła ofertę do klienta"""
@@ -480,10 +812,11 @@ async def send_offer(offer_id: int, db: sqlite3.Connection = Depends(get_db)):
     offer = cursor.fetchone()
     if offer:
         db.execute('''
-            UPDATE leads SET status = 'offer_sent', offer_sent_date = ? WHERE id = ?
-        ''', (now, offer['lead_id']))
+            UPDATE leads SET status = 'offer_sent', offer_sent_date = ?, updated_at = ? WHERE id = ?
+        ''', (now, now, offer['lead_id']))
     
     db.commit()
+    change_watcher.wake()
     return {"message": "Oferta wysłana", "sent_at": now}
 
 # ============= ENDPOINTS - SYNC =============
@@ -503,11 +836,33 @@ async def sync_sources(request: SyncRequest, background_tasks: BackgroundTasks):
         duration_seconds=15.3
     )
 
+@app.get("/api/sync/runs", response_model=List[SyncRunResponse], tags=["Sync"])
+async def list_sync_runs(
+    source: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO data/czas, np. 2026-01-01"),
+    limit: int = Query(100, le=1000),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Historia synchronizacji per źródło z podziałem czasu HTTP/parsowanie/zapis"""
+    return sync_history.list_runs(db, source=source, since=since, limit=limit)
+
+@app.get("/api/sync/runs/summary", response_model=List[SyncSourceSummary], tags=["Sync"])
+async def summarize_sync_runs(
+    since: Optional[str] = Query(None, description="ISO data/czas, np. 2026-01-01"),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Trend per źródło: średnie czasy, bajty i liczniki (najwolniejsze pierwsze)"""
+    return sync_history.summarize_runs(db, since=since)
+
+@app.get("/api/sync/schedule", response_model=List[SyncScheduleEntry], tags=["Sync"])
+async def get_sync_schedule(db: sqlite3.Connection = Depends(get_db)):
+    """Terminy następnych synchronizacji demona (najbliższe pierwsze)"""
+    return sync_daemon.list_schedule(db)
+
 # ============= ENDPOINTS - STATS =============
 
-@app.get("/api/stats", response_model=StatsResponse, tags=["Stats"])
-async def get_stats(db: sqlite3.Connection = Depends(get_db)):
-    """Pobiera statystyki dashboardu"""
+def read_stats(db: sqlite3.Connection) -> Dict[str, Any]:
+    """Liczniki dashboardu (wspólne dla /api/stats i delt w /api/stream)"""
     # Events stats
     cursor = db.execute('''
         SELECT 
@@ -548,27 +903,113 @@ async def get_stats(db: sqlite3.Connection = Depends(get_db)):
     ''')
     sources = [{"name": row['source'], "count": row['count']} for row in cursor.fetchall()]
     
-    return StatsResponse(
-        events=events_stats,
-        leads=leads_stats,
-        revenue={
+    return {
+        "events": events_stats,
+        "leads": leads_stats,
+        "revenue": {
             "won": revenue_stats['won_value'] or 0,
             "pipeline": revenue_stats['pipeline_value'] or 0
         },
-        sources=sources
+        "sources": sources
+    }
+
+@app.get("/api/stats", response_model=StatsResponse, tags=["Stats"])
+async def get_stats(db: sqlite3.Connection = Depends(get_db)):
+    """Pobiera statystyki dashboardu"""
+    return StatsResponse(**stats_cache.get(db, "stats", lambda: read_stats(db)))
+
+# ============= ENDPOINTS - STREAM =============
+
+def connect_background() -> sqlite3.Connection:
+    """Własne połączenie zadania w tle (watcher SSE, przypomnienia)"""
+    conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+# Jeden broadcaster i jeden watcher na proces - N dashboardów to nadal jedno zapytanie na zmianę
+broadcaster = Broadcaster()
+change_watcher = ChangeWatcher(broadcaster, connect_background, read_stats,
+                               interval=float(os.getenv("STREAM_POLL_INTERVAL", "1.0")))
+
+# Przypomnienia follow-up trafiają do podłączonych dashboardów jako zdarzenie SSE 'follow_up'
+follow_up_scheduler = FollowUpScheduler(notify=lambda reminder: broadcaster.publish("follow_up", reminder))
+
+@app.get("/api/stream", tags=["Stream"])
+async def stream_changes(db: sqlite3.Connection = Depends(get_db)):
+    """Server-Sent Events: snapshot statystyk, nowe/zmienione wydarzenia i leady, delty statystyk"""
+    queue = broadcaster.subscribe()
+    change_watcher.ensure_running()
+    snapshot = change_watcher.stats or read_stats(db)
+    return StreamingResponse(
+        broadcaster.stream(queue, first=format_event("snapshot", snapshot)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
+# ============= ENDPOINTS - CHANGES =============
+
+@app.get("/api/changes", response_model=ChangeFeedResponse, tags=["Changes"])
+async def list_changes(
+    since: int = Query(0, ge=0, description="Wersja z poprzedniej odpowiedzi (0 = pełna kopia)"),
+    limit: int = Query(changefeed.DEFAULT_LIMIT, ge=1, le=5000),
+    tables: Optional[str] = Query(None, description="Tabele po przecinku: events, leads, offers"),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Wiersze zmienione po wersji since - jeden wpis na wiersz, najstarsze pierwsze"""
+    selected = [t.strip() for t in tables.split(",") if t.strip()] if tables else None
+    unknown = sorted(set(selected or ()) - set(changefeed.TRACKED_TABLES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Nieznane tabele: {', '.join(unknown)}")
+    return TrustedJSONResponse(changefeed.read_changes(db, since=since, limit=limit, tables=selected))
+
+# ============= ENDPOINTS - ANALYTICS =============
+
+@app.get("/api/analytics/pipeline", response_model=PipelineAnalyticsResponse, tags=["Analytics"])
+async def get_pipeline_analytics(db: sqlite3.Connection = Depends(get_db)):
+    """Wartość pipeline'u, konwersja i podziały liczone w bazie"""
+    if analytics_engine:
+        return analytics_cache.get(db, "pipeline", analytics_engine.pipeline_report)
+    return analytics_cache.get(db, "pipeline", lambda: analytics.pipeline_report(db))
+
+@app.get("/api/analytics/funnel", response_model=FunnelResponse, tags=["Analytics"])
+async def get_funnel_analytics(
+    group_by: str = Query("source,category,month", description="Wymiary: source, category, month"),
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    month_from: Optional[str] = Query(None, alias="from", pattern=r"^\d{4}-\d{2}$", description="Miesiąc RRRR-MM"),
+    month_to: Optional[str] = Query(None, alias="to", pattern=r"^\d{4}-\d{2}$", description="Miesiąc RRRR-MM"),
+    db: sqlite3.Connection = Depends(get_db)
+):
+    """Lejek wydarzenie -> lead -> oferta -> wygrana z rollupu (odświeżanego przyrostowo)"""
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    key = ("funnel", tuple(dimensions), source, category, month_from, month_to)
+
+    def compute():
+        if analytics_engine:
+            return analytics_engine.funnel_report(dimensions, source, category, month_from, month_to)
+        return funnel.report(db, dimensions, source, category, month_from, month_to)
+
+    try:
+        result = analytics_cache.get(db, key, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TrustedJSONResponse(result)
+
 # ============= ENDPOINTS - PACKAGES =============
 
+# Katalogi są statyczne - serializowane i kompresowane raz przy starcie
+PACKAGES_PAYLOAD = PrecompressedPayload(dumps_json(PACKAGES))
+ADDITIONAL_SERVICES_PAYLOAD = PrecompressedPayload(dumps_json(ADDITIONAL_SERVICES))
+
 @app.get("/api/packages", tags=["Config"])
-async def get_packages():
+async def get_packages(request: Request):
     """Pobiera dostępne pakiety usług"""
-    return PACKAGES
+    return PACKAGES_PAYLOAD.response(request.headers.get("accept-encoding", ""))
 
 @app.get("/api/additional-services", tags=["Config"])
-async def get_additional_services():
+async def get_additional_services(request: Request):
     """Pobiera dostępne usługi dodatkowe"""
-    return ADDITIONAL_SERVICES
+    return ADDITIONAL_SERVICES_PAYLOAD.response(request.headers.get("accept-encoding", ""))
 
 # ============= HEALTHCHECK =============
 
@@ -577,12 +1018,39 @@ async def health_check():
     """Status serwera"""
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", tags=["System"])
+async def get_metrics():
+    """Metryki w formacie Prometheus"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+# ============= DEBUG =============
+
+# Rejestrowane tylko przy SQL_PROFILING=1 - raport ujawnia znormalizowany SQL i plany zapytań
+if issubclass(DB_CONNECTION_FACTORY, profiler.ProfilingConnection):
+
+    @app.get("/debug/queries", tags=["System"])
+    async def get_query_report():
+        """Raport profilera SQL: p50/p95/max per fingerprint (execute + pobieranie wierszy)"""
+        return {
+            "enabled": True,
+            "slow_query_ms": profiler.PROFILER.slow_query_ms,
+            "queries": profiler.PROFILER.report(),
+        }
+
+    @app.delete("/debug/queries", tags=["System"])
+    async def reset_query_report():
+        """Czyści statystyki profilera SQL"""
+        profiler.PROFILER.reset()
+        return {"message": "Statystyki wyczyszczone"}
+
 # ============= URUCHOMIENIE =============
 
 if __name__ == "__main__":
     import uvicorn
+    # API_WORKERS > 1: osobne procesy (uvicorn wymaga wtedy aplikacji jako "api:app")
     uvicorn.run(
-        app,
+        "api:app" if workers.WORKERS > 1 else app,
         host=os.getenv("API_HOST", "0.0.0.0"),
         port=int(os.getenv("API_PORT", "8004")),
+        workers=workers.WORKERS,
     )
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Archiwum wydarzeń (hot/cold)
+Wydarzenia z date_start starszą niż horyzont retencji przenoszone paczkami (z leadami i ofertami)
+do dołączonej bazy archiwum - tabele gorące zawierają tylko bieżące dane,
+a include_archived łączy obie przez UNION ALL
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import funnel
+
+logger = logging.getLogger('Archive')
+
+
+ARCHIVED_TABLES = ("events", "leads", "offers")
+DEFAULT_RETENTION_DAYS = 180
+DEFAULT_BATCH_SIZE = 500
+
+ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_events_date ON events(date_start)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_archive_leads_event ON leads(event_id)",
+)
+
+# Wiersze paczki (temp.archive_batch = id wydarzeń); oferty przed leadami - warunek ofert czyta leads
+_BATCH = "SELECT id FROM temp.archive_batch"
+BATCH_ROWS = {
+    "events": f"id IN ({_BATCH})",
+    "leads": f"event_id IN ({_BATCH})",
+    "offers": f"event_id IN ({_BATCH}) OR lead_id IN (SELECT id FROM main.leads WHERE event_id IN ({_BATCH}))",
+}
+
+
+def archive_path(db_path: str) -> str:
+    """streamflow.db -> streamflow_archive.db (albo ARCHIVE_DATABASE_PATH)"""
+    override = os.getenv("ARCHIVE_DATABASE_PATH")
+    if override:
+        return override
+    if not db_path:
+        return ":memory:"
+    root, ext = os.path.splitext(db_path)
+    return f"{root}_archive{ext or '.db'}"
+
+
+def stored_columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> List[str]:
+    """Kolumny zapisywane w tabeli (bez generowanych start_year/start_month/start_week)"""
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_xinfo({table})") if row[6] == 0]
+
+
+def _ensure_table(conn: sqlite3.Connection, table: str):
+    # Kopia kolumn tabeli gorącej (te same id) + archived_at; kolumny z późniejszych migracji dopisywane
+    columns = [(row[1], row[2]) for row in conn.execute(f"PRAGMA main.table_xinfo({table})") if row[6] == 0]
+    existing = set(stored_columns(conn, table, "archive"))
+    if not existing:
+        definitions = ", ".join(f"{name} {kind} PRIMARY KEY" if name == "id" else f"{name} {kind}"
+                                for name, kind in columns)
+        conn.execute(f"CREATE TABLE archive.{table} ({definitions}, archived_at TEXT)")
+        return
+    for name, kind in columns:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {kind}")
+
+
+def attach(conn: sqlite3.Connection, path: Optional[str] = None):
+    """Dołącza bazę archiwum jako schemat 'archive' i tworzy brakujące tabele (idempotentne)"""
+    databases = {row[1]: row[2] for row in conn.execute("PRAGMA database_list")}
+    if "archive" not in databases:
+        conn.execute("ATTACH DATABASE ? AS archive", (path or archive_path(databases["main"]),))
+    for table in ARCHIVED_TABLES:
+        _ensure_table(conn, table)
+    for statement in ARCHIVE_INDEXES:
+        conn.execute(statement)
+
+
+def union_source(conn: sqlite3.Connection, table: str) -> str:
+    """Podzapytanie 'tabela gorąca UNION ALL archiwum' pod nazwą tabeli - filtry trafiają do obu części"""
+    attach(conn)
+    columns = ", ".join(stored_columns(conn, table))
+    return f"(SELECT {columns} FROM main.{table} UNION ALL SELECT {columns} FROM archive.{table}) AS {table}"
+
+
+def _move_batch(conn: sqlite3.Connection, before: str, batch_size: int) -> Dict[str, int]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.archive_batch")
+        conn.execute("INSERT INTO temp.archive_batch SELECT id FROM main.events WHERE date_start < ? "
+                     "ORDER BY date_start LIMIT ?", (before, batch_size))
+        # Zaległe zmiany lejka przeliczone przed usunięciem - wkład archiwizowanych zostaje w rollupie
+        funnel.refresh(conn, commit=False)
+        now = datetime.now().isoformat()
+        for table, where in BATCH_ROWS.items():
+            columns = ", ".join(stored_columns(conn, table))
+            conn.execute(f"INSERT OR REPLACE INTO archive.{table} ({columns}, archived_at) "
+                         f"SELECT {columns}, ? FROM main.{table} WHERE {where}", (now,))
+        moved = {}
+        for table in reversed(ARCHIVED_TABLES):
+            moved[table] = conn.execute(f"DELETE FROM main.{table} WHERE {BATCH_ROWS[table]}").rowcount
+        conn.execute(f"DELETE FROM funnel_dirty WHERE event_id IN ({_BATCH})")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return moved
+
+
+def archive_events(
+    conn: sqlite3.Connection,
+    before: Optional[date] = None,
+    retention_days: int = DEFAULT_RETENTION_DAYS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Przenosi wydarzenia z date_start < before (domyślnie dziś - retention_days) do archiwum.
+
+    Każda paczka to osobna transakcja - zapisujący w API czekają najwyżej na jedną paczkę.
+    Kopia jest INSERT OR REPLACE po id, więc przerwane przeniesienie można bezpiecznie powtórzyć.
+    """
+    before = before or date.today() - timedelta(days=retention_days)
+    results = {'before': before.isoformat(), 'batches': 0, 'events': 0, 'leads': 0, 'offers': 0,
+               'duration_seconds': 0.0}
+    start = time.perf_counter()
+    attach(conn)
+    conn.commit()
+    while max_batches is None or results['batches'] < max_batches:
+        moved = _move_batch(conn, before.isoformat(), batch_size)
+        if not moved['events']:
+            break
+        results['batches'] += 1
+        for table, count in moved.items():
+            results[table] += count
+    results['duration_seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(f"Archiwum: {results['events']} wydarzeń, {results['leads']} leadów, {results['offers']} ofert "
+                f"sprzed {results['before']} w {results['duration_seconds']}s")
+    return results
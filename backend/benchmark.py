@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Mikrobenchmarki
+Gorące ścieżki bazy i utils na wygenerowanych danych (10k / 100k / 1M wydarzeń), wynik w JSON
+
+Uruchomienie:
+    python benchmark.py --output bench.json
+    python benchmark.py --sizes 10000 --repeat 3 --only list_events
+    python benchmark.py --output bench-new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from aggregator import Database, Event
+import datagen
+import snapshot
+import utils
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 5
+DEFAULT_SEED = 42
+SAVE_EVENT_SAMPLE = 1000     # pojedyncze save_event() na każdy pomiar
+EXPORT_SAMPLE = 100_000      # górny limit wierszy eksportu (pamięć)
+UTILS_SAMPLE = 10_000        # wartości na pomiar walidatorów
+REGRESSION_THRESHOLD = 0.10  # --compare: zmiana mediany oznaczana jako regresja/poprawa
+DATAGEN_REPEAT = 3           # górny limit powtórzeń datagen.generate (pełna baza na pomiar)
+# Minimalne ops/s (mediana) sprawdzane po każdym uruchomieniu - niespełnienie = kod wyjścia 1
+TARGETS = {"datagen.generate": 100_000}
+
+CITIES = ('Warszawa', 'Kraków', 'Poznań', 'Wrocław', 'Gdańsk', 'Łódź', 'Katowice', 'Lublin')
+CATEGORIES = ('Bieganie', 'OCR', 'CrossFit', 'Fitness', 'Siatkówka', 'MMA', 'E-sport',
+              'Festiwal', 'Konferencja', 'Targi', 'Inne')
+SOURCES = ('Runmageddon.pl', 'HYROX.com', 'GoOut.net', 'MTP.pl')
+EVENT_STATUSES = ('new', 'contacted', 'qualified', 'offer_sent', 'won', 'lost', 'rejected')
+LEAD_STATUSES = ('new', 'active', 'offer_sent', 'negotiation', 'won', 'lost')
+NAME_WORDS = ('Run', 'Challenge', 'Cup', 'Festival', 'Expo', 'Games', 'Series', 'Open', 'Night')
+
+# Filtry list_events - benchmark przechodzi wszystkie 2^7 kombinacji
+LIST_EVENTS_FILTERS = {
+    'status': 'new',
+    'category': 'OCR',
+    'source': 'HYROX.com',
+    'city': 'Pozna',
+    'date_from': '2026-03-01',
+    'date_to': '2026-09-30',
+    'search': 'Run',
+}
+
+
+# ============= DANE =============
+
+def generate_events(count: int, seed: int = DEFAULT_SEED, offset: int = 0) -> Iterator[Event]:
+    """Deterministyczne syntetyczne wydarzenia (generator - bez trzymania 1M obiektów w pamięci)"""
+    rng = random.Random(seed + offset)
+    start = date(2026, 1, 1)
+    for i in range(offset, offset + count):
+        city = rng.choice(CITIES)
+        day = start + timedelta(days=rng.randrange(365))
+        has_email = rng.random() < 0.6
+        has_phone = rng.random() < 0.4
+        yield Event(
+            external_id=f"bench-{i}",
+            name=f"{city} {rng.choice(NAME_WORDS)} {i}",
+            description="Wydarzenie testowe " * rng.randrange(1, 6),
+            organizer=f"Organizator {i % 5000}",
+            organizer_email=f"kontakt{i}@example.com" if has_email else "",
+            organizer_phone=f"+48 {500000000 + i % 99999999}" if has_phone else "",
+            date_start=day.isoformat(),
+            date_end=(day + timedelta(days=rng.randrange(3))).isoformat(),
+            location=f"{city} Arena {i % 50}",
+            city=city,
+            category=rng.choice(CATEGORIES),
+            source=rng.choice(SOURCES),
+            potential_score=rng.randint(1, 5),
+            estimated_audience=rng.choice((0, 300, 800, 2000, 4000, 8000, 20000)),
+        )
+
+
+def seed_statuses_and_leads(conn: sqlite3.Connection, seed: int = DEFAULT_SEED) -> int:
+    """Rozkłada statusy wydarzeń i dodaje leady dla co 10. wydarzenia; zwraca liczbę leadów"""
+    rng = random.Random(seed)
+    ids = [row[0] for row in conn.execute("SELECT id FROM events")]
+    conn.executemany("UPDATE events SET status = ? WHERE id = ?",
+                     ((rng.choice(EVENT_STATUSES), event_id) for event_id in ids if rng.random() < 0.4))
+    now = datetime.now().isoformat()
+    leads = [
+        (event_id, f"Firma {event_id}", "Jan Kowalski", f"lead{event_id}@example.com", "+48500000000",
+         rng.choice(LEAD_STATUSES), float(rng.choice((1490, 2490, 4990, 9990))),
+         rng.choice(('basic', 'standard', 'premium', 'enterprise')), now, now)
+        for event_id in ids[::10]
+    ]
+    conn.executemany('''
+        INSERT INTO leads (event_id, company, contact_person, email, phone, status, value, package,
+            created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', leads)
+    conn.commit()
+    return len(leads)
+
+
+# ============= POMIAR =============
+
+class BenchmarkSuite:
+    """Zbiera wyniki pomiarów (czas w ms na wywołanie, ops/s wg liczby operacji w wywołaniu)"""
+
+    def __init__(self, repeat: int = DEFAULT_REPEAT, only: Optional[str] = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: List[Dict[str, Any]] = []
+
+    def bench(self, name: str, size: Optional[int], fn: Callable[[], Any],
+              ops: int = 1, repeat: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if self.only and self.only not in name:
+            return None
+        timings = []
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return self.record(name, size, timings, ops)
+
+    def record(self, name: str, size: Optional[int], timings: List[float],
+               ops: int = 1) -> Optional[Dict[str, Any]]:
+        """Wynik z czasów zmierzonych poza suite (np. sama faza zapisu w datagen)"""
+        if self.only and self.only not in name:
+            return None
+        median = statistics.median(timings)
+        result = {
+            "name": name,
+            "size": size,
+            "repeat": len(timings),
+            "ops": ops,
+            "min_ms": round(min(timings) * 1000, 4),
+            "median_ms": round(median * 1000, 4),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+            "ops_per_sec": round(ops / median, 1) if median else None,
+        }
+        self.results.append(result)
+        print(f"  {name:<64} {result['median_ms']:>12.3f} ms  {result['ops_per_sec'] or 0:>14,.0f} ops/s",
+              file=sys.stderr)
+        return result
+
+
+def _list_events_cases() -> Iterator[Dict[str, Any]]:
+    keys = tuple(LIST_EVENTS_FILTERS)
+    for r in range(len(keys) + 1):
+        for combo in itertools.combinations(keys, r):
+            yield {key: LIST_EVENTS_FILTERS[key] for key in combo}
+
+
+def bench_storage(suite: BenchmarkSuite, size: int, workdir: str, seed: int):
+    """Zapis, odczyt i statystyki dla bazy z `size` wydarzeniami"""
+    db_path = os.path.join(workdir, f"bench_{size}.db")
+    db = Database(db_path)
+    suite.bench("ingest.save_events", size, lambda: db.save_events(generate_events(size, seed)),
+                ops=size, repeat=1)
+    lead_count = seed_statuses_and_leads(db.conn, seed)
+
+    offsets = itertools.count(size, SAVE_EVENT_SAMPLE)
+
+    def save_one_by_one():
+        for event in generate_events(SAVE_EVENT_SAMPLE, seed, offset=next(offsets)):
+            db.save_event(event)
+
+    suite.bench("ingest.save_event", size, save_one_by_one, ops=SAVE_EVENT_SAMPLE)
+    suite.bench("ingest.save_events_batch", size,
+                lambda: db.save_events(generate_events(SAVE_EVENT_SAMPLE, seed, offset=next(offsets))),
+                ops=SAVE_EVENT_SAMPLE)
+
+    suite.bench("db.get_events", size, lambda: db.get_events(limit=100))
+    suite.bench("db.get_events[status]", size, lambda: db.get_events(status='qualified', limit=100))
+    suite.bench("db.get_event_records", size, lambda: db.get_event_records(limit=100))
+    suite.bench("db.get_stats", size, db.get_stats)
+
+    bench_list_events(suite, size, db_path)
+
+    export_limit = min(size, EXPORT_SAMPLE)
+    events = db.get_events(limit=export_limit)
+    leads = [dict(row) for row in db.conn.execute("SELECT * FROM leads LIMIT ?", (export_limit,))]
+    suite.bench("utils.export_events_to_csv", size, lambda: utils.export_events_to_csv(events), ops=len(events))
+    suite.bench("utils.export_leads_to_csv", size, lambda: utils.export_leads_to_csv(leads), ops=lead_count)
+    suite.bench("utils.export_to_json", size, lambda: utils.export_to_json(events, pretty=False), ops=len(events))
+    if snapshot.PYARROW_AVAILABLE:
+        for fmt in snapshot.FORMATS:
+            suite.bench(f"snapshot.export[{fmt}]", size, lambda fmt=fmt: snapshot.export_snapshot(
+                db.conn, os.path.join(workdir, f"snapshot_{size}"), fmt=fmt, tables=["events"]),
+                ops=size, repeat=min(suite.repeat, 3))
+
+    def score_all():
+        for audience, category, email, phone in db.conn.execute(
+                "SELECT estimated_audience, category, organizer_email, organizer_phone FROM events"):
+            utils.calculate_potential_score(audience, category, bool(email), bool(phone))
+
+    suite.bench("utils.calculate_potential_score", size, score_all, ops=size, repeat=min(suite.repeat, 3))
+    db.conn.close()
+    os.unlink(db_path)
+
+
+def bench_datagen(suite: BenchmarkSuite, size: int, workdir: str, seed: int):
+    """datagen.generate na pustej bazie - ops/s = wstawione wiersze / czas zapisu (executemany + commit)"""
+    if suite.only and suite.only not in "datagen.generate":
+        return
+    timings, rows = [], 0
+    for attempt in range(min(suite.repeat, DATAGEN_REPEAT)):
+        db_path = os.path.join(workdir, f"datagen_{size}_{attempt}.db")
+        db = Database(db_path)
+        result = datagen.generate(db.conn, size, seed=seed)
+        db.conn.close()
+        os.unlink(db_path)
+        rows = result['events'] + result['leads'] + result['offers']
+        timings.append(rows / result['rows_per_second'])
+    suite.record("datagen.generate", size, timings, ops=rows)
+
+
+def bench_list_events(suite: BenchmarkSuite, size: int, db_path: str):
+    """Endpoint list_events wywoływany bezpośrednio (bez HTTP) dla każdej kombinacji filtrów"""
+    os.environ.setdefault("DATABASE_PATH", db_path)
+    import api
+
+    conn = sqlite3.connect(db_path, factory=api.DB_CONNECTION_FACTORY)
+    conn.row_factory = sqlite3.Row
+    loop = asyncio.new_event_loop()
+    defaults = dict.fromkeys(LIST_EVENTS_FILTERS)
+    try:
+        for filters in _list_events_cases():
+            params = {**defaults, **filters}
+            if params['status']:
+                params['status'] = api.EventStatus(params['status'])
+            if params['category']:
+                params['category'] = api.EventCategory(params['category'])
+            name = f"api.list_events[{'+'.join(filters) or 'none'}]"
+            suite.bench(name, size, lambda: loop.run_until_complete(
+                api.list_events(**params, limit=50, offset=0, fields=None, db=conn)))
+    finally:
+        loop.close()
+        conn.close()
+
+
+def bench_utils(suite: BenchmarkSuite, seed: int):
+    """Walidatory i formatowanie (niezależne od rozmiaru bazy)"""
+    rng = random.Random(seed)
+    n = UTILS_SAMPLE
+    emails = [f"user{i}@example.com" if i % 4 else f"user{i}-at-example" for i in range(n)]
+    phones = [f"+48 {rng.randrange(500000000, 899999999)}" for _ in range(n)]
+    nips = [f"{rng.randrange(10 ** 9, 10 ** 10)}" for _ in range(n)]
+    dates = [(date(2026, 1, 1) + timedelta(days=i % 365)).isoformat() for i in range(n)]
+    texts = [f"  <b>Opis</b> wydarzenia {i} z długim tekstem  " * 3 for i in range(n)]
+
+    for name, fn, values in (
+        ("utils.validate_email", utils.validate_email, emails),
+        ("utils.validate_phone", utils.validate_phone, phones),
+        ("utils.validate_nip", utils.validate_nip, nips),
+        ("utils.validate_date", utils.validate_date, dates),
+        ("utils.sanitize_string", utils.sanitize_string, texts),
+        ("utils.format_phone", utils.format_phone, phones),
+    ):
+        suite.bench(name, None, lambda fn=fn, values=values: [fn(v) for v in values], ops=n)
+
+
+# ============= RAPORT =============
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT, seed: int = DEFAULT_SEED,
+        only: Optional[str] = None) -> Dict[str, Any]:
+    """Uruchamia cały zestaw i zwraca raport gotowy do zapisu w JSON"""
+    suite = BenchmarkSuite(repeat=repeat, only=only)
+    with tempfile.TemporaryDirectory(prefix="streamflow-bench-") as workdir:
+        for size in sizes:
+            print(f"== {size:,} wydarzeń ==", file=sys.stderr)
+            bench_storage(suite, size, workdir, seed)
+            bench_datagen(suite, size, workdir, seed)
+    print("== utils ==", file=sys.stderr)
+    bench_utils(suite, seed)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": suite.results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Porównanie median z raportem bazowym (klucz: name + size)"""
+    base = {(r["name"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in report["results"]:
+        old = base.get((result["name"], result["size"]))
+        if not old or not old["median_ms"]:
+            continue
+        change = result["median_ms"] / old["median_ms"] - 1
+        verdict = "regression" if change > threshold else "improvement" if change < -threshold else "same"
+        rows.append({"name": result["name"], "size": result["size"], "baseline_ms": old["median_ms"],
+                     "median_ms": result["median_ms"], "change": round(change, 4), "verdict": verdict})
+    return rows
+
+
+def check_targets(report: Dict[str, Any], targets: Dict[str, float] = TARGETS) -> List[Dict[str, Any]]:
+    """Pomiary poniżej minimalnego ops/s z TARGETS"""
+    return [
+        {"name": r["name"], "size": r["size"], "ops_per_sec": r["ops_per_sec"], "target": targets[r["name"]]}
+        for r in report["results"]
+        if r["name"] in targets and (r["ops_per_sec"] or 0) < targets[r["name"]]
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StreamFlow - mikrobenchmarki')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Liczby wydarzeń')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Powtórzenia na pomiar')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Ziarno generatora danych')
+    parser.add_argument('--only', help='Tylko pomiary zawierające ten tekst w nazwie')
+    parser.add_argument('--output', help='Plik JSON z wynikami (domyślnie stdout)')
+    parser.add_argument('--compare', help='Raport bazowy JSON do porównania')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.seed, args.only)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report["comparison"] = compare(report, json.load(f))
+        for row in report["comparison"]:
+            if row["verdict"] != "same":
+                print(f"  {row['verdict']:<12} {row['name']} @ {row['size']}: "
+                      f"{row['baseline_ms']} -> {row['median_ms']} ms ({row['change']:+.1%})", file=sys.stderr)
+
+    report["target_failures"] = check_targets(report)
+    for row in report["target_failures"]:
+        print(f"  poniżej celu  {row['name']} @ {row['size']}: "
+              f"{row['ops_per_sec']:,.0f} < {row['target']:,} ops/s", file=sys.stderr)
+
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    if report["target_failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Kanał push (Server-Sent Events)
+Jeden broadcaster w procesie: ramka SSE budowana raz i rozsyłana do kolejek klientów;
+jeden watcher czyta zmiany z bazy niezależnie od liczby podłączonych dashboardów
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger('Broadcast')
+
+
+QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+POLL_INTERVAL = 1.0
+# Powyżej tylu zmienionych wierszy na raz klient dostaje 'resync' zamiast listy
+MAX_BATCH = 500
+
+EVENT_COLUMNS = ("id", "name", "date_start", "city", "category", "source", "potential_score",
+                 "status", "discovered_at", "updated_at")
+LEAD_COLUMNS = ("id", "event_id", "company", "status", "value", "package", "follow_up_date",
+                "created_at", "updated_at")
+# tabela -> (nazwa zdarzenia SSE, kolumny, kolumna utworzenia)
+WATCHED_TABLES = {
+    "events": ("events", EVENT_COLUMNS, "discovered_at"),
+    "leads": ("leads", LEAD_COLUMNS, "created_at"),
+}
+
+
+def format_event(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Ramka SSE: id, event i data (JSON w jednej linii)"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+def stats_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Różnice liczników (tylko niezerowe); listy {name, count} porównywane jako słowniki"""
+    delta = {}
+    for key, value in current.items():
+        before = previous.get(key)
+        if isinstance(value, list):
+            value = {item["name"]: item["count"] for item in value}
+            before = {item["name"]: item["count"] for item in before or []}
+        if isinstance(value, dict):
+            nested = stats_delta(before or {}, value)
+            if nested:
+                delta[key] = nested
+        elif (value or 0) != (before or 0):
+            delta[key] = round((value or 0) - (before or 0), 2)
+    for key in previous.keys() - current.keys():
+        if isinstance(previous[key], (int, float)) and previous[key]:
+            delta[key] = -previous[key]
+    return delta
+
+
+class Broadcaster:
+    """Rozsyła ramki do kolejek subskrybentów; wolny klient jest rozłączany (EventSource wznowi)"""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.last_id = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event: str, data: Any) -> int:
+        """Publikuje zdarzenie do wszystkich klientów, zwraca liczbę odbiorców"""
+        if not self.subscribers:
+            return 0
+        self.last_id += 1
+        frame = format_event(event, data, self.last_id)
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("Klient nie nadąża - rozłączam")
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+        return len(self.subscribers)
+
+    async def stream(self, queue: asyncio.Queue, first: bytes = b"",
+                     heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        """Strumień ramek jednego klienta z komentarzem keep-alive co heartbeat sekund"""
+        try:
+            yield b"retry: 3000\n\n" + first
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(queue)
+
+
+class ChangeWatcher:
+    """Jedno połączenie odpytuje PRAGMA data_version; przy zmianie czyta nowe wiersze i statystyki"""
+
+    def __init__(
+        self,
+        broadcaster: Broadcaster,
+        connect: Callable[[], sqlite3.Connection],
+        read_stats: Callable[[sqlite3.Connection], Dict[str, Any]],
+        interval: float = POLL_INTERVAL
+    ):
+        self.broadcaster = broadcaster
+        self.connect = connect
+        self.read_stats = read_stats
+        self.interval = interval
+        self.conn: Optional[sqlite3.Connection] = None
+        self.stats: Optional[Dict[str, Any]] = None
+        self.data_version: Optional[int] = None
+        self.watermarks: Dict[str, Tuple[str, int]] = {}
+        self.task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def ensure_running(self):
+        """Startuje watcher przy pierwszym kliencie (kończy się, gdy klientów brak)"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def wake(self):
+        """Zapis w tym procesie - sprawdź zmiany od razu, bez czekania na interwał"""
+        if self._wake is not None:
+            self._wake.set()
+
+    def open(self):
+        self.conn = self.connect()
+        self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        self.stats = self.read_stats(self.conn)
+        for table in WATCHED_TABLES:
+            row = self.conn.execute(
+                f"SELECT updated_at, id FROM {table} ORDER BY updated_at DESC, id DESC LIMIT 1").fetchone()
+            self.watermarks[table] = (row[0] or "", row[1]) if row else ("", 0)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+        self.stats = None
+
+    def poll(self) -> int:
+        """Publikuje zmiany od ostatniego odczytu; zwraca liczbę wysłanych zdarzeń"""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.data_version:
+            return 0
+        self.data_version = version
+        published = 0
+        for table, (event, columns, created_column) in WATCHED_TABLES.items():
+            rows = self._changed_rows(table, columns, created_column)
+            if rows:
+                self.broadcaster.publish(event, rows)
+                published += 1
+        stats = self.read_stats(self.conn)
+        delta = stats_delta(self.stats, stats)
+        self.stats = stats
+        if delta:
+            self.broadcaster.publish("stats", delta)
+            published += 1
+        return published
+
+    def _changed_rows(self, table: str, columns: tuple, created_column: str):
+        updated_at, last_id = self.watermarks[table]
+        cursor = self.conn.execute(f'''
+            SELECT {', '.join(columns)} FROM {table}
+            WHERE (updated_at, id) > (?, ?)
+            ORDER BY updated_at, id LIMIT ?
+        ''', (updated_at, last_id, MAX_BATCH + 1))
+        rows: List[Dict[str, Any]] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if not rows:
+            return rows
+        if len(rows) > MAX_BATCH:
+            # Import hurtowy - taniej przeładować widok niż pchać tysiące wierszy
+            row = self.conn.execute(
+                f"SELECT updated_at, id FROM {table} ORDER BY updated_at DESC, id DESC LIMIT 1").fetchone()
+            self.watermarks[table] = (row[0], row[1])
+            self.broadcaster.publish("resync", {"table": table})
+            return []
+        self.watermarks[table] = (rows[-1]["updated_at"], rows[-1]["id"])
+        for row in rows:
+            row["change"] = "created" if (row[created_column] or "") > updated_at else "updated"
+        return rows
+
+    async def run(self):
+        self._wake = asyncio.Event()
+        self.open()
+        try:
+            while self.broadcaster.subscribers:
+                try:
+                    self.poll()
+                except sqlite3.Error as e:
+                    logger.error(f"Odczyt zmian: {e}")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self.close()
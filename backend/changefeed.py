@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Dziennik zmian (change feed)
+Triggery na events/leads/offers zapisują (tabela, id, operacja) z monotoniczną wersją;
+jeden wpis na wiersz (starszy jest zastępowany), więc koszt synchronizacji klienta rośnie ze zmianami, nie z tabelą
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+TRACKED_TABLES = ('events', 'leads', 'offers')
+DEFAULT_LIMIT = 500
+
+
+def _triggers(table: str) -> str:
+    # INSERT OR REPLACE usuwa poprzedni wpis wiersza i nadaje nową wersję (AUTOINCREMENT - bez powtórek)
+    statements = []
+    for op, ref in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')):
+        statements.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_changes_{op} AFTER {op.upper()} ON {table} BEGIN
+        INSERT OR REPLACE INTO changes (table_name, row_id, op) VALUES ('{table}', {ref}.id, '{op}');
+    END;''')
+    return ''.join(statements)
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS changes (
+        version INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL, op TEXT NOT NULL, UNIQUE (table_name, row_id)
+    );
+''' + ''.join(_triggers(table) for table in TRACKED_TABLES)
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Najwyższa nadana wersja (0 dla pustego dziennika)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+
+def backfill(conn: sqlite3.Connection, after: Optional[Dict[str, int]] = None) -> int:
+    """
+    Pierwsze włączenie na istniejącej bazie: wpis 'insert' dla każdego wiersza (since=0 = pełna kopia).
+
+    after = {tabela: ostatnie id sprzed ładowania}: wpisy tylko dla nowszych wierszy,
+    po ładowaniu masowym z wyłączonymi triggerami (datagen) - także gdy dziennik nie jest pusty.
+    """
+    if after is None and current_version(conn):
+        return 0
+    cursor = conn.cursor()
+    for table in TRACKED_TABLES:
+        cursor.execute(f"INSERT OR IGNORE INTO changes (table_name, row_id, op) "
+                       f"SELECT '{table}', id, 'insert' FROM {table} WHERE id > ? ORDER BY id",
+                       ((after or {}).get(table, 0),))
+    conn.commit()
+    return current_version(conn)
+
+
+def _load_rows(conn: sqlite3.Connection, table: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"SELECT * FROM {table} WHERE id IN ({', '.join('?' * len(ids))})", ids)
+    columns = [d[0] for d in cursor.description]
+    return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+
+def read_changes(
+    conn: sqlite3.Connection,
+    since: int = 0,
+    limit: int = DEFAULT_LIMIT,
+    tables: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    Zmiany po wersji since (najstarsze pierwsze) z aktualną treścią wiersza.
+
+    'version' to kursor do następnego wywołania; bez has_more przeskakuje do bieżącej
+    wersji, także gdy filtr tables nic nie zwrócił.
+    """
+    tables = list(tables or TRACKED_TABLES)
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")  # spójny odczyt dziennika i wierszy
+    try:
+        version = current_version(conn)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f'''
+            SELECT version, table_name, row_id, op FROM changes
+            WHERE version > ? AND table_name IN ({', '.join('?' * len(tables))})
+            ORDER BY version LIMIT ?
+        ''', [since, *tables, limit + 1])
+        entries = cursor.fetchall()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        live: Dict[str, List[int]] = {}
+        for _, table, row_id, op in entries:
+            if op != 'delete':
+                live.setdefault(table, []).append(row_id)
+        rows = {table: _load_rows(conn, table, ids) for table, ids in live.items()}
+    finally:
+        if own_transaction:
+            conn.rollback()
+
+    changes = [
+        {'version': v, 'table': table, 'id': row_id, 'op': op,
+         'data': rows[table].get(row_id) if op != 'delete' else None}
+        for v, table, row_id, op in entries
+    ]
+    return {
+        'since': since,
+        'version': changes[-1]['version'] if has_more else max(version, since),
+        'current_version': version,
+        'has_more': has_more,
+        'changes': changes,
+    }
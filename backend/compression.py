@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Kompresja odpowiedzi HTTP
+Middleware gzip/brotli z progiem rozmiaru + payloady kompresowane raz przy starcie
+"""
+
+import gzip
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+DEFAULT_MINIMUM_SIZE = 1000
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Wybiera kodowanie z nagłówka Accept-Encoding (brotli ma pierwszeństwo)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if BROTLI_AVAILABLE and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Kompresuje treść wybranym kodowaniem"""
+    if encoding == "br":
+        return brotli.compress(body, quality=4 if level is None else level)
+    return gzip.compress(body, compresslevel=6 if level is None else level)
+
+
+class CompressionMiddleware:
+    """
+    Kompresuje odpowiedzi o rozmiarze >= minimum_size.
+
+    Odpowiedzi strumieniowe (kilka komunikatów body, np. SSE) oraz już
+    skompresowane (z Content-Encoding) przechodzą bez zmian.
+    """
+
+    def __init__(self, app, minimum_size: int = DEFAULT_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            passthrough = (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            )
+            if not passthrough:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start_message)
+            await send(message)
+            passthrough = True
+
+        await self.app(scope, receive, send_compressed)
+
+
+class PrecompressedPayload:
+    """Statyczna odpowiedź skompresowana raz (maksymalny poziom), serwowana z pamięci"""
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        self.variants: Dict[str, bytes] = {}
+        encodings = ["gzip", "br"] if BROTLI_AVAILABLE else ["gzip"]
+        for encoding in encodings:
+            compressed = compress(body, encoding, level=11 if encoding == "br" else 9)
+            if len(compressed) < len(body):
+                self.variants[encoding] = compressed
+
+    def response(self, accept_encoding: str) -> Response:
+        encoding = choose_encoding(accept_encoding)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding in self.variants:
+            headers["Content-Encoding"] = encoding
+            return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Generator realistycznych danych
+Miliony wydarzeń, leadów i ofert wstawiane wsadowo (do benchmarków i planowania pojemności)
+
+Uruchomienie:
+    python aggregator.py --generate 1000000 --seed 42
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import changefeed
+import funnel
+import geo
+from pricing import SERVICES, quote
+from utils import calculate_potential_score
+
+logger = logging.getLogger('EventAggregator')
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 50_000
+BULK_CACHE_SIZE = -262144  # 256 MB cache stron na czas ładowania
+BULK_JOURNAL_MODE = "MEMORY"  # dziennik rollbacku w pamięci na czas ładowania
+NEAR_DUPLICATE_RATE = 0.03  # ten sam event z innego źródła: inna pisownia, ta sama data
+
+# Miasto -> waga (~ populacja w tys.)
+CITIES = {
+    'Warszawa': 1860, 'Kraków': 800, 'Wrocław': 675, 'Łódź': 660, 'Poznań': 540, 'Gdańsk': 485,
+    'Szczecin': 390, 'Bydgoszcz': 330, 'Lublin': 335, 'Białystok': 295, 'Katowice': 285,
+    'Gdynia': 245, 'Częstochowa': 210, 'Radom': 200, 'Rzeszów': 198, 'Toruń': 196, 'Sosnowiec': 190,
+    'Kielce': 185, 'Gliwice': 175, 'Olsztyn': 170, 'Zabrze': 155, 'Bielsko-Biała': 168,
+    'Opole': 127, 'Zielona Góra': 139, 'Sopot': 35, 'Zakopane': 27,
+}
+
+# Kategoria (wartości EventCategory) -> (waga, mediana publiczności, wzorce nazw, organizatorzy)
+CATEGORIES = {
+    'Bieganie': (22, 1500, ('Półmaraton {city}', 'Maraton {city}', 'Bieg Niepodległości {city}',
+                            'Nocny Bieg {city}', '{city} Business Run'),
+                 ('Fundacja Sport', 'Biegam Bo Lubię', 'MOSiR {city}')),
+    'OCR': (8, 3000, ('Runmageddon {city}', 'Survival Race {city}', 'Barbarian Race {city}',
+                      'Hardcore Run {city}'),
+            ('Runmageddon Sp. z o.o.', 'Survival Race', 'Barbarian Race')),
+    'CrossFit': (6, 600, ('{city} Throwdown', 'CrossFit Open {city}', 'Fit Games {city}'),
+                 ('CrossFit {city}', 'Box {city}')),
+    'Fitness': (9, 2000, ('HYROX {city}', 'Fit Expo {city}', 'Fitness Day {city}'),
+                ('HYROX', 'Fit Events', 'Active Poland')),
+    'Siatkówka': (6, 4000, ('Turniej Siatkówki {city}', 'Puchar {city} w siatkówce'),
+                  ('PZPS', 'Klub Siatkarski {city}')),
+    'Piłka nożna': (8, 5000, ('Turniej Orlików {city}', 'Liga Szóstek {city}'),
+                    ('Akademia Piłkarska {city}', 'OZPN {city}')),
+    'Koszykówka': (4, 2500, ('Streetball {city}', 'Turniej 3x3 {city}'),
+                   ('PZKosz', 'Basket {city}')),
+    'MMA': (4, 6000, ('Gala MMA {city}', 'Fight Night {city}'),
+            ('KSW', 'Babilon MMA', 'Fight Club {city}')),
+    'E-sport': (7, 8000, ('{city} Esports Cup', 'LAN Party {city}', 'Game Arena {city}'),
+                ('ESL Polska', 'Esport {city}')),
+    'Festiwal': (9, 10000, ('Festiwal Sportu {city}', 'Letni Festiwal {city}', '{city} Street Festival'),
+                 ('Urząd Miasta {city}', 'Agencja Eventowa {city}')),
+    'Konferencja': (7, 400, ('Sport Business Summit {city}', 'Konferencja Fitness {city}'),
+                    ('Forum Sportu', 'Izba Gospodarcza {city}')),
+    'Targi': (4, 12000, ('Targi Sportowe {city}', 'Expo Sport {city}'),
+              ('MTP', 'Expo {city}')),
+    'Inne': (6, 800, ('Piknik Rodzinny {city}', 'Dzień Sportu {city}'),
+             ('Dom Kultury {city}', 'Stowarzyszenie {city}')),
+}
+
+SOURCES = {'GoOut.net': 40, 'Runmageddon.pl': 15, 'HYROX.com': 10, 'MTP.pl': 10, 'Manual': 25}
+VENUES = ('Arena', 'Stadion Miejski', 'Hala Sportowa', 'Park Miejski', 'Centrum Expo', 'Tor', 'Plaża')
+STREETS = ('Sportowa', 'Olimpijska', 'Parkowa', 'Długa', 'Kościuszki', 'Mickiewicza', 'Słowackiego',
+           'Piłsudskiego', 'Jana Pawła II', 'Polna', 'Leśna', 'Łąkowa', 'Targowa', 'Stadionowa')
+# Sezonowość: miesiąc -> waga (szczyt maj-wrzesień)
+MONTH_WEIGHTS = (3, 3, 5, 8, 12, 13, 12, 11, 12, 9, 6, 4)
+
+EVENT_STATUSES = {'new': 70, 'contacted': 12, 'qualified': 6, 'offer_sent': 5, 'won': 3, 'lost': 2,
+                  'rejected': 2}
+# Lejek leadów: status -> waga
+LEAD_PIPELINE = {'new': 35, 'active': 25, 'offer_sent': 15, 'negotiation': 8, 'won': 9, 'lost': 8}
+LEAD_STATUSES_WITH_OFFER = {'offer_sent': 'sent', 'negotiation': 'sent', 'won': 'accepted', 'lost': 'rejected'}
+PACKAGE_WEIGHTS = {'basic': 35, 'standard': 40, 'premium': 20, 'enterprise': 5}
+FIRST_NAMES = ('Anna', 'Piotr', 'Katarzyna', 'Tomasz', 'Magdalena', 'Michał', 'Agnieszka', 'Paweł')
+LAST_NAMES = ('Nowak', 'Kowalski', 'Wiśniewska', 'Wójcik', 'Kamińska', 'Lewandowski', 'Zielińska')
+
+
+def _lookup_table(weights: Dict[Any, float], size: int = 10_000) -> tuple:
+    """Tablica do losowania z wagami jednym indeksowaniem: table[int(random() * len(table))]"""
+    total = sum(weights.values())
+    return tuple(itertools.chain.from_iterable(
+        itertools.repeat(value, max(1, round(weight / total * size))) for value, weight in weights.items()
+    ))
+
+
+def _lognormal_table(sigma: float, size: int = 4096) -> tuple:
+    """Kwantyle rozkładu log-normalnego (mediana 1) - losowanie bez liczenia exp/gauss"""
+    normal = NormalDist(0, sigma)
+    return tuple(math.exp(normal.inv_cdf((k + 0.5) / size)) for k in range(size))
+
+
+_EVENT_INSERT = '''
+    INSERT OR IGNORE INTO events (external_id, hash, name, description, organizer, organizer_contact,
+        organizer_email, organizer_phone, date_start, date_end, location, city, country, category,
+        subcategory, source, source_url, potential_score, estimated_audience, status, discovered_at,
+        updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PL', ?, '', ?, ?, ?, ?, ?, ?, ?)
+'''
+_LEAD_INSERT = '''
+    INSERT INTO leads (event_id, company, contact_person, email, phone, status, value, package,
+        offer_sent_date, notes, follow_up_date, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, '', ?, ?, ?)
+'''
+_OFFER_INSERT = '''
+    INSERT INTO offers (number, lead_id, event_id, package, base_price, additional_services,
+        total_price, valid_until, status, created_at, sent_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+_SLUG_TABLE = str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ .', 'acelnoszzACELNOSZZ--')
+
+
+def _slug(text: str) -> str:
+    return text.translate(_SLUG_TABLE).lower()
+
+
+def _near_duplicate(name: str, location: str, rng: random.Random) -> Tuple[str, str]:
+    """Ta sama impreza opisana przez inne źródło: wielkość liter, rok, skrót lokalizacji"""
+    variant = rng.randrange(4)
+    if variant == 0:
+        return name.upper(), location
+    if variant == 1:
+        return f"{name} 2026", location
+    if variant == 2:
+        return name.replace(' ', '  ', 1), location.replace('Stadion Miejski', 'Stadion')
+    return f"{name} - edycja {rng.randint(2, 12)}", location
+
+
+def _calendar(years: Dict[int, float]) -> tuple:
+    """Tablica dni (date_start, możliwe date_end) z wagami sezonowymi"""
+    weights = {}
+    for year, year_weight in years.items():
+        day = date(year, 1, 1)
+        while day.year == year:
+            end_dates = tuple((day + timedelta(days=d)).isoformat() for d in (0, 0, 0, 1, 2))
+            weights[(day.isoformat(), end_dates)] = MONTH_WEIGHTS[day.month - 1] * year_weight
+            day += timedelta(days=1)
+    return _lookup_table(weights, size=50_000)
+
+
+def generate_event_rows(count: int, seed: int = DEFAULT_SEED, start_index: int = 0) -> Iterator[tuple]:
+    """Wiersze events w kolejności _EVENT_INSERT (bez tworzenia obiektów Event)"""
+    rng = random.Random(seed * 1_000_003 + start_index)
+    rand = rng.random
+    cities = _lookup_table(CITIES)
+    categories = _lookup_table({k: v[0] for k, v in CATEGORIES.items()})
+    sources, statuses = _lookup_table(SOURCES), _lookup_table(EVENT_STATUSES)
+    calendar, audience_factor = _calendar({2026: 2.0, 2027: 1.0}), _lognormal_table(1.1)
+    n_cities, n_categories, n_sources, n_statuses = len(cities), len(categories), len(sources), len(statuses)
+    n_calendar, n_audience = len(calendar), len(audience_factor)
+    source_hosts = {source: source.lower() for source in SOURCES}
+    emails: Dict[str, str] = {}
+    now = datetime.now().isoformat()
+    recent: List[tuple] = []
+    seen = set()
+    produced = 0
+    while produced < count:
+        i = start_index + produced
+        category = categories[int(rand() * n_categories)]
+        _, median_audience, patterns, organizers = CATEGORIES[category]
+        if recent and rand() < NEAR_DUPLICATE_RATE:
+            name, location, city, organizer, day, category = recent[int(rand() * len(recent))]
+            name, location = _near_duplicate(name, location, rng)
+            median_audience = CATEGORIES[category][1]
+        else:
+            city = cities[int(rand() * n_cities)]
+            name = patterns[int(rand() * len(patterns))].format(city=city)
+            organizer = organizers[int(rand() * len(organizers))].format(city=city)
+            location = (f"{city}, {VENUES[int(rand() * len(VENUES))]}, "
+                        f"ul. {STREETS[int(rand() * len(STREETS))]} {int(rand() * 120) + 1}")
+            day = calendar[int(rand() * n_calendar)]
+            entry = (name, location, city, organizer, day, category)
+            if len(recent) < 1000:
+                recent.append(entry)
+            else:
+                recent[int(rand() * 1000)] = entry
+        # Publiczność log-normalna: większość małych imprez, długi ogon dużych
+        audience = int(min(audience_factor[int(rand() * n_audience)] * median_audience, 200_000)) // 10 * 10
+        has_email = rand() < 0.55
+        has_phone = rand() < 0.35
+        email = ""
+        if has_email:
+            email = emails.get(organizer) or emails.setdefault(organizer, f"kontakt@{_slug(organizer)}.pl")
+        phone = f"+48 {500000000 + int(rand() * 400000000)}" if has_phone else ""
+        date_start, end_dates = day
+        source = sources[int(rand() * n_sources)]
+        event_hash = hashlib.md5(f"{name}{date_start}{location}{organizer}".encode()).hexdigest()
+        if event_hash in seen:  # identyczny wariant (ten sam hash) - losuj jeszcze raz
+            continue
+        seen.add(event_hash)
+        produced += 1
+        yield (
+            f"gen-{i}", event_hash, name,
+            f"{category} - {name}", organizer, organizer if has_email or has_phone else "",
+            email, phone, date_start, end_dates[int(rand() * 5)],
+            location, city, category, source, f"https://{source_hosts[source]}/e/{i}",
+            calculate_potential_score(audience, category, has_email, has_phone), audience,
+            statuses[int(rand() * n_statuses)], now, now,
+        )
+
+
+def generate_lead_rows(events: Sequence[tuple], seed: int = DEFAULT_SEED) -> List[tuple]:
+    """
+    Leady dla części wydarzeń (częściej dla wysokiego scoringu), wg lejka LEAD_PIPELINE.
+
+    Zwraca (external_id wydarzenia, wiersz leada bez event_id, oferta bez numeru lub None).
+    """
+    rng = random.Random(seed * 1_000_003 + 1)
+    rand = rng.random
+    pipeline, packages = _lookup_table(LEAD_PIPELINE), _lookup_table(PACKAGE_WEIGHTS)
+    service_codes = tuple(SERVICES)
+    leads = []
+    for event in events:
+        external_id, organizer, date_start, score = event[0], event[4], event[8], event[15]
+        if rand() >= 0.01 * score * score:
+            continue
+        status = pipeline[int(rand() * len(pipeline))]
+        package = packages[int(rand() * len(packages))]
+        services = rng.sample(service_codes, rng.choice((0, 0, 1, 1, 2, 3)))
+        priced = quote(package, services, rng.choice((0, 0, 0, 5, 10)))
+        created = datetime.fromisoformat(date_start) - timedelta(days=rng.randint(14, 120))
+        created_at = created.isoformat()
+        person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        offer_status = LEAD_STATUSES_WITH_OFFER.get(status)
+        sent_at = (created + timedelta(days=rng.randint(1, 7))).isoformat() if offer_status else None
+        follow_up = (created + timedelta(days=rng.randint(3, 21))).date().isoformat() \
+            if status in ('new', 'active', 'offer_sent', 'negotiation') else None
+        lead = (organizer, person, f"{_slug(person).replace('-', '.')}@example.pl",
+                f"+48 {500000000 + int(rand() * 400000000)}", status, priced.net, package,
+                sent_at, follow_up, created_at, created_at)
+        offer = None
+        if offer_status:
+            offer = (f"{created.year}/{created.month:02d}", package, priced.base_price, json.dumps(services),
+                     priced.net, (created + timedelta(days=14)).isoformat(), offer_status, created_at, sent_at)
+        leads.append((external_id, lead, offer))
+    return leads
+
+
+def _chunk(count: int, seed: int, start_index: int) -> Tuple[List[tuple], List[tuple]]:
+    events = list(generate_event_rows(count, seed, start_index))
+    return events, generate_lead_rows(events, seed + start_index)
+
+
+def _chunks(events: int, seed: int, start_index: int, chunk_size: int,
+            workers: int) -> Iterator[Tuple[List[tuple], List[tuple]]]:
+    """Paczki (wydarzenia, leady) w stałej kolejności; przy workers > 1 generowane w procesach"""
+    end = start_index + events
+    starts = range(start_index, end, chunk_size)
+    if workers <= 1:
+        for chunk_start in starts:
+            yield _chunk(min(chunk_size, end - chunk_start), seed, chunk_start)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk_start in starts:
+            pending.append(pool.submit(_chunk, min(chunk_size, end - chunk_start), seed, chunk_start))
+            if len(pending) > workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _last_id(conn: sqlite3.Connection, table: str) -> int:
+    """Ostatnie przydzielone id tabeli AUTOINCREMENT (kolejne wstawienia dostają +1, +2, ...)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    return row[0] if row else 0
+
+
+def _secondary_indexes(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """Nieunikalne indeksy events/leads/offers (unikalne zostają - na nich opiera się deduplikacja)"""
+    return conn.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ('events', 'leads', 'offers')
+            AND sql NOT LIKE 'CREATE UNIQUE%'
+    ''').fetchall()
+
+
+def _bulk_triggers(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """
+    Triggery zastępowane przeliczeniem na końcu: geokodowanie (punkt po punkcie do R*Tree
+    ~2x wolniej niż backfill), oznaczanie wydarzeń dla lejka (pełny rebuild i tak szybszy)
+    i dziennik zmian (jeden INSERT ... SELECT zamiast wpisu na wiersz)
+    """
+    return conn.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger' AND (name LIKE 'trg_events_geo_insert%' OR name LIKE 'trg_funnel_%'
+            OR name GLOB 'trg_*_changes_*')
+    ''').fetchall()
+
+
+def _set_journal_mode(conn: sqlite3.Connection, mode: str) -> str:
+    """journal_mode poza transakcją; WAL z otwartymi połączeniami innych procesów zostaje bez zmian"""
+    try:
+        return conn.execute(f"PRAGMA journal_mode = {mode}").fetchone()[0]
+    except sqlite3.OperationalError:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+
+def generate(
+    conn: sqlite3.Connection,
+    events: int,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Wstawia `events` wydarzeń z leadami i ofertami do istniejącego schematu.
+
+    Wiersze są generowane paczkami (równolegle w `workers` procesach, domyślnie wg liczby CPU)
+    i wstawiane przez executemany w jednej transakcji zapisu (BEGIN IMMEDIATE) - id nowych wierszy
+    liczone są w Pythonie, bez zapytań między paczkami. Na czas ładowania wyłączany jest fsync
+    i dziennik na dysku (journal_mode=MEMORY, baza WAL używana przez inne procesy zostaje w WAL),
+    a przy ładowaniu większym niż obecna tabela nieunikalne indeksy są usuwane i budowane od nowa
+    na końcu (tak samo geokodowanie, rollup lejka i dziennik zmian).
+    Numery ofert kontynuują licznik sequencer'a (seria OF), który jest na końcu podbijany.
+
+    rows_per_second = wiersze / czas zapisu (executemany + commit); czas generowania wierszy
+    i przebudowy indeksów podawany osobno (generate_seconds, rebuild_seconds).
+    """
+    workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+    start = time.perf_counter()
+    totals = {'events': 0, 'leads': 0, 'offers': 0}
+    timings = {'generate': 0.0, 'insert': 0.0, 'rebuild': 0.0}
+    conn.execute("CREATE TABLE IF NOT EXISTS number_sequences (series TEXT NOT NULL, period TEXT NOT NULL, "
+                 "last_value INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (series, period))")
+    conn.commit()
+    pragmas = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in ('synchronous', 'cache_size')}
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute(f"PRAGMA cache_size = {BULK_CACHE_SIZE}")
+    _set_journal_mode(conn, BULK_JOURNAL_MODE)
+    try:
+        # Usunięcie indeksów i triggerów w tej samej transakcji - błąd ładowania przywraca je rollbackiem
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            offer_counters = dict(conn.execute("SELECT period, last_value FROM number_sequences WHERE series = 'OF'"))
+            existing = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            offset = conn.execute("SELECT COALESCE(MAX(CAST(SUBSTR(external_id, 5) AS INTEGER)) + 1, 0) "
+                                  "FROM events WHERE external_id LIKE 'gen-%'").fetchone()[0]
+            indexes = _secondary_indexes(conn) if events >= existing else []
+            for name, _ in indexes:
+                conn.execute(f"DROP INDEX {name}")
+            triggers = _bulk_triggers(conn) if events >= existing else []
+            for name, _ in triggers:
+                conn.execute(f"DROP TRIGGER {name}")
+            last_ids = {table: _last_id(conn, table) for table in changefeed.TRACKED_TABLES}
+            next_event, next_lead = last_ids['events'] + 1, last_ids['leads'] + 1
+            chunks = _chunks(events, seed, offset, chunk_size, workers)
+            while True:
+                tick = time.perf_counter()
+                chunk, leads = next(chunks, (None, None))
+                timings['generate'] += time.perf_counter() - tick
+                if chunk is None:
+                    break
+                tick = time.perf_counter()
+                inserted = conn.executemany(_EVENT_INSERT, chunk).rowcount
+                if inserted == len(chunk):
+                    event_ids = {row[0]: event_id for event_id, row in enumerate(chunk, start=next_event)}
+                else:  # hash już w bazie (wcześniejsze uruchomienie) - wiersz pominięty przez OR IGNORE
+                    event_ids = dict(conn.execute("SELECT external_id, id FROM events WHERE id >= ?", (next_event,)))
+                    leads = [lead for lead in leads if lead[0] in event_ids]
+                next_event += inserted
+                leads = [(event_ids[external_id], lead, offer) for external_id, lead, offer in leads]
+                conn.executemany(_LEAD_INSERT, [(event_id, *lead) for event_id, lead, _ in leads])
+                offers = []
+                for lead_id, (event_id, _, offer) in enumerate(leads, start=next_lead):
+                    if offer:
+                        period = offer[0]
+                        offer_counters[period] = offer_counters.get(period, 0) + 1
+                        offers.append((f"OF/{period}/{offer_counters[period]:04d}", lead_id, event_id, *offer[1:]))
+                next_lead += len(leads)
+                conn.executemany(_OFFER_INSERT, offers)
+                timings['insert'] += time.perf_counter() - tick
+                totals['events'] += inserted
+                totals['leads'] += len(leads)
+                totals['offers'] += len(offers)
+                logger.info(f"Wygenerowano {totals['events']:,}/{events:,} wydarzeń")
+            tick = time.perf_counter()
+            conn.executemany('''
+                INSERT INTO number_sequences (series, period, last_value) VALUES ('OF', ?, ?)
+                ON CONFLICT (series, period) DO UPDATE SET last_value = MAX(last_value, excluded.last_value)
+            ''', list(offer_counters.items()))
+            conn.commit()
+            timings['insert'] += time.perf_counter() - tick
+        except BaseException:
+            conn.rollback()
+            raise
+        tick = time.perf_counter()
+        for _, sql in indexes:
+            conn.execute(sql)
+        for _, sql in triggers:
+            conn.execute(sql)
+        dropped = {name for name, _ in triggers}
+        if any(name.startswith('trg_events_geo') for name in dropped):
+            geo.backfill(conn)
+        if any(name.startswith('trg_funnel') for name in dropped):
+            funnel.rebuild(conn)
+        if any('_changes_' in name for name in dropped):
+            changefeed.backfill(conn, after=last_ids)
+        conn.commit()
+        timings['rebuild'] = time.perf_counter() - tick
+    finally:
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        _set_journal_mode(conn, journal_mode)
+    duration = time.perf_counter() - start
+    rows_total = sum(totals.values())
+    return {
+        **totals,
+        'duplicates_skipped': events - totals['events'],
+        'near_duplicates_rate': NEAR_DUPLICATE_RATE,
+        'duration_seconds': round(duration, 2),
+        'generate_seconds': round(timings['generate'], 2),
+        'insert_seconds': round(timings['insert'], 2),
+        'rebuild_seconds': round(timings['rebuild'], 2),
+        'rows_per_second': round(rows_total / timings['insert']) if timings['insert'] else None,
+        'workers': workers,
+        'seed': seed,
+    }
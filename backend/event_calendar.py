@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Kalendarz wydarzeń
+Generowane kolumny rok/miesiąc/tydzień ISO z date_start (TEXT) i kubełki dzień/tydzień/miesiąc
+z liczbą wydarzeń, widownią i top wydarzeniami w jednym zapytaniu (funkcje okna)
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# Czwartek tygodnia ISO wyznacza rok i numer tygodnia (SQLite 3.40 nie ma jeszcze %V)
+_ISO_THURSDAY = "date_start, '-3 days', 'weekday 4'"
+
+# Kolumna -> wyrażenie (VIRTUAL: liczone przy odczycie, zapisywane tylko w indeksach)
+GENERATED_COLUMNS = {
+    "start_year": "CAST(strftime('%Y', date_start) AS INTEGER)",
+    "start_month": "CAST(strftime('%m', date_start) AS INTEGER)",
+    "start_week": f"strftime('%Y', {_ISO_THURSDAY}) || '-W' || "
+                  f"printf('%02d', (strftime('%j', {_ISO_THURSDAY}) - 1) / 7 + 1)",
+}
+
+INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_events_year_month ON events(start_year, start_month);
+    CREATE INDEX IF NOT EXISTS idx_events_week ON events(start_week);
+'''
+
+# granularity -> (klucz kubełka, warunek zakresu po indeksie)
+GRANULARITIES = {
+    "day": ("substr(date_start, 1, 10)", "date_start >= ? AND date_start < ?"),
+    "week": ("start_week", "start_week BETWEEN ? AND ?"),
+    "month": ("printf('%04d-%02d', start_year, start_month)",
+              "(start_year, start_month) BETWEEN (?, ?) AND (?, ?)"),
+}
+
+TOP_COLUMNS = ("id", "name", "date_start", "city", "category", "potential_score", "estimated_audience")
+
+_CALENDAR_QUERY = '''
+    SELECT * FROM (
+        SELECT {key} AS bucket, {columns},
+            COUNT(*) OVER bucket AS events,
+            COALESCE(SUM(estimated_audience) OVER bucket, 0) AS audience,
+            ROW_NUMBER() OVER (PARTITION BY {key}
+                               ORDER BY potential_score DESC, estimated_audience DESC, id) AS rank
+        FROM events
+        WHERE {where}
+        WINDOW bucket AS (PARTITION BY {key})
+    ) WHERE rank <= ?
+    ORDER BY bucket, rank
+'''
+
+
+def add_date_columns(conn: sqlite3.Connection):
+    """Dodaje brakujące kolumny generowane i ich indeksy (idempotentne)"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(events)")}
+    for name, expression in GENERATED_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {name} GENERATED ALWAYS AS ({expression}) VIRTUAL")
+    conn.executescript(INDEXES)
+
+
+def iso_week(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def bucket_start(granularity: str, key: str) -> str:
+    """Pierwszy dzień kubełka (poniedziałek tygodnia ISO, pierwszy dzień miesiąca)"""
+    if granularity == "week":
+        year, week = key.split("-W")
+        return date.fromisocalendar(int(year), int(week), 1).isoformat()
+    if granularity == "month":
+        return f"{key}-01"
+    return key
+
+
+def _range_params(granularity: str, start: date, end: date) -> list:
+    if granularity == "day":
+        return [start.isoformat(), (end + timedelta(days=1)).isoformat()]
+    if granularity == "week":
+        return [iso_week(start), iso_week(end)]
+    return [start.year, start.month, end.year, end.month]
+
+
+def calendar(
+    conn: sqlite3.Connection,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    top: int = 3,
+    category: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Kubełki z wydarzeniami (puste pominięte); tydzień/miesiąc obejmuje pełne okresy zakresu"""
+    key, where = GRANULARITIES[granularity]
+    params = _range_params(granularity, start, end)
+    if category:
+        where += " AND category = ?"
+        params.append(category)
+    query = _CALENDAR_QUERY.format(key=key, where=where, columns=", ".join(TOP_COLUMNS))
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(query, [*params, max(top, 1)])
+
+    buckets: List[Dict[str, Any]] = []
+    for bucket, *values, events, audience, rank in cursor.fetchall():
+        if not buckets or buckets[-1]["key"] != bucket:
+            buckets.append({"key": bucket, "start": bucket_start(granularity, bucket),
+                            "events": events, "audience": audience, "top": []})
+        if rank <= top:
+            buckets[-1]["top"].append(dict(zip(TOP_COLUMNS, values)))
+    return buckets
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Follow-upy leadów
+Kolejka zaległych i nadchodzących follow-upów z indeksu (follow_up_date, status) oraz
+scheduler przypomnień: heap terminów w pamięci, aktualizowany z dziennika zmian zamiast skanowania leads
+"""
+
+import asyncio
+import heapq
+import logging
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import changefeed
+
+logger = logging.getLogger('FollowUps')
+
+
+CLOSED_STATUSES = ('won', 'lost')
+# Follow-up z samą datą przypomina na początku dnia pracy
+DAY_START = time(9, 0)
+HORIZON = timedelta(days=1)
+POLL_INTERVAL = 30.0
+
+DUE_COLUMNS = ("id", "event_id", "company", "contact_person", "email", "phone", "status",
+               "value", "package", "follow_up_date")
+
+
+def due_at(follow_up_date: Optional[str]) -> Optional[datetime]:
+    """Termin przypomnienia: data -> DAY_START tego dnia, data z godziną bez zmian"""
+    if not follow_up_date:
+        return None
+    try:
+        if len(follow_up_date) == 10:
+            return datetime.combine(date.fromisoformat(follow_up_date), DAY_START)
+        return datetime.fromisoformat(follow_up_date)
+    except ValueError:
+        return None
+
+
+def due_leads(
+    conn: sqlite3.Connection,
+    until: date,
+    since: Optional[date] = None,
+    status: Optional[str] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Otwarte leady z follow-upem do until włącznie (od since, domyślnie także zaległe), najwcześniejsze pierwsze"""
+    # Porównanie z następnym dniem obejmuje też wartości z godziną ('2026-01-05T10:00' < '2026-01-06')
+    query = f'''
+        SELECT {', '.join(DUE_COLUMNS)} FROM leads
+        WHERE follow_up_date IS NOT NULL AND follow_up_date < ?
+    '''
+    params: list = [(until + timedelta(days=1)).isoformat()]
+    if since:
+        query += " AND follow_up_date >= ?"
+        params.append(since.isoformat())
+    if status:
+        query += " AND status = ?"
+        params.append(status)
+    else:
+        query += f" AND status NOT IN ({', '.join('?' * len(CLOSED_STATUSES))})"
+        params.extend(CLOSED_STATUSES)
+    query += " ORDER BY follow_up_date, id LIMIT ?"
+    params.append(limit)
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(query, params)
+    now = datetime.now()
+    return [{**dict(zip(DUE_COLUMNS, row)), "overdue": (due_at(row[-1]) or now) < now} for row in cursor.fetchall()]
+
+
+class FollowUpScheduler:
+    """
+    Heap (termin, lead_id) na okno HORIZON do przodu.
+
+    Okno ładowane zakresem indeksu, zmiany leadów czytane z dziennika zmian;
+    nieaktualne wpisy heapu pomijane przy zdjęciu (lazy deletion).
+    Zaległe przy starcie nie są powtarzane - obsługuje je /api/leads/due.
+    """
+
+    def __init__(
+        self,
+        notify: Callable[[Dict[str, Any]], None],
+        horizon: timedelta = HORIZON,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.notify = notify
+        self.horizon = horizon
+        self.clock = clock
+        self.heap: List[Tuple[datetime, int]] = []
+        self.pending: Dict[int, datetime] = {}
+        self.loaded_until: Optional[datetime] = None
+        self.version = 0
+
+    def schedule(self, lead_id: int, follow_up_date: Optional[str], status: Optional[str]):
+        """Ustawia (albo kasuje) przypomnienie leadu, jeśli mieści się w załadowanym oknie"""
+        due = due_at(follow_up_date)
+        if due is None or status in CLOSED_STATUSES or due >= self.loaded_until:
+            self.pending.pop(lead_id, None)
+            return
+        if self.pending.get(lead_id) == due:
+            return  # termin bez zmian (np. edycja notatek) - także gdy właśnie minął i czeka na fire_due
+        if due < self.clock():
+            self.pending.pop(lead_id, None)
+            return
+        self.pending[lead_id] = due
+        heapq.heappush(self.heap, (due, lead_id))
+
+    def _load_window(self, conn: sqlite3.Connection, start: datetime, end: datetime):
+        # Zakres po indeksie w pełnych dniach - okno przesuwa się raz na dobę
+        end_day = end.date() + timedelta(days=1)
+        rows = conn.execute(f'''
+            SELECT id, follow_up_date, status FROM leads
+            WHERE follow_up_date >= ? AND follow_up_date < ?
+                AND status NOT IN ({', '.join('?' * len(CLOSED_STATUSES))})
+        ''', (start.date().isoformat(), end_day.isoformat(), *CLOSED_STATUSES)).fetchall()
+        # Okno przesuwane dopiero po udanym odczycie - błąd zapytania nie zostawia luki
+        self.loaded_until = datetime.combine(end_day, time.min)
+        for lead_id, follow_up_date, status in rows:
+            self.schedule(lead_id, follow_up_date, status)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_until is not None
+
+    def load(self, conn: sqlite3.Connection):
+        """Start: wersja dziennika i okno [teraz, teraz + horizon]"""
+        self.heap, self.pending, self.loaded_until = [], {}, None
+        self.version = changefeed.current_version(conn)
+        now = self.clock()
+        self._load_window(conn, now, now + self.horizon)
+
+    def refresh(self, conn: sqlite3.Connection) -> int:
+        """Zmiany leadów z dziennika + przesunięcie okna; zwraca liczbę przeczytanych zmian"""
+        seen = 0
+        while True:
+            feed = changefeed.read_changes(conn, since=self.version, tables=['leads'])
+            for change in feed['changes']:
+                data = change['data'] or {}
+                self.schedule(change['id'], data.get('follow_up_date'), data.get('status'))
+            seen += len(feed['changes'])
+            self.version = feed['version']
+            if not feed['has_more']:
+                break
+        end = self.clock() + self.horizon
+        if end >= self.loaded_until:
+            self._load_window(conn, self.loaded_until, end)
+        return seen
+
+    def fire_due(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """Wysyła przypomnienia, których termin minął"""
+        now = self.clock()
+        fired = []
+        while self.heap and self.heap[0][0] <= now:
+            due, lead_id = heapq.heappop(self.heap)
+            if self.pending.get(lead_id) != due:
+                continue
+            del self.pending[lead_id]
+            cursor = conn.execute(f"SELECT {', '.join(DUE_COLUMNS)} FROM leads WHERE id = ?", (lead_id,))
+            row = cursor.fetchone()
+            if row is None:
+                continue
+            reminder = dict(zip(DUE_COLUMNS, row))
+            self.notify(reminder)
+            fired.append(reminder)
+        return fired
+
+    def seconds_until_next(self, interval: float = POLL_INTERVAL) -> float:
+        if not self.heap:
+            return interval
+        return min(interval, max(0.0, (self.heap[0][0] - self.clock()).total_seconds()))
+
+    async def run(self, connect: Callable[[], sqlite3.Connection], stop: asyncio.Event,
+                  interval: float = POLL_INTERVAL):
+        """Pętla przypomnień do ustawienia stop; błąd bazy (także przy starcie) ponawiany co interval"""
+        conn = connect()
+        try:
+            while not stop.is_set():
+                try:
+                    if self.loaded:
+                        self.refresh(conn)
+                    else:
+                        self.load(conn)
+                    self.fire_due(conn)
+                except sqlite3.Error as e:
+                    logger.error(f"Przypomnienia: {e}")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.seconds_until_next(interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            conn.close()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Lejek konwersji
+Wydarzenie -> lead -> oferta -> wygrana wg źródła, kategorii i miesiąca odkrycia wydarzenia.
+Rollup aktualizowany przyrostowo: triggery oznaczają zmienione wydarzenia, refresh() przelicza
+tylko ich wkład (grupowane złączenie) i koryguje sumy grup o różnicę
+"""
+
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils import calculate_conversion_rate
+
+# Wymiary = kolumny rollupu (whitelist dla group_by)
+DIMENSIONS = ("source", "category", "month")
+
+STAGES = ("events", "engaged", "leads", "offered", "won", "won_value")
+
+SCHEMA = '''
+    CREATE INDEX IF NOT EXISTS idx_leads_event ON leads(event_id);
+    CREATE INDEX IF NOT EXISTS idx_offers_lead ON offers(lead_id);
+    CREATE TABLE IF NOT EXISTS funnel_dirty (event_id INTEGER PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS funnel_events (
+        event_id INTEGER PRIMARY KEY, source TEXT NOT NULL, category TEXT NOT NULL, month TEXT NOT NULL,
+        leads INTEGER NOT NULL, offered INTEGER NOT NULL, won INTEGER NOT NULL, won_value REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS funnel_rollup (
+        source TEXT NOT NULL, category TEXT NOT NULL, month TEXT NOT NULL,
+        events INTEGER NOT NULL, engaged INTEGER NOT NULL, leads INTEGER NOT NULL,
+        offered INTEGER NOT NULL, won INTEGER NOT NULL, won_value REAL NOT NULL,
+        PRIMARY KEY (source, category, month)
+    ) WITHOUT ROWID;
+'''
+
+_MARK = "INSERT OR IGNORE INTO funnel_dirty (event_id) SELECT {expr} WHERE {expr} IS NOT NULL;"
+_LEAD_EVENT = "(SELECT event_id FROM leads WHERE id = {ref}.lead_id)"
+
+# UPDATE tylko przy zmianie kolumn lejka - upsert agregatora nadpisuje je tymi samymi wartościami
+TRIGGERS = f'''
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_events_insert AFTER INSERT ON events BEGIN
+        {_MARK.format(expr="NEW.id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_events_update AFTER UPDATE OF source, category, discovered_at ON events
+    WHEN OLD.source IS NOT NEW.source OR OLD.category IS NOT NEW.category
+        OR OLD.discovered_at IS NOT NEW.discovered_at BEGIN
+        {_MARK.format(expr="NEW.id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_events_delete AFTER DELETE ON events BEGIN
+        {_MARK.format(expr="OLD.id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_leads_insert AFTER INSERT ON leads BEGIN
+        {_MARK.format(expr="NEW.event_id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_leads_update AFTER UPDATE OF event_id, status, value ON leads
+    WHEN OLD.event_id IS NOT NEW.event_id OR OLD.status IS NOT NEW.status OR OLD.value IS NOT NEW.value BEGIN
+        {_MARK.format(expr="OLD.event_id")}
+        {_MARK.format(expr="NEW.event_id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_leads_delete AFTER DELETE ON leads BEGIN
+        {_MARK.format(expr="OLD.event_id")}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_offers_insert AFTER INSERT ON offers BEGIN
+        {_MARK.format(expr=_LEAD_EVENT.format(ref="NEW"))}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_offers_update AFTER UPDATE OF lead_id ON offers
+    WHEN OLD.lead_id IS NOT NEW.lead_id BEGIN
+        {_MARK.format(expr=_LEAD_EVENT.format(ref="OLD"))}
+        {_MARK.format(expr=_LEAD_EVENT.format(ref="NEW"))}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_funnel_offers_delete AFTER DELETE ON offers BEGIN
+        {_MARK.format(expr=_LEAD_EVENT.format(ref="OLD"))}
+    END;
+'''
+
+# Wkład wydarzenia: jedno grupowane złączenie events-leads, oferta sprawdzana po idx_offers_lead
+_CONTRIBUTION = '''
+    INSERT INTO funnel_events (event_id, source, category, month, leads, offered, won, won_value)
+    SELECT e.id, COALESCE(e.source, ''), COALESCE(e.category, ''), COALESCE(substr(e.discovered_at, 1, 7), ''),
+        COUNT(l.id),
+        COALESCE(SUM(EXISTS (SELECT 1 FROM offers o WHERE o.lead_id = l.id)), 0),
+        COALESCE(SUM(l.status = 'won'), 0),
+        COALESCE(SUM(CASE WHEN l.status = 'won' THEN l.value END), 0)
+    FROM events e LEFT JOIN leads l ON l.event_id = e.id
+    WHERE {where}
+    GROUP BY e.id
+'''
+
+# sign = -1 odejmuje stary wkład, +1 dodaje nowy
+_APPLY = '''
+    INSERT INTO funnel_rollup (source, category, month, events, engaged, leads, offered, won, won_value)
+    SELECT source, category, month, :sign * COUNT(*), :sign * SUM(leads > 0), :sign * SUM(leads),
+        :sign * SUM(offered), :sign * SUM(won), :sign * SUM(won_value)
+    FROM funnel_events WHERE event_id IN (SELECT event_id FROM funnel_dirty)
+    GROUP BY source, category, month
+    ON CONFLICT (source, category, month) DO UPDATE SET
+        events = events + excluded.events, engaged = engaged + excluded.engaged,
+        leads = leads + excluded.leads, offered = offered + excluded.offered,
+        won = won + excluded.won, won_value = won_value + excluded.won_value
+'''
+
+# Okna: udział grupy we wszystkich wydarzeniach i zmiana wygranych względem poprzedniego miesiąca
+_REPORT = '''
+    SELECT {keys}, events, engaged, leads, offered, won, won_value,
+        events * 100.0 / SUM(events) OVER () AS share,
+        {won_delta} AS won_delta
+    FROM (
+        SELECT {keys}, SUM(events) AS events, SUM(engaged) AS engaged, SUM(leads) AS leads,
+            SUM(offered) AS offered, SUM(won) AS won, SUM(won_value) AS won_value
+        FROM funnel_rollup WHERE {where}
+        GROUP BY {keys}
+    )
+    ORDER BY {keys}
+'''
+
+
+def install(conn: sqlite3.Connection):
+    """Tabele i triggery; przy pierwszej instalacji na istniejących danych pełne przeliczenie"""
+    conn.executescript(SCHEMA)
+    conn.executescript(TRIGGERS)
+    empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM funnel_events)").fetchone()[0]
+    if empty and conn.execute("SELECT EXISTS (SELECT 1 FROM events)").fetchone()[0]:
+        rebuild(conn)
+
+
+def rebuild(conn: sqlite3.Connection):
+    """Przelicza rollup od zera (po ładowaniu z wyłączonymi triggerami)"""
+    conn.execute("DELETE FROM funnel_dirty")
+    conn.execute("DELETE FROM funnel_events")
+    conn.execute("DELETE FROM funnel_rollup")
+    conn.execute(_CONTRIBUTION.format(where="1"))
+    conn.execute('''
+        INSERT INTO funnel_rollup (source, category, month, events, engaged, leads, offered, won, won_value)
+        SELECT source, category, month, COUNT(*), SUM(leads > 0), SUM(leads), SUM(offered), SUM(won), SUM(won_value)
+        FROM funnel_events GROUP BY source, category, month
+    ''')
+    conn.commit()
+
+
+def refresh(conn: sqlite3.Connection, commit: bool = True) -> int:
+    """Przelicza wkład oznaczonych wydarzeń i koryguje rollup; zwraca liczbę przeliczonych wydarzeń"""
+    if not conn.execute("SELECT EXISTS (SELECT 1 FROM funnel_dirty)").fetchone()[0]:
+        return 0
+    conn.execute(_APPLY, {"sign": -1})
+    conn.execute("DELETE FROM funnel_events WHERE event_id IN (SELECT event_id FROM funnel_dirty)")
+    conn.execute(_CONTRIBUTION.format(where="e.id IN (SELECT event_id FROM funnel_dirty)"))
+    conn.execute(_APPLY, {"sign": 1})
+    conn.execute("DELETE FROM funnel_rollup WHERE events = 0")
+    refreshed = conn.execute("DELETE FROM funnel_dirty").rowcount
+    if commit:
+        conn.commit()
+    return refreshed
+
+
+def _rates(row: Dict[str, Any]) -> Dict[str, Any]:
+    row.update({
+        "lead_rate": calculate_conversion_rate(row["events"], row["engaged"]),
+        "offer_rate": calculate_conversion_rate(row["leads"], row["offered"]),
+        "win_rate": calculate_conversion_rate(row["leads"], row["won"]),
+    })
+    return row
+
+
+def report(
+    conn: sqlite3.Connection,
+    group_by: Sequence[str] = ("source", "category", "month"),
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    month_from: Optional[str] = None,
+    month_to: Optional[str] = None,
+    refresh_rollup: bool = True
+) -> Dict[str, Any]:
+    """Lejek w wybranych wymiarach (z rollupu, po refresh) i sumaryczny; DuckDB podaje rollup jako widok"""
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown or not group_by:
+        raise ValueError(f"Nieznany wymiar: {', '.join(unknown) or '(brak)'}")
+    if refresh_rollup:
+        refresh(conn)
+    where, params = ["1"], []
+    for column, value in (("source", source), ("category", category)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if month_from:
+        where.append("month >= ?")
+        params.append(month_from)
+    if month_to:
+        where.append("month <= ?")
+        params.append(month_to)
+
+    # Zmiana miesiąc do miesiąca tylko przy podziale po miesiącu (w obrębie pozostałych wymiarów)
+    won_delta = "NULL"
+    if "month" in group_by:
+        partition = ", ".join(name for name in group_by if name != "month") or "NULL"
+        won_delta = f"won - LAG(won) OVER (PARTITION BY {partition} ORDER BY month)"
+    query = _REPORT.format(keys=", ".join(group_by), won_delta=won_delta, where=" AND ".join(where))
+    groups: List[Dict[str, Any]] = []
+    total = dict.fromkeys(STAGES, 0)
+    for row in conn.execute(query, params).fetchall():
+        values = dict(zip((*group_by, *STAGES, "share", "won_delta"), row))
+        for name in group_by:
+            values[name] = values[name] or None
+        values["share"] = round(values["share"], 2)
+        for stage in STAGES:
+            total[stage] += values[stage]
+        groups.append(_rates(values))
+    return {"group_by": list(group_by), "total": _rates(total), "groups": groups}
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Geolokalizacja wydarzeń
+Wbudowany (offline) gazetteer polskich miast, geokodowanie triggerami przy zapisie
+(każda ścieżka: API, agregator, generator) i indeks R*Tree dla filtra near=lat,lon&radius_km=
+"""
+
+import math
+import sqlite3
+import unicodedata
+from typing import Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Miasto -> (szerokość, długość) - centrum miasta, dokładność ~1 km wystarcza do promienia dojazdu
+GAZETTEER = {
+    'Warszawa': (52.2297, 21.0122), 'Kraków': (50.0647, 19.9450), 'Wrocław': (51.1079, 17.0385),
+    'Łódź': (51.7592, 19.4560), 'Poznań': (52.4064, 16.9252), 'Gdańsk': (54.3520, 18.6466),
+    'Szczecin': (53.4285, 14.5528), 'Bydgoszcz': (53.1235, 18.0084), 'Lublin': (51.2465, 22.5684),
+    'Białystok': (53.1325, 23.1688), 'Katowice': (50.2649, 19.0238), 'Gdynia': (54.5189, 18.5305),
+    'Częstochowa': (50.8118, 19.1203), 'Radom': (51.4027, 21.1471), 'Rzeszów': (50.0412, 21.9991),
+    'Toruń': (53.0138, 18.5984), 'Sosnowiec': (50.2863, 19.1041), 'Kielce': (50.8661, 20.6286),
+    'Gliwice': (50.2945, 18.6714), 'Olsztyn': (53.7784, 20.4801), 'Zabrze': (50.3249, 18.7857),
+    'Bielsko-Biała': (49.8224, 19.0584), 'Bytom': (50.3484, 18.9157), 'Zielona Góra': (51.9356, 15.5062),
+    'Rybnik': (50.0971, 18.5418), 'Ruda Śląska': (50.2558, 18.8556), 'Opole': (50.6751, 17.9213),
+    'Tychy': (50.1218, 18.9866), 'Gorzów Wielkopolski': (52.7368, 15.2288), 'Elbląg': (54.1561, 19.4045),
+    'Płock': (52.5463, 19.7065), 'Dąbrowa Górnicza': (50.3217, 19.1949), 'Wałbrzych': (50.7714, 16.2843),
+    'Włocławek': (52.6483, 19.0677), 'Tarnów': (50.0121, 20.9858), 'Chorzów': (50.2975, 18.9546),
+    'Koszalin': (54.1944, 16.1722), 'Kalisz': (51.7611, 18.0910), 'Legnica': (51.2070, 16.1553),
+    'Grudziądz': (53.4837, 18.7536), 'Jaworzno': (50.2050, 19.2748), 'Słupsk': (54.4641, 17.0287),
+    'Jastrzębie-Zdrój': (49.9554, 18.5742), 'Nowy Sącz': (49.6175, 20.7153), 'Jelenia Góra': (50.9044, 15.7194),
+    'Siedlce': (52.1676, 22.2902), 'Mysłowice': (50.2081, 19.1660), 'Konin': (52.2230, 18.2511),
+    'Piotrków Trybunalski': (51.4052, 19.7030), 'Piła': (53.1514, 16.7378), 'Inowrocław': (52.7931, 18.2611),
+    'Lubin': (51.4008, 16.2015), 'Ostrów Wielkopolski': (51.6550, 17.8067), 'Suwałki': (54.1118, 22.9309),
+    'Gniezno': (52.5348, 17.5826), 'Głogów': (51.6639, 16.0845), 'Zamość': (50.7231, 23.2519),
+    'Leszno': (51.8400, 16.5749), 'Łomża': (53.1781, 22.0590), 'Przemyśl': (49.7838, 22.7678),
+    'Chełm': (51.1431, 23.4716), 'Stalowa Wola': (50.5827, 22.0532), 'Kędzierzyn-Koźle': (50.3499, 18.2263),
+    'Tczew': (54.0924, 18.7779), 'Biała Podlaska': (52.0325, 23.1149), 'Ełk': (53.8284, 22.3647),
+    'Pruszków': (52.1706, 20.8119), 'Piaseczno': (52.0817, 21.0238), 'Legionowo': (52.4014, 20.9264),
+    'Malbork': (54.0359, 19.0266), 'Sandomierz': (50.6826, 21.7490), 'Augustów': (53.8434, 22.9796),
+    'Sopot': (54.4418, 18.5601), 'Zakopane': (49.2992, 19.9496), 'Krynica-Zdrój': (49.4216, 20.9586),
+    'Szklarska Poręba': (50.8266, 15.5225), 'Karpacz': (50.7770, 15.7560), 'Kołobrzeg': (54.1757, 15.5832),
+    'Świnoujście': (53.9105, 14.2471), 'Władysławowo': (54.7909, 18.4014), 'Giżycko': (54.0382, 21.7664),
+    'Mikołajki': (53.8019, 21.5713), 'Wisła': (49.6536, 18.8596), 'Szczyrk': (49.7180, 19.0319),
+    'Ustka': (54.5805, 16.8619), 'Kazimierz Dolny': (51.3222, 21.9475),
+}
+
+# Nazwy obce/historyczne spotykane w źródłach -> nazwa w GAZETTEER
+ALIASES = {'Warsaw': 'Warszawa', 'Cracow': 'Kraków', 'Breslau': 'Wrocław', 'Danzig': 'Gdańsk'}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS gazetteer (
+        name TEXT PRIMARY KEY COLLATE NOCASE, city TEXT NOT NULL, lat REAL NOT NULL, lon REAL NOT NULL
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+'''
+
+
+def _location_match(location: str) -> str:
+    """
+    Warunek: nazwa z gazetteera to całe słowa kończące człon location (człony rozdziela ',', '(', ')', ' - ').
+    'Tauron Arena Kraków' i 'ul. Gdańska 100, Łódź' pasują, 'Radomsko' i 'Opole Lubelskie' już nie.
+    """
+    segments = f"lower(trim({location}))"
+    for separator, replacement in ((' - ', ' | '), (',', ' | '), ('(', ' '), (')', ' | '), ('  ', ' ')):
+        segments = f"replace({segments}, '{separator}', '{replacement}')"
+    return f"instr(' ' || {segments} || ' |', ' ' || lower(name) || ' |') > 0"
+
+
+# Najpierw dokładne dopasowanie city (PK), a gdy brak - najdłuższa nazwa kończąca człon location
+_GEOCODE_CITY = '''
+        INSERT INTO events_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT NEW.id, lat, lat, lon, lon FROM gazetteer WHERE name = trim(NEW.city);'''
+_GEOCODE_LOCATION = f'''
+        INSERT INTO events_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT NEW.id, lat, lat, lon, lon FROM gazetteer
+        WHERE {_location_match('NEW.location')} ORDER BY length(name) DESC LIMIT 1;'''
+_NO_CITY_MATCH = "NOT EXISTS (SELECT 1 FROM gazetteer WHERE name = trim(NEW.city))"
+
+TRIGGERS = f'''
+    CREATE TRIGGER IF NOT EXISTS trg_events_geo_insert AFTER INSERT ON events BEGIN{_GEOCODE_CITY}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_events_geo_insert_location AFTER INSERT ON events
+    WHEN {_NO_CITY_MATCH} BEGIN{_GEOCODE_LOCATION}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_events_geo_update AFTER UPDATE OF city, location ON events BEGIN
+        DELETE FROM events_geo WHERE id = OLD.id;{_GEOCODE_CITY}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_events_geo_update_location AFTER UPDATE OF city, location ON events
+    WHEN {_NO_CITY_MATCH} BEGIN
+        DELETE FROM events_geo WHERE id = OLD.id;{_GEOCODE_LOCATION}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_events_geo_delete AFTER DELETE ON events BEGIN
+        DELETE FROM events_geo WHERE id = OLD.id;
+    END;
+'''
+
+
+def fold(name: str) -> str:
+    """Nazwa bez polskich znaków ('Łódź' -> 'Lodz') - źródła często je gubią"""
+    name = name.replace('ł', 'l').replace('Ł', 'L')
+    return ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+
+
+def gazetteer_rows():
+    """(nazwa, miasto, lat, lon) dla nazw, wariantów bez znaków i aliasów"""
+    names = {}
+    for city in GAZETTEER:
+        names[city] = city
+        names.setdefault(fold(city), city)
+    for alias, city in ALIASES.items():
+        names.setdefault(alias, city)
+    # NOCASE i lower() w SQLite zmieniają wielkość tylko liter ASCII - 'ŁÓDŹ' i 'łódź' jako osobne warianty
+    for name, city in list(names.items()):
+        names.setdefault(name.upper(), city)
+        names.setdefault(name.lower(), city)
+    return [(name, city, *GAZETTEER[city]) for name, city in names.items()]
+
+
+def install(conn: sqlite3.Connection) -> int:
+    """Tabele, triggery, aktualny gazetteer i geokodowanie istniejących wydarzeń; zwraca liczbę nowych punktów"""
+    conn.executescript(SCHEMA)
+    # Triggery odtwarzane od nowa - baza z poprzedniej wersji dostaje aktualne dopasowanie location
+    for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_events_geo_%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    conn.executescript(TRIGGERS)
+    conn.executemany("INSERT OR REPLACE INTO gazetteer (name, city, lat, lon) VALUES (?, ?, ?, ?)",
+                     gazetteer_rows())
+    return backfill(conn)
+
+
+def backfill(conn: sqlite3.Connection) -> int:
+    """Geokoduje wydarzenia bez punktu (po instalacji albo ładowaniu z wyłączonymi triggerami)"""
+    before = conn.execute("SELECT COUNT(*) FROM events_geo").fetchone()[0]
+    conn.execute('''
+        INSERT INTO events_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT e.id, g.lat, g.lat, g.lon, g.lon FROM events e JOIN gazetteer g ON g.name = trim(e.city)
+        WHERE e.id NOT IN (SELECT id FROM events_geo)
+    ''')
+    conn.execute(f'''
+        INSERT INTO events_geo (id, min_lat, max_lat, min_lon, max_lon)
+        WITH matched AS (
+            SELECT e.id, (SELECT rowid FROM gazetteer WHERE {_location_match('e.location')}
+                          ORDER BY length(name) DESC LIMIT 1) AS place
+            FROM events e WHERE e.id NOT IN (SELECT id FROM events_geo)
+        )
+        SELECT m.id, g.lat, g.lat, g.lon, g.lon FROM matched m JOIN gazetteer g ON g.rowid = m.place
+    ''')
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM events_geo").fetchone()[0] - before
+
+
+def lookup(name: str) -> Optional[Tuple[float, float]]:
+    """Współrzędne miasta z gazetteera (wielkość liter, polskie znaki i aliasy bez znaczenia)"""
+    key = fold(name.strip()).casefold()
+    for candidate, city, lat, lon in gazetteer_rows():
+        if candidate.casefold() == key:
+            return lat, lon
+    return None
+
+
+def parse_near(near: str) -> Optional[Tuple[float, float]]:
+    """'52.41,16.93' albo nazwa miasta -> (lat, lon); None gdy nieznane"""
+    parts = near.split(',')
+    if len(parts) == 2:
+        try:
+            lat, lon = float(parts[0]), float(parts[1])
+        except ValueError:
+            return lookup(near)
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+        return None
+    return lookup(near)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) obejmujące okrąg - wstępne cięcie w R*Tree"""
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    # Najszerszy punkt okręgu leży na wyższej szerokości niż środek - stąd asin, nie samo cos(lat)
+    ratio = math.sin(angle) / max(math.cos(math.radians(lat)), 1e-9)
+    dlon = math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def near_filter(conn: sqlite3.Connection, lat: float, lon: float, radius_km: float) -> Tuple[str, list]:
+    """
+    Warunek 'id IN (...)' dla list_events: R*Tree przycina prostokątem,
+    dokładny dystans (haversine) liczony tylko dla kandydatów z prostokąta.
+    """
+    conn.create_function("distance_km", 4, haversine_km, deterministic=True)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    clause = '''id IN (
+        SELECT id FROM events_geo
+        WHERE min_lat >= ? AND max_lat <= ? AND min_lon >= ? AND max_lon <= ?
+            AND distance_km(min_lat, min_lon, ?, ?) <= ?
+    )'''
+    return clause, [min_lat, max_lat, min_lon, max_lon, lat, lon, radius_km]
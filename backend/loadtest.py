@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Test obciążeniowy API
+Uruchamia uvicorn na lokalnym porcie z wygenerowaną bazą i wysyła mieszany ruch ze stałym RPS
+
+Obciążenie jest open-loop: żądania startują wg harmonogramu niezależnie od odpowiedzi,
+a opóźnienie liczone jest od zaplanowanego startu (kolejkowanie wlicza się w wynik).
+
+Uruchomienie:
+    python loadtest.py --rps 100 --duration 30 --output load.json
+    python loadtest.py --mix dashboard=1,search=1 --workers 4
+    python loadtest.py --url http://localhost:8004 --rps 20   # istniejący serwer
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+from aggregator import Database
+import datagen
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EVENTS = 10_000
+DEFAULT_RPS = 50.0
+DEFAULT_DURATION = 20.0
+DEFAULT_CONCURRENCY = 100
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MIX = {'dashboard': 4, 'search': 3, 'lead_update': 2, 'offer_create': 1}
+STARTUP_TIMEOUT = 20.0
+SEARCH_CITIES = tuple(datagen.CITIES)[:10]
+SEARCH_WORDS = ('Bieg', 'Run', 'Festiwal', 'Turniej', 'HYROX', 'Gala', 'Expo', 'Cup')
+
+# (metoda, ścieżka, JSON) - jeden scenariusz to jedna lub kilka równoległych wywołań
+Call = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+@dataclass(slots=True)
+class LoadContext:
+    """Identyfikatory z bazy, na których operują scenariusze zapisu"""
+    leads: List[Tuple[int, int]] = field(default_factory=list)  # (lead_id, event_id)
+
+
+@dataclass(slots=True)
+class Sample:
+    scenario: str
+    latency: float
+    ok: bool
+    status: int = 0  # 0 = błąd połączenia / timeout
+
+
+# ============= SCENARIUSZE =============
+
+def scenario_dashboard(rng: random.Random, ctx: LoadContext) -> List[Call]:
+    """Odświeżenie dashboardu: statystyki + listy wydarzeń i leadów"""
+    return [
+        ('GET', '/api/stats', None),
+        ('GET', '/api/events?limit=50&fields=summary', None),
+        ('GET', '/api/leads?limit=50', None),
+    ]
+
+
+def scenario_search(rng: random.Random, ctx: LoadContext) -> List[Call]:
+    """Wyszukiwanie wydarzeń po frazie i mieście"""
+    city = rng.choice(SEARCH_CITIES)
+    word = rng.choice(SEARCH_WORDS)
+    return [('GET', f'/api/events?search={word}&city={urllib.request.quote(city)}&limit=50', None)]
+
+
+def scenario_lead_update(rng: random.Random, ctx: LoadContext) -> List[Call]:
+    """Zmiana statusu leada"""
+    lead_id, _ = rng.choice(ctx.leads)
+    status = rng.choice(('active', 'offer_sent', 'negotiation'))
+    return [('PATCH', f'/api/leads/{lead_id}', {'status': status, 'notes': f'loadtest {status}'})]
+
+
+def scenario_offer_create(rng: random.Random, ctx: LoadContext) -> List[Call]:
+    """Wygenerowanie oferty dla leada"""
+    lead_id, event_id = rng.choice(ctx.leads)
+    services = rng.sample(('drone', 'commentator', 'highlights', 'vod'), rng.randint(0, 2))
+    return [('POST', '/api/offers', {
+        'lead_id': lead_id, 'event_id': event_id,
+        'package': rng.choice(('basic', 'standard', 'premium')),
+        'additional_services': services, 'discount': rng.choice((0, 5, 10)),
+    })]
+
+
+SCENARIOS: Dict[str, Callable[[random.Random, LoadContext], List[Call]]] = {
+    'dashboard': scenario_dashboard,
+    'search': scenario_search,
+    'lead_update': scenario_lead_update,
+    'offer_create': scenario_offer_create,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'dashboard=4,search=1' -> {'dashboard': 4.0, 'search': 1.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f"Nieznany scenariusz: {name} (dostępne: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    if not mix or not any(mix.values()):
+        raise ValueError("Pusta mieszanka scenariuszy")
+    return mix
+
+
+# ============= SERWER =============
+
+def seed_database(db_path: str, events: int, seed: int):
+    """Tworzy bazę z `events` wydarzeniami, leadami i ofertami (datagen)"""
+    db = Database(db_path)
+    datagen.generate(db.conn, events, seed=seed)
+    db.conn.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(base_url: str, proc: subprocess.Popen, timeout: float = STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn zakończył się z kodem {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Serwer nie odpowiada po {timeout}s")
+
+
+@contextmanager
+def uvicorn_server(db_path: str, port: Optional[int] = None, workers: int = 1) -> Iterator[str]:
+    """Uruchamia api:app w osobnym procesie; zwraca bazowy URL"""
+    port = port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, 'DATABASE_PATH': db_path}
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--log-level', 'warning', '--no-access-log'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        _wait_until_healthy(base_url, proc)
+        yield base_url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def load_context(session: aiohttp.ClientSession) -> LoadContext:
+    """Pobiera identyfikatory leadów przez API (działa też dla zewnętrznego serwera)"""
+    async with session.get('/api/leads?limit=200&fields=id,event_id') as response:
+        response.raise_for_status()
+        rows = await response.json()
+    return LoadContext(leads=[(row['id'], row['event_id']) for row in rows])
+
+
+# ============= GENERATOR RUCHU =============
+
+async def _execute(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, name: str,
+                   calls: List[Call], scheduled: float, samples: List[Sample]):
+    loop = asyncio.get_running_loop()
+
+    async def one(method: str, path: str, body: Optional[Dict[str, Any]]) -> int:
+        async with session.request(method, path, json=body) as response:
+            await response.read()
+            return response.status
+
+    async with semaphore:
+        try:
+            statuses = await asyncio.gather(*(one(*call) for call in calls))
+            status = max(statuses)
+            samples.append(Sample(name, loop.time() - scheduled, status < 400, status))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            samples.append(Sample(name, loop.time() - scheduled, False))
+
+
+async def run_load(
+    base_url: str,
+    mix: Dict[str, float],
+    rps: float = DEFAULT_RPS,
+    duration: float = DEFAULT_DURATION,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """Wysyła ruch wg mieszanki scenariuszy ze stałą częstotliwością; zwraca raport"""
+    rng = random.Random(seed)
+    names, weights = zip(*mix.items())
+    samples: List[Sample] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(base_url, connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        ctx = await load_context(session)
+        if not ctx.leads:
+            names, weights = zip(*((n, w) for n, w in mix.items() if n not in ('lead_update', 'offer_create')))
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = []
+        for i in range(int(rps * duration)):
+            scheduled = start + i / rps
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            calls = SCENARIOS[name](rng, ctx)
+            tasks.append(asyncio.create_task(_execute(session, semaphore, name, calls, scheduled, samples)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - start
+    report = summarize(samples, elapsed)
+    report['target_rps'] = rps
+    report['concurrency'] = concurrency
+    return report
+
+
+# ============= RAPORT =============
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def _stats(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(s.latency for s in samples)
+    errors = sum(not s.ok for s in samples)
+    result = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+    }
+    if latencies:
+        result['latency_ms'] = {
+            'p50': round(_percentile(latencies, 50) * 1000, 2),
+            'p95': round(_percentile(latencies, 95) * 1000, 2),
+            'p99': round(_percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2),
+        }
+    return result
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Przepustowość, p50/p95/p99 i odsetek błędów - łącznie i per scenariusz"""
+    by_scenario: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    status_codes: Dict[str, int] = {}
+    for sample in samples:
+        status_codes[str(sample.status)] = status_codes.get(str(sample.status), 0) + 1
+    return {
+        'duration_seconds': round(elapsed, 3),
+        **_stats(samples, elapsed),
+        'status_codes': status_codes,
+        'scenarios': {name: _stats(group, elapsed) for name, group in sorted(by_scenario.items())},
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\n{'scenariusz':<14} {'żądania':>8} {'rps':>8} {'błędy':>7} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=sys.stderr)
+    rows = list(report['scenarios'].items()) + [('RAZEM', report)]
+    for name, stats in rows:
+        latency = stats.get('latency_ms', {})
+        print(f"{name:<14} {stats['requests']:>8} {stats['throughput_rps']:>8.1f} "
+              f"{stats['error_rate']:>7.2%} {latency.get('p50', 0):>9.1f} {latency.get('p95', 0):>9.1f} "
+              f"{latency.get('p99', 0):>9.1f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='StreamFlow - test obciążeniowy API')
+    parser.add_argument('--rps', type=float, default=DEFAULT_RPS, help='Docelowa liczba scenariuszy/s')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Czas trwania (s)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Maks. równoległych scenariuszy')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Timeout żądania (s)')
+    parser.add_argument('--mix', default=','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()),
+                        help='Wagi scenariuszy, np. dashboard=4,search=3,lead_update=2,offer_create=1')
+    parser.add_argument('--events', type=int, default=DEFAULT_EVENTS, help='Wydarzeń w generowanej bazie')
+    parser.add_argument('--seed', type=int, default=42, help='Ziarno danych i losowania scenariuszy')
+    parser.add_argument('--workers', type=int, default=1, help='Procesy uvicorn')
+    parser.add_argument('--url', help='Testuj istniejący serwer zamiast uruchamiać własny')
+    parser.add_argument('--output', help='Plik JSON z raportem')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+
+    def execute(base_url: str) -> Dict[str, Any]:
+        return asyncio.run(run_load(base_url, mix, args.rps, args.duration, args.concurrency,
+                                    args.timeout, args.seed))
+
+    if args.url:
+        report = execute(args.url.rstrip('/'))
+    else:
+        with tempfile.TemporaryDirectory(prefix='streamflow-load-') as workdir:
+            db_path = os.path.join(workdir, 'load.db')
+            print(f"Generowanie bazy: {args.events:,} wydarzeń...", file=sys.stderr)
+            seed_database(db_path, args.events, args.seed)
+            with uvicorn_server(db_path, workers=args.workers) as base_url:
+                print(f"Obciążenie {base_url}: {args.rps} rps przez {args.duration}s", file=sys.stderr)
+                report = execute(base_url)
+    report.update({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'mix': mix,
+        'workers': None if args.url else args.workers,
+        'events': None if args.url else args.events,
+    })
+
+    print_report(report)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Metryki w formacie Prometheus
+Liczniki, histogramy i gauge'e w pamięci procesu + middleware HTTP i pomiar czasu SQL
+"""
+
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SYNC_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# ============= TYPY METRYK =============
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v), self._sums[k]) for k, v in self._counts.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Eksport w formacie tekstowym Prometheus (0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "streamflow_http_requests_total", "Liczba żądań HTTP", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "streamflow_http_request_duration_seconds", "Czas obsługi żądania HTTP", ("method", "route", "status")))
+HTTP_IN_PROGRESS = REGISTRY.register(Gauge(
+    "streamflow_http_requests_in_progress", "Żądania w trakcie obsługi", ("method",)))
+DB_TIME = REGISTRY.register(Histogram(
+    "streamflow_db_query_duration_seconds", "Łączny czas zapytań SQL w żądaniu", ("route",)))
+SYNC_RUNS = REGISTRY.register(Counter(
+    "streamflow_sync_runs_total", "Uruchomienia synchronizacji źródła", ("source", "result")))
+SYNC_DURATION = REGISTRY.register(Histogram(
+    "streamflow_sync_duration_seconds", "Czas synchronizacji źródła", ("source",), buckets=SYNC_BUCKETS))
+SYNC_EVENTS = REGISTRY.register(Counter(
+    "streamflow_sync_events_total", "Wydarzenia znalezione przez źródło", ("source",)))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "streamflow_cache_requests_total", "Odczyty cache odpowiedzi (per worker)", ("cache", "result")))
+
+
+# ============= POMIAR CZASU SQL =============
+
+# Akumulator czasu SQL bieżącego żądania (lista, żeby był współdzielony z wątkami threadpoola)
+_db_time: ContextVar[Optional[List[float]]] = ContextVar("streamflow_db_time", default=None)
+
+
+def _add_db_time(elapsed: float):
+    holder = _db_time.get()
+    if holder is not None:
+        holder[0] += elapsed
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Kursor doliczający czas execute/fetch do bieżącego żądania"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _add_db_time(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _add_db_time(time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _add_db_time(time.perf_counter() - start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _add_db_time(time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _add_db_time(time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Połączenie, którego kursory mierzą czas SQL (sqlite3.connect(..., factory=TimedConnection))"""
+
+    cursor_factory = TimedCursor
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or self.cursor_factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ============= MIDDLEWARE HTTP =============
+
+class MetricsMiddleware:
+    """Zlicza żądania, czas obsługi i czas SQL per szablon trasy (np. /api/events/{event_id})"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = "500"
+        db_time = [0.0]
+        token = _db_time.set(db_time)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_PROGRESS.dec(method)
+            _db_time.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", "<unmatched>")
+            HTTP_REQUESTS.inc(method, template, status)
+            HTTP_LATENCY.observe(elapsed, method, template, status)
+            if db_time[0]:
+                DB_TIME.observe(db_time[0], template)
+
+
+def record_sync(source: str, duration: float, events_found: int, ok: bool):
+    """Zapisuje metryki jednego przebiegu synchronizacji źródła"""
+    SYNC_RUNS.inc(source, "ok" if ok else "error")
+    SYNC_DURATION.observe(duration, source)
+    if events_found:
+        SYNC_EVENTS.inc(source, amount=events_found)
+
+
+def record_sync_skipped(source: str):
+    """Liczy przebieg pominięty, bo poprzednia synchronizacja źródła jeszcze trwa"""
+    SYNC_RUNS.inc(source, "skipped")
+
+
+def record_cache(cache: str, hit: bool):
+    """Trafienie albo chybienie cache (chybienie = wersja danych zmieniła się od ostatniego odczytu)"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Silnik analityczny DuckDB (opcjonalny)
+/api/analytics/* liczone wektorowo w DuckDB na widokach tylko do odczytu:
+plik SQLite (ATTACH ... TYPE sqlite, READ_ONLY) albo snapshot Parquet (snapshot.py)
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import analytics
+import changefeed
+import funnel
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Rozszerzenie sqlite_scanner jako pakiet pip (wersja = wersja duckdb) - bez pobierania przy starcie
+try:
+    import duckdb_extension_sqlite_scanner
+    BUNDLED_SQLITE_EXTENSION = os.path.join(os.path.dirname(duckdb_extension_sqlite_scanner.__file__), "extensions")
+except ImportError:
+    BUNDLED_SQLITE_EXTENSION = None
+
+logger = logging.getLogger('OLAP')
+
+
+ENGINES = ("sqlite", "duckdb")
+SOURCE_TABLES = ("events", "leads", "offers")
+
+# Rollup lejka z tabel bazowych - kolumny jak funnel_rollup w SQLite, więc funnel.report działa bez zmian.
+# TRY_CAST: discovered_at to TEXT w SQLite i TIMESTAMP w Parquet
+_FUNNEL_ROLLUP = '''
+    CREATE OR REPLACE VIEW funnel_rollup AS
+    WITH offered_leads AS (SELECT DISTINCT lead_id FROM offers WHERE lead_id IS NOT NULL),
+    per_event AS (
+        SELECT e.id, COALESCE(e.source, '') AS source, COALESCE(e.category, '') AS category,
+            COALESCE(strftime(TRY_CAST(e.discovered_at AS TIMESTAMP), '%Y-%m'), '') AS month,
+            COUNT(l.id) AS leads, COUNT(o.lead_id) AS offered,
+            COUNT(*) FILTER (WHERE l.status = 'won') AS won,
+            COALESCE(SUM(l.value) FILTER (WHERE l.status = 'won'), 0) AS won_value
+        FROM events e
+        LEFT JOIN leads l ON l.event_id = e.id
+        LEFT JOIN offered_leads o ON o.lead_id = l.id
+        GROUP BY e.id, e.source, e.category, e.discovered_at
+    )
+    SELECT source, category, month, COUNT(*) AS events, COUNT(*) FILTER (WHERE leads > 0) AS engaged,
+        SUM(leads) AS leads, SUM(offered) AS offered, SUM(won) AS won, SUM(won_value) AS won_value
+    FROM per_event GROUP BY source, category, month
+'''
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def load_sqlite_extension(conn):
+    """sqlite_scanner z pakietu duckdb-extension-sqlite-scanner albo zainstalowany wcześniej (INSTALL sqlite)"""
+    if BUNDLED_SQLITE_EXTENSION:
+        path = os.path.join(BUNDLED_SQLITE_EXTENSION, f"v{duckdb.__version__}", "sqlite_scanner.duckdb_extension")
+        if os.path.exists(path):
+            conn.install_extension(path)
+    conn.load_extension("sqlite_scanner")
+
+
+class DuckDBEngine:
+    """
+    Baza DuckDB w pamięci procesu z widokami events/leads/offers na źródle tylko do odczytu.
+
+    Zapytania nie biorą blokad zapisu na bazie głównej (w WAL czytelnik nie blokuje zapisującego),
+    a grupowania idą wektorowo na wszystkich rdzeniach zamiast w wątku API.
+    """
+
+    def __init__(self, database_path: str, snapshot_dir: Optional[str] = None):
+        if not DUCKDB_AVAILABLE:
+            raise RuntimeError("ANALYTICS_ENGINE=duckdb wymaga pakietu duckdb (pip install duckdb)")
+        self.database_path = database_path
+        self.snapshot_dir = snapshot_dir
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        return "parquet" if self.snapshot_dir else "sqlite"
+
+    def _create_views(self, conn):
+        if self.snapshot_dir:
+            # Widok czyta plik przy każdym zapytaniu - nowy snapshot (--snapshot) widoczny od razu
+            for table in SOURCE_TABLES:
+                path = os.path.join(self.snapshot_dir, f"{table}.parquet")
+                conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM read_parquet({_literal(path)})")
+        else:
+            load_sqlite_extension(conn)
+            conn.execute(f"ATTACH {_literal(self.database_path)} AS oltp (TYPE sqlite, READ_ONLY)")
+            for table in SOURCE_TABLES:
+                conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM oltp.{table}")
+        conn.execute(_FUNNEL_ROLLUP)
+
+    def connect(self):
+        """Otwiera bazę i tworzy widoki (idempotentne); błąd źródła zgłaszany od razu"""
+        with self._lock:
+            if self._conn is None:
+                conn = duckdb.connect(":memory:")
+                try:
+                    self._create_views(conn)
+                except Exception:
+                    conn.close()
+                    raise
+                self._conn = conn
+                logger.info(f"Analityka w DuckDB {duckdb.__version__} (źródło: {self.source})")
+            return self._conn
+
+    def run(self, report: Callable[..., Any], *args, **kwargs) -> Any:
+        """report(kursor_duckdb, ...) - osobny kursor na wywołanie (bezpieczny między wątkami)"""
+        cursor = self.connect().cursor()
+        try:
+            return report(cursor, *args, **kwargs)
+        finally:
+            cursor.close()
+
+    def version(self, conn) -> Any:
+        """
+        Wersja danych dla cache wyników: dla SQLite wersja dziennika zmian, dla Parquet
+        (mtime, rozmiar, inode) plików snapshotu - nowy eksport nie zmienia dziennika w bazie.
+        """
+        if not self.snapshot_dir:
+            return changefeed.current_version(conn)
+        stamps = []
+        for table in SOURCE_TABLES:
+            try:
+                stat = os.stat(os.path.join(self.snapshot_dir, f"{table}.parquet"))
+            except FileNotFoundError:
+                stamps.append(None)
+            else:
+                stamps.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        return tuple(stamps)
+
+    def pipeline_report(self) -> Dict[str, Any]:
+        return self.run(analytics.pipeline_report)
+
+    def funnel_report(
+        self,
+        group_by: Sequence[str],
+        source: Optional[str] = None,
+        category: Optional[str] = None,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return self.run(funnel.report, group_by, source, category, month_from, month_to, refresh_rollup=False)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def engine_from_env(database_path: str) -> Optional[DuckDBEngine]:
+    """
+    ANALYTICS_ENGINE=duckdb -> połączony DuckDBEngine (ANALYTICS_SNAPSHOT_DIR = katalog snapshotu Parquet).
+
+    None = analityka z SQLite: domyślnie, bez pakietu duckdb albo gdy źródło się nie otwiera
+    (brak rozszerzenia sqlite, brak plików snapshotu) - API startuje mimo błędnej konfiguracji.
+    """
+    engine = os.getenv("ANALYTICS_ENGINE", "sqlite").lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Nieznany ANALYTICS_ENGINE: {engine} (dostępne: {', '.join(ENGINES)})")
+    if engine == "sqlite":
+        return None
+    if not DUCKDB_AVAILABLE:
+        logger.warning("ANALYTICS_ENGINE=duckdb, ale duckdb niedostępny - analityka z SQLite")
+        return None
+    duck = DuckDBEngine(database_path, os.getenv("ANALYTICS_SNAPSHOT_DIR") or None)
+    try:
+        duck.connect()
+    except Exception as e:
+        logger.warning(f"DuckDB niedostępny ({duck.source}: {e}) - analityka z SQLite")
+        return None
+    return duck
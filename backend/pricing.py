@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Silnik cenowy
+Jedno źródło cen pakietów i usług dodatkowych + memoizowana wycena ofert
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+VAT_RATE = 0.23
+
+
+@dataclass(frozen=True)
+class Package:
+    code: str
+    name: str
+    price: float
+    features: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "price": self.price, "features": list(self.features)}
+
+
+@dataclass(frozen=True)
+class Service:
+    code: str
+    name: str
+    price: float
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "price": self.price}
+
+
+@dataclass(frozen=True)
+class Quote:
+    base_price: float
+    additional_total: float
+    subtotal: float
+    discount: float
+    net: float
+    vat: float
+    gross: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "base_price": self.base_price,
+            "additional_total": self.additional_total,
+            "subtotal": self.subtotal,
+            "discount": self.discount,
+            "net": self.net,
+            "vat": self.vat,
+            "gross": self.gross,
+        }
+
+
+# ============= CENNIK =============
+
+def _freeze(items: Iterable) -> Mapping:
+    return MappingProxyType({item.code: item for item in items})
+
+
+PACKAGES: Mapping[str, Package] = _freeze([
+    Package("basic", "Pakiet BASIC", 990, ("1 kamera", "Do 2h transmisji", "YouTube/FB")),
+    Package("standard", "Pakiet STANDARD", 2490, ("2-3 kamery", "Do 4h", "Realizator", "Replay")),
+    Package("premium", "Pakiet PREMIUM", 4990, ("4+ kamery", "Cały dzień", "Wóz OB", "Komentator")),
+    Package("enterprise", "Pakiet ENTERPRISE", 0, ("Wycena indywidualna",)),
+])
+
+SERVICES: Mapping[str, Service] = _freeze([
+    Service("drone", "Dron", 800),
+    Service("commentator", "Komentator", 600),
+    Service("graphics_custom", "Grafiki dedykowane", 400),
+    Service("highlights", "Montaż highlights", 500),
+    Service("multistream", "Multi-platform", 300),
+    Service("vod", "Archiwum VOD", 200),
+    Service("led_screen", "Ekran LED mobilny", 1500),
+    Service("sound_system", "Nagłośnienie", 800),
+    Service("photographer", "Fotograf", 700),
+    Service("transcript", "Transkrypcja/napisy", 350),
+])
+
+
+def package_price(package: str) -> float:
+    """Cena bazowa pakietu (0 dla nieznanego)"""
+    item = PACKAGES.get(package)
+    return item.price if item else 0
+
+
+def service_price(service: str) -> float:
+    """Cena usługi dodatkowej (0 dla nieznanej)"""
+    item = SERVICES.get(service)
+    return item.price if item else 0
+
+
+# ============= WYCENA =============
+
+@lru_cache(maxsize=4096)
+def _quote(package: str, services: Tuple[str, ...], discount_percent: float) -> Quote:
+    base_price = package_price(package)
+    additional_total = sum(service_price(s) for s in services)
+    subtotal = base_price + additional_total
+    discount_amount = subtotal * (discount_percent / 100)
+    net_total = subtotal - discount_amount
+    vat_amount = net_total * VAT_RATE
+    return Quote(
+        base_price=base_price,
+        additional_total=additional_total,
+        subtotal=subtotal,
+        discount=discount_amount,
+        net=net_total,
+        vat=vat_amount,
+        gross=round(net_total + vat_amount, 2),
+    )
+
+
+def quote(package: str, additional_services: Iterable[str] = (), discount_percent: float = 0) -> Quote:
+    """Wycenia ofertę (wynik memoizowany; kolejność usług nie ma znaczenia)"""
+    return _quote(package, tuple(sorted(additional_services)), float(discount_percent))
+
+
+def quote_many(requests: Iterable[Tuple[str, Iterable[str], float]]) -> List[Quote]:
+    """Wycenia wiele kombinacji (pakiet, usługi, rabat) naraz"""
+    return [quote(package, services, discount) for package, services, discount in requests]
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Profiler zapytań SQL
+Czas każdego zapytania per fingerprint (p50/p95/max) + log wolnych zapytań z EXPLAIN QUERY PLAN
+"""
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, List
+
+from metrics import TimedConnection, TimedCursor
+
+logger = logging.getLogger('QueryProfiler')
+
+DEFAULT_SLOW_QUERY_MS = 100.0
+DEFAULT_WINDOW = 1000
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Fingerprint zapytania: bez literałów, list parametrów i nadmiarowych spacji"""
+    fingerprint = _STRING_LITERAL.sub("?", sql)
+    fingerprint = _NUMBER_LITERAL.sub("?", fingerprint)
+    fingerprint = _WHITESPACE.sub(" ", fingerprint).strip()
+    return _PLACEHOLDER_LIST.sub("?+", fingerprint)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Percentyl metodą nearest-rank"""
+    index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class _Stats:
+    __slots__ = ("count", "total", "max", "window")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window = deque(maxlen=window)
+
+
+class QueryProfiler:
+    """Statystyki zapytań per fingerprint z kroczącym oknem ostatnich pomiarów"""
+
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS, window: int = DEFAULT_WINDOW):
+        self.slow_query_ms = slow_query_ms
+        self.window = window
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed: float) -> str:
+        fingerprint = normalize_sql(sql)
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                stats = self._stats[fingerprint] = _Stats(self.window)
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.window.append(elapsed)
+        return fingerprint
+
+    def is_slow(self, elapsed: float) -> bool:
+        return elapsed * 1000 >= self.slow_query_ms
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Raport posortowany wg łącznego czasu (ms)"""
+        with self._lock:
+            items = [(fp, s.count, s.total, s.max, sorted(s.window)) for fp, s in self._stats.items()]
+        rows = [
+            {
+                "fingerprint": fp,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "p50_ms": round(_percentile(window, 50) * 1000, 3),
+                "p95_ms": round(_percentile(window, 95) * 1000, 3),
+                "max_ms": round(max_time * 1000, 3),
+            }
+            for fp, count, total, max_time, window in items
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+PROFILER = QueryProfiler(
+    slow_query_ms=float(os.getenv("SLOW_QUERY_MS", str(DEFAULT_SLOW_QUERY_MS))),
+)
+
+
+def explain(conn: sqlite3.Connection, sql: str, parameters=()) -> List[str]:
+    """Plan zapytania (EXPLAIN QUERY PLAN) jako lista linii"""
+    try:
+        cursor = conn.cursor(sqlite3.Cursor)
+        cursor.row_factory = None
+        return [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+    except sqlite3.Error as e:
+        return [f"EXPLAIN niedostępny: {e}"]
+
+
+class ProfilingCursor(TimedCursor):
+    """
+    Kursor zapisujący w PROFILER czas zapytania i logujący wolne zapytania.
+
+    SELECT wykonuje się leniwie - wiersze są krokowane przy fetch*/iteracji, więc czas pobierania
+    doliczany jest do zapytania, a wpis powstaje po wyczerpaniu wyników, kolejnym execute albo close.
+    """
+
+    _statement = None  # (sql, parametry, czas) bieżącego zapytania z wynikami
+
+    def _profile(self, sql: str, parameters, elapsed: float):
+        PROFILER.record(sql, elapsed)
+        if PROFILER.is_slow(elapsed):
+            plan = explain(self.connection, sql, parameters) if parameters is not None else []
+            logger.warning(f"Wolne zapytanie ({elapsed * 1000:.1f} ms): {normalize_sql(sql)} | "
+                           f"plan: {'; '.join(plan)}")
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            self._profile(*statement)
+
+    def _fetched(self, elapsed: float, exhausted: bool):
+        if self._statement is not None:
+            sql, parameters, total = self._statement
+            self._statement = (sql, parameters, total + elapsed)
+            if exhausted:
+                self._finish()
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        result = super().execute(sql, parameters)
+        self._statement = (sql, parameters, time.perf_counter() - start)
+        if self.description is None:
+            self._finish()
+        return result
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        result = super().executemany(sql, seq_of_parameters)
+        self._profile(sql, None, time.perf_counter() - start)
+        return result
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - start, exhausted=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(time.perf_counter() - start, exhausted=len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - start, exhausted=True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(time.perf_counter() - start, exhausted=True)
+            raise
+        self._fetched(time.perf_counter() - start, exhausted=False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class ProfilingConnection(TimedConnection):
+    """Połączenie z profilowaniem (sqlite3.connect(..., factory=ProfilingConnection))"""
+
+    cursor_factory = ProfilingCursor
+
+
+def profiling_enabled() -> bool:
+    """Profilowanie włączane zmienną SQL_PROFILING=1"""
+    return os.getenv("SQL_PROFILING", "0").lower() in ("1", "true", "yes")
+
+
+def connection_factory() -> type:
+    """Klasa połączenia do sqlite3.connect(factory=...) wg konfiguracji"""
+    return ProfilingConnection if profiling_enabled() else TimedConnection
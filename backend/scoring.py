@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Masowy rescoring wydarzeń
+Przelicza potential_score dla całej tabeli events kolumnami, w paczkach
+"""
+
+import sqlite3
+import time
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from utils import HIGH_VALUE_CATEGORIES, calculate_potential_score
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger('EventAggregator')
+
+DEFAULT_CHUNK_SIZE = 50000
+
+_CHUNK_QUERY = '''
+    SELECT id, estimated_audience, category, organizer_email, organizer_phone, potential_score
+    FROM events WHERE id > ? ORDER BY id LIMIT ?
+'''
+
+
+# ============= SCORING KOLUMNOWY =============
+
+def score_columns(
+    audience: Sequence[int],
+    categories: Sequence[str],
+    has_email: Sequence[bool],
+    has_phone: Sequence[bool]
+) -> List[int]:
+    """Oblicza scoring dla kolumn danych (te same reguły co calculate_potential_score)"""
+    if NUMPY_AVAILABLE:
+        aud = np.fromiter(audience, dtype=np.int64, count=len(audience))
+        email = np.fromiter(has_email, dtype=bool, count=len(has_email))
+        phone = np.fromiter(has_phone, dtype=bool, count=len(has_phone))
+        high_value = np.isin(np.asarray(categories, dtype=object), HIGH_VALUE_CATEGORIES)
+        score = np.full(aud.shape, 3, dtype=np.int64)
+        score += np.where(aud > 5000, 2, np.where(aud > 1000, 1, 0))
+        score += high_value
+        score += email & phone
+        score -= ~email & ~phone
+        return np.clip(score, 1, 5).tolist()
+    return [
+        calculate_potential_score(a, c, e, p)
+        for a, c, e, p in zip(audience, categories, has_email, has_phone)
+    ]
+
+
+def _score_chunk(rows: List[sqlite3.Row]) -> List[Tuple[int, int]]:
+    """Zwraca pary (nowy_score, id) tylko dla wierszy, których scoring się zmienił"""
+    ids, audience, categories, emails, phones, current = zip(*rows)
+    scores = score_columns(
+        [a or 0 for a in audience],
+        [c or "" for c in categories],
+        [bool(e) for e in emails],
+        [bool(p) for p in phones],
+    )
+    return [(s, i) for i, s, old in zip(ids, scores, current) if s != old]
+
+
+# ============= RESCORING TABELI =============
+
+def rescore_events(conn: sqlite3.Connection, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, float]:
+    """Przelicza potential_score wszystkich wydarzeń i zapisuje tylko zmienione wiersze"""
+    results = {'scanned': 0, 'updated': 0, 'duration_seconds': 0.0}
+    start = time.perf_counter()
+    last_id = 0
+    while True:
+        rows = conn.execute(_CHUNK_QUERY, (last_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        changed = _score_chunk(rows)
+        if changed:
+            with conn:
+                conn.executemany("UPDATE events SET potential_score = ? WHERE id = ?", changed)
+        results['scanned'] += len(rows)
+        results['updated'] += len(changed)
+    results['duration_seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(f"Rescoring: {results['updated']}/{results['scanned']} zmienionych "
+                f"w {results['duration_seconds']}s")
+    return results
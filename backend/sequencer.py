@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Numeracja ofert i umów
+Unikalne numery z licznika w SQLite, rezerwowane blokami per proces
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+
+DEFAULT_BLOCK_SIZE = 20
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS number_sequences (
+        series TEXT NOT NULL, period TEXT NOT NULL, last_value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (series, period)
+    )
+'''
+
+
+class NumberSequencer:
+    """
+    Licznik numerów dokumentów (seria + okres, np. OF + 2026/03).
+
+    Każdy proces rezerwuje w bazie blok `block_size` kolejnych numerów w jednej
+    transakcji IMMEDIATE i wydaje je z pamięci. Numery są unikalne między procesami,
+    ciągłe w obrębie bloku; niewykorzystana reszta bloku przepada przy restarcie.
+    """
+
+    def __init__(self, db_path: str, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.db_path = db_path
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, Tuple[str, int, int]] = {}  # seria -> (okres, następny, koniec)
+
+    def _reserve_block(self, series: str, period: str) -> Tuple[int, int]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute(_SCHEMA)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT OR IGNORE INTO number_sequences (series, period) VALUES (?, ?)",
+                         (series, period))
+            conn.execute("UPDATE number_sequences SET last_value = last_value + ? "
+                         "WHERE series = ? AND period = ?", (self.block_size, series, period))
+            last = conn.execute("SELECT last_value FROM number_sequences WHERE series = ? AND period = ?",
+                                (series, period)).fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return last - self.block_size + 1, last
+
+    def next_value(self, series: str, period: str) -> int:
+        """Zwraca kolejny numer w serii dla okresu"""
+        with self._lock:
+            block_period, next_value, end = self._blocks.get(series, (None, 1, 0))
+            if block_period != period or next_value > end:
+                next_value, end = self._reserve_block(series, period)
+            self._blocks[series] = (period, next_value + 1, end)
+            return next_value
+
+    def offer_number(self, now: Optional[datetime] = None) -> str:
+        """Numer oferty OF/RRRR/MM/NNNN (licznik miesięczny)"""
+        now = now or datetime.now()
+        value = self.next_value("OF", f"{now.year}/{now.month:02d}")
+        return f"OF/{now.year}/{now.month:02d}/{value:04d}"
+
+    def contract_number(self, prefix: str = "STREAM", now: Optional[datetime] = None) -> str:
+        """Numer umowy PREFIX/RRRR/NNNNNN (licznik roczny per prefiks)"""
+        now = now or datetime.now()
+        value = self.next_value(prefix, str(now.year))
+        return f"{prefix}/{now.year}/{value:06d}"
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Kolumnowy snapshot danych (Parquet / Arrow IPC)
+events, leads i offers strumieniowane paczkami rekordów z jednej transakcji odczytu:
+daty i liczby z typami, kolumny o małej liczbie wartości kodowane słownikowo
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import archive
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger('Snapshot')
+
+
+SNAPSHOT_TABLES = ("events", "leads", "offers")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+DEFAULT_BATCH_ROWS = 50_000
+DEFAULT_COMPRESSION = "zstd"
+
+# Słownik wspólny dla wszystkich paczek (czytany na starcie) - wymagany przez plik Arrow IPC
+DICTIONARY_COLUMNS = {"category", "subcategory", "source", "city", "country", "status", "package"}
+DATE_COLUMNS = {"date_start", "date_end", "follow_up_date", "valid_until"}
+TIMESTAMP_COLUMNS = {"discovered_at", "updated_at", "created_at", "offer_sent_date", "sent_at"}
+
+# Konwersja dat w SQLite (niepoprawna data -> NULL): dni / milisekundy od 1970-01-01
+_EPOCH_JULIAN = 2440587.5
+_DATE_EXPR = f"CAST(julianday(date({{column}})) - {_EPOCH_JULIAN} AS INTEGER)"
+_TIMESTAMP_EXPR = f"CAST(ROUND((julianday({{column}}) - {_EPOCH_JULIAN}) * 86400000.0) AS INTEGER)"
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Snapshot wymaga pyarrow (pip install pyarrow)")
+
+
+def column_plan(conn: sqlite3.Connection, table: str) -> List[tuple]:
+    """(kolumna, wyrażenie SELECT, typ Arrow) dla zapisywanych kolumn tabeli"""
+    _require_pyarrow()
+    plan = []
+    for _, name, declared, _, _, _, hidden in conn.execute(f"PRAGMA main.table_xinfo({table})"):
+        if hidden:
+            continue
+        declared = (declared or "").upper()
+        if name in DATE_COLUMNS:
+            plan.append((name, _DATE_EXPR.format(column=name), pa.date32()))
+        elif name in TIMESTAMP_COLUMNS:
+            plan.append((name, _TIMESTAMP_EXPR.format(column=name), pa.timestamp("ms")))
+        elif name in DICTIONARY_COLUMNS:
+            plan.append((name, name, pa.dictionary(pa.int32(), pa.string())))
+        elif "INT" in declared:
+            plan.append((name, name, pa.int64()))
+        elif "REAL" in declared:
+            plan.append((name, name, pa.float64()))
+        else:
+            plan.append((name, name, pa.string()))
+    return plan
+
+
+def _dictionaries(conn: sqlite3.Connection, source: str, plan: List[tuple]) -> Dict[str, Any]:
+    return {
+        name: pa.array([row[0] for row in conn.execute(
+            f"SELECT DISTINCT {name} FROM {source} WHERE {name} IS NOT NULL ORDER BY {name}")], pa.string())
+        for name, _, kind in plan if pa.types.is_dictionary(kind)
+    }
+
+
+def _column(values: Sequence, kind: Any, dictionary: Any = None):
+    if dictionary is not None:
+        indices = pc.index_in(pa.array(values, pa.string()), value_set=dictionary).cast(pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+    return pa.array(values, kind)
+
+
+def _open_writer(path: str, schema: Any, fmt: str, compression: Optional[str]):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression=compression or "none",
+                                use_dictionary=sorted(DICTIONARY_COLUMNS & set(schema.names)))
+    options = ipc.IpcWriteOptions(compression=compression) if compression else None
+    return ipc.new_file(path, schema, options=options)
+
+
+def write_table(
+    conn: sqlite3.Connection,
+    table: str,
+    path: str,
+    fmt: str = "parquet",
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    include_archived: bool = False,
+    compression: Optional[str] = DEFAULT_COMPRESSION
+) -> int:
+    """Zapisuje tabelę paczkami po batch_rows wierszy; zwraca liczbę wierszy"""
+    plan = column_plan(conn, table)
+    source = archive.union_source(conn, table) if include_archived else f"main.{table}"
+    dictionaries = _dictionaries(conn, source, plan)
+    schema = pa.schema([(name, kind) for name, _, kind in plan])
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"SELECT {', '.join(expr for _, expr, _ in plan)} FROM {source} ORDER BY id")
+    rows_written = 0
+    # Plik tymczasowy + rename: czytelnik (np. DuckDB w olap.py) nigdy nie widzi niedopisanego pliku
+    partial = f"{path}.partial"
+    writer = _open_writer(partial, schema, fmt, compression)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            columns = zip(*rows)
+            arrays = [_column(values, kind, dictionaries.get(name))
+                      for (name, _, kind), values in zip(plan, columns)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    except Exception:
+        writer.close()
+        os.unlink(partial)
+        raise
+    writer.close()
+    os.replace(partial, path)
+    return rows_written
+
+
+def export_snapshot(
+    conn: sqlite3.Connection,
+    directory: str,
+    fmt: str = "parquet",
+    tables: Sequence[str] = SNAPSHOT_TABLES,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    include_archived: bool = False,
+    compression: Optional[str] = DEFAULT_COMPRESSION
+) -> Dict[str, Any]:
+    """
+    Zapisuje <directory>/<tabela>.parquet|.arrow dla wybranych tabel.
+
+    Wszystkie tabele czytane w jednej transakcji - snapshot jest spójny (lead nie wskazuje
+    wydarzenia spoza pliku), a zapisujący w trybie WAL nie są blokowani.
+    """
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Nieznany format: {fmt} (dostępne: {', '.join(FORMATS)})")
+    unknown = sorted(set(tables) - set(SNAPSHOT_TABLES))
+    if unknown:
+        raise ValueError(f"Nieznane tabele: {', '.join(unknown)}")
+    os.makedirs(directory, exist_ok=True)
+    if include_archived:
+        archive.attach(conn)
+        conn.commit()
+
+    results: Dict[str, Any] = {'format': fmt, 'tables': {}, 'duration_seconds': 0.0}
+    start = time.perf_counter()
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        for table in tables:
+            path = os.path.join(directory, f"{table}{FORMATS[fmt]}")
+            rows = write_table(conn, table, path, fmt, batch_rows, include_archived, compression)
+            results['tables'][table] = {'path': path, 'rows': rows, 'bytes': os.path.getsize(path)}
+    finally:
+        if own_transaction:
+            conn.rollback()
+    results['duration_seconds'] = round(time.perf_counter() - start, 3)
+    counts = ", ".join(f"{table} {info['rows']} wierszy" for table, info in results['tables'].items())
+    logger.info(f"Snapshot {fmt}: {counts} w {results['duration_seconds']}s")
+    return results
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Demon synchronizacji
+Kolejka priorytetowa źródeł: własny interwał per źródło, jitter, pomijanie nakładających się
+przebiegów i trwałe terminy następnych uruchomień (restart nie odpala wszystkich naraz)
+"""
+
+import asyncio
+import heapq
+import logging
+import random
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from metrics import record_sync_skipped
+
+logger = logging.getLogger('SyncDaemon')
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS sync_schedule (
+        source TEXT PRIMARY KEY, next_run_at TEXT NOT NULL, interval_seconds REAL,
+        last_started_at TEXT, last_status TEXT, skipped INTEGER DEFAULT 0
+    );
+'''
+
+DEFAULT_INTERVAL = 6 * 3600.0
+# Źródła z największą liczbą nowych wydarzeń odświeżane częściej
+SOURCE_INTERVALS = MappingProxyType({
+    'HYROX.com': 1800.0,
+    'Runmageddon.pl': 1800.0,
+    'GoOut.net': 3 * 3600.0,
+    'MTP.pl': 12 * 3600.0,
+})
+DEFAULT_JITTER = 0.1
+STARTUP_SPREAD = 60.0
+
+
+def parse_intervals(text: str) -> Dict[str, float]:
+    """Parsuje 'HYROX.com=900,MTP.pl=7200' -> {źródło: sekundy}"""
+    intervals = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        source, sep, seconds = part.rpartition('=')
+        if not sep or not source or float(seconds) <= 0:
+            raise ValueError(f"Niepoprawny interwał: {part!r}")
+        intervals[source.strip()] = float(seconds)
+    return intervals
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec='seconds')
+
+
+def list_schedule(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Terminy następnych synchronizacji (najbliższe pierwsze)"""
+    cursor = conn.execute('''
+        SELECT source, next_run_at, interval_seconds, last_started_at, last_status, skipped
+        FROM sync_schedule ORDER BY next_run_at
+    ''')
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class SyncScheduler:
+    """Heap (termin, źródło) nad EventAggregator.sync_source"""
+
+    def __init__(
+        self,
+        aggregator,
+        intervals: Optional[Dict[str, float]] = None,
+        jitter: float = DEFAULT_JITTER,
+        startup_spread: float = STARTUP_SPREAD,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        self.aggregator = aggregator
+        self.conn = aggregator.db.conn
+        self.scrapers = {s.name: s for s in aggregator.scrapers}
+        self.intervals = {**SOURCE_INTERVALS, **(intervals or {})}
+        self.jitter = jitter
+        self.startup_spread = startup_spread
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.heap: List[Tuple[float, str]] = []
+        self.running: Dict[str, asyncio.Task] = {}
+
+    def interval(self, source: str) -> float:
+        return self.intervals.get(source, DEFAULT_INTERVAL)
+
+    def next_run(self, source: str, now: float) -> float:
+        """Następny termin: interwał ± jitter, liczony od teraz (bez nadrabiania zaległości)"""
+        return now + self.interval(source) * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _save(self, source: str, due: float, started_at: Optional[str] = None,
+              status: Optional[str] = None, skipped: int = 0):
+        self.conn.execute('''
+            INSERT INTO sync_schedule (source, next_run_at, interval_seconds, last_started_at, last_status, skipped)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                next_run_at = excluded.next_run_at, interval_seconds = excluded.interval_seconds,
+                last_started_at = COALESCE(excluded.last_started_at, last_started_at),
+                last_status = COALESCE(excluded.last_status, last_status),
+                skipped = skipped + excluded.skipped
+        ''', (source, _iso(due), self.interval(source), started_at, status, skipped))
+        self.conn.commit()
+
+    def load(self):
+        """Buduje kolejkę z zapisanych terminów; zaległe i nowe źródła rozkłada w startup_spread"""
+        now = self.clock()
+        saved = dict(self.conn.execute("SELECT source, next_run_at FROM sync_schedule").fetchall())
+        self.heap = []
+        for source in self.scrapers:
+            due = datetime.fromisoformat(saved[source]).timestamp() if source in saved else None
+            if due is None or due < now:
+                due = now + self.rng.uniform(0, self.startup_spread)
+                self._save(source, due)
+            self.heap.append((due, source))
+        heapq.heapify(self.heap)
+
+    def seconds_until_next(self) -> Optional[float]:
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0][0] - self.clock())
+
+    def dispatch_due(self) -> List[str]:
+        """Uruchamia zaległe źródła; te, które jeszcze trwają, pomija do następnego terminu"""
+        now = self.clock()
+        started = []
+        while self.heap and self.heap[0][0] <= now:
+            _, source = heapq.heappop(self.heap)
+            due = self.next_run(source, now)
+            heapq.heappush(self.heap, (due, source))
+            if source in self.running:
+                logger.warning(f"{source}: poprzednia synchronizacja trwa, pomijam")
+                record_sync_skipped(source)
+                self._save(source, due, skipped=1)
+                continue
+            # Termin zapisany przed startem: crash w trakcie nie wymusza ponownego pobrania po restarcie
+            self._save(source, due, started_at=_iso(now))
+            task = asyncio.get_running_loop().create_task(self._run(source))
+            self.running[source] = task
+            started.append(source)
+        return started
+
+    async def _run(self, source: str):
+        try:
+            run = await self.aggregator.sync_source(self.scrapers[source], uuid.uuid4().hex[:12])
+            status = run.status
+            logger.info(f"{source}: {run.found} znalezionych, {run.new} nowych ({run.total_seconds:.1f}s)")
+        except Exception as e:
+            status = 'error'
+            logger.error(f"{source}: {e}")
+        finally:
+            self.running.pop(source, None)
+        self.conn.execute("UPDATE sync_schedule SET last_status = ? WHERE source = ?", (status, source))
+        self.conn.commit()
+
+    async def run(self, stop: asyncio.Event):
+        """Pętla demona do ustawienia stop; trwające synchronizacje są dokańczane"""
+        self.load()
+        logger.info(f"Demon: {len(self.heap)} źródeł, najbliższe za {self.seconds_until_next() or 0:.0f}s")
+        while not stop.is_set():
+            self.dispatch_due()
+            wait = self.seconds_until_next()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+        if self.running:
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Historia synchronizacji
+Jeden wiersz na źródło w każdym przebiegu: czasy HTTP/parsowania/zapisu, bajty i liczniki
+"""
+
+import sqlite3
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS sync_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, source TEXT NOT NULL,
+        started_at TEXT, finished_at TEXT, status TEXT DEFAULT 'ok', error TEXT,
+        http_seconds REAL DEFAULT 0, bytes_downloaded INTEGER DEFAULT 0,
+        parse_seconds REAL DEFAULT 0, write_seconds REAL DEFAULT 0, total_seconds REAL DEFAULT 0,
+        found INTEGER DEFAULT 0, new INTEGER DEFAULT 0, updated INTEGER DEFAULT 0,
+        unchanged INTEGER DEFAULT 0, failed INTEGER DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_sync_runs_source ON sync_runs(source, started_at);
+    CREATE INDEX IF NOT EXISTS idx_sync_runs_started ON sync_runs(started_at);
+'''
+
+
+@dataclass(slots=True)
+class SourceRun:
+    run_id: str
+    source: str
+    started_at: str
+    finished_at: str = ""
+    status: str = "ok"
+    error: str = ""
+    http_seconds: float = 0.0
+    bytes_downloaded: int = 0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    found: int = 0
+    new: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+
+RUN_COLUMNS = tuple(f.name for f in fields(SourceRun))
+_INSERT = f"INSERT INTO sync_runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join('?' * len(RUN_COLUMNS))})"
+
+
+def record_run(conn: sqlite3.Connection, run: SourceRun):
+    """Zapisuje przebieg synchronizacji jednego źródła"""
+    conn.execute(_INSERT, tuple(getattr(run, name) for name in RUN_COLUMNS))
+    conn.commit()
+
+
+def list_runs(
+    conn: sqlite3.Connection,
+    source: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Ostatnie przebiegi (najnowsze pierwsze)"""
+    query = f"SELECT id, {', '.join(RUN_COLUMNS)} FROM sync_runs WHERE 1=1"
+    params: list = []
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    if since:
+        query += " AND started_at >= ?"
+        params.append(since)
+    query += " ORDER BY started_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    cursor = conn.execute(query, params)
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def summarize_runs(conn: sqlite3.Connection, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Trend per źródło: średnie i maksymalne czasy, bajty, liczniki"""
+    query = '''
+        SELECT source, COUNT(*) AS runs,
+            SUM(CASE WHEN status = 'error' THEN 1 ELSE 0 END) AS errors,
+            AVG(total_seconds) AS avg_total_seconds, MAX(total_seconds) AS max_total_seconds,
+            AVG(http_seconds) AS avg_http_seconds, AVG(parse_seconds) AS avg_parse_seconds,
+            AVG(write_seconds) AS avg_write_seconds, SUM(bytes_downloaded) AS bytes_downloaded,
+            SUM(new) AS new, SUM(updated) AS updated, SUM(failed) AS failed,
+            MAX(started_at) AS last_run_at
+        FROM sync_runs
+    '''
+    params: list = []
+    if since:
+        query += " WHERE started_at >= ?"
+        params.append(since)
+    query += " GROUP BY source ORDER BY avg_total_seconds DESC"
+    cursor = conn.execute(query, params)
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy analityki pipeline'u
+"""
+
+import pytest
+import sqlite3
+
+from analytics import pipeline_value, conversion, breakdown, pipeline_report
+from utils import calculate_pipeline_value, calculate_conversion_rate
+
+
+# ============= FIXTURES =============
+
+LEADS = [
+    # (event_id, status, value, package)
+    (1, 'new', 1000.0, 'basic'),
+    (1, 'active', 2000.0, 'standard'),
+    (2, 'won', 3000.0, 'standard'),
+    (2, 'won', 1500.0, 'premium'),
+    (3, 'lost', 990.0, None),
+    (3, 'negotiation', 4990.0, 'premium'),
+]
+
+
+@pytest.fixture
+def conn():
+    """Baza w pamięci z wydarzeniami i leadami"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT, category TEXT, source TEXT);
+        CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER,
+            status TEXT DEFAULT 'new', value REAL DEFAULT 0, package TEXT);
+        INSERT INTO events VALUES (1, 'Runmageddon', 'OCR', 'Runmageddon.pl');
+        INSERT INTO events VALUES (2, 'HYROX', 'Fitness', 'HYROX.com');
+        INSERT INTO events VALUES (3, 'PGA', 'Targi', 'MTP.pl');
+    ''')
+    conn.executemany("INSERT INTO leads (event_id, status, value, package) VALUES (?, ?, ?, ?)", LEADS)
+    yield conn
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestPipelineAnalytics:
+    """Zgodność agregatów SQL z funkcjami z utils"""
+
+    def test_pipeline_value_matches_utils(self, conn):
+        leads = [{'status': s, 'value': v} for _, s, v, _ in LEADS]
+        assert pipeline_value(conn) == calculate_pipeline_value(leads)
+
+    def test_pipeline_value_empty(self, conn):
+        conn.execute("DELETE FROM leads")
+        result = pipeline_value(conn)
+        assert result['total'] == 0
+        assert result['won'] == 0
+
+    def test_conversion(self, conn):
+        result = conversion(conn)
+        assert result['total_leads'] == 6
+        assert result['won'] == 2
+        assert result['lost'] == 1
+        assert result['conversion_rate'] == calculate_conversion_rate(6, 2)
+
+    def test_breakdown_by_category(self, conn):
+        rows = {r['key']: r for r in breakdown(conn, 'category')}
+        assert rows['Fitness']['leads'] == 2
+        assert rows['Fitness']['won'] == 2
+        assert rows['Fitness']['won_value'] == 4500
+        assert rows['Fitness']['conversion_rate'] == 100.0
+        assert rows['OCR']['value'] == 3000
+
+    def test_breakdown_by_package_includes_missing(self, conn):
+        rows = {r['key']: r for r in breakdown(conn, 'package')}
+        assert rows[None]['leads'] == 1
+        assert rows['premium']['value'] == 6490
+
+    def test_breakdown_by_source_sorted_by_value(self, conn):
+        values = [r['value'] for r in breakdown(conn, 'source')]
+        assert values == sorted(values, reverse=True)
+
+    def test_breakdown_unknown_dimension(self, conn):
+        with pytest.raises(ValueError):
+            breakdown(conn, 'status; DROP TABLE leads')
+
+    def test_pipeline_report(self, conn):
+        report = pipeline_report(conn)
+        assert set(report) == {'pipeline', 'conversion', 'by_package', 'by_category', 'by_source'}
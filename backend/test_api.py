@@ -11,10 +11,23 @@ import pytest
 import tempfile
 import os
 import sqlite3
-from datetime import datetime, timedelta
+import json
+import asyncio
+from datetime import date, datetime, timedelta
 
 from fastapi.testclient import TestClient
 
+import archive
+import changefeed
+import event_calendar
+import funnel
+import geo
+import olap
+import snapshot
+import sync_daemon
+import sync_history
+from sync_history import SourceRun
+
 
 # ============= FIXTURES =============
 
@@ -49,13 +62,20 @@ def init_test_db(temp_db_path):
             follow_up_date TEXT, created_at TEXT, updated_at TEXT,
             FOREIGN KEY (event_id) REFERENCES events(id)
         );
+        CREATE INDEX IF NOT EXISTS idx_leads_follow_up ON leads(follow_up_date, status);
         CREATE TABLE IF NOT EXISTS offers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER, event_id INTEGER,
+            id INTEGER PRIMARY KEY AUTOINCREMENT, number TEXT UNIQUE, lead_id INTEGER, event_id INTEGER,
             package TEXT, base_price REAL, additional_services TEXT, total_price REAL,
             valid_until TEXT, status TEXT DEFAULT 'draft', pdf_path TEXT,
             created_at TEXT, sent_at TEXT
         );
     ''')
+    conn.executescript(sync_history.SCHEMA)
+    conn.executescript(sync_daemon.SCHEMA)
+    event_calendar.add_date_columns(conn)
+    geo.install(conn)
+    funnel.install(conn)
+    conn.executescript(changefeed.SCHEMA)
     
     # Dodaj przykładowe dane
     now = datetime.now().isoformat()
@@ -128,6 +148,56 @@ class TestHealthCheck:
         assert "timestamp" in data
 
 
+# ============= TESTY METRYK =============
+
+class TestMetricsAPI:
+    """Testy endpointu /metrics"""
+    
+    def test_metrics_endpoint(self, client):
+        """Test metryk per szablon trasy"""
+        client.get("/api/events/1")
+        client.get("/api/events/9999")
+        
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith("text/plain")
+        text = response.text
+        assert 'streamflow_http_requests_total{method="GET",route="/api/events/{event_id}",status="200"}' in text
+        assert 'route="/api/events/{event_id}",status="404"' in text
+        assert 'streamflow_db_query_duration_seconds_count{route="/api/events/{event_id}"}' in text
+        assert 'streamflow_http_requests_in_progress{method="GET"} 1' in text
+
+
+# ============= TESTY PROFILERA SQL =============
+
+class TestQueryProfilerAPI:
+    """Testy endpointu /debug/queries"""
+    
+    def test_debug_queries_disabled_by_default(self, client):
+        """Test że profilowanie jest opt-in - bez SQL_PROFILING endpointów nie ma"""
+        assert client.get("/debug/queries").status_code == 404
+        assert client.delete("/debug/queries").status_code == 404
+    
+    def test_debug_queries_report(self, init_test_db, monkeypatch):
+        """Test raportu przy SQL_PROFILING=1"""
+        monkeypatch.setenv('DATABASE_PATH', init_test_db)
+        monkeypatch.setenv('SQL_PROFILING', '1')
+        import importlib
+        import api
+        importlib.reload(api)
+        profiling_client = TestClient(api.app)
+        
+        profiling_client.delete("/debug/queries")
+        profiling_client.get("/api/events/1")
+        profiling_client.get("/api/events/2")
+        report = profiling_client.get("/debug/queries").json()
+        
+        assert report['enabled'] is True
+        counts = {q['fingerprint']: q['count'] for q in report['queries']}
+        assert counts["SELECT * FROM events WHERE id = ?"] == 2
+
+
 # ============= TESTY EVENTS API =============
 
 class TestEventsAPI:
@@ -250,6 +320,230 @@ class TestEventsAPI:
         assert get_response.status_code == 404
 
 
+# ============= TESTY KALENDARZA =============
+
+class TestCalendarAPI:
+    """Testy /api/calendar"""
+
+    def test_calendar_days(self, client):
+        """Test kubełków dziennych z top wydarzeniami"""
+        response = client.get("/api/calendar", params={"from": "2026-06-01", "to": "2026-07-31"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['from'] == '2026-06-01'
+        assert [(b['key'], b['events'], b['audience']) for b in data['buckets']] == \
+            [('2026-06-15', 1, 5000), ('2026-07-20', 1, 0)]
+        assert data['buckets'][0]['top'][0]['name'] == 'Test Event 1'
+
+    def test_calendar_weeks(self, client):
+        """Test kubełków tygodniowych"""
+        data = client.get("/api/calendar", params={"from": "2026-06-01", "to": "2026-07-31",
+                                                   "granularity": "week"}).json()
+
+        assert [(b['key'], b['start']) for b in data['buckets']] == \
+            [('2026-W25', '2026-06-15'), ('2026-W30', '2026-07-20')]
+
+    def test_calendar_default_month(self, client):
+        """Test domyślnego zakresu (miesiąc z 'from')"""
+        data = client.get("/api/calendar", params={"from": "2026-02-10"}).json()
+
+        assert (data['from'], data['to']) == ('2026-02-10', '2026-02-28')
+
+    def test_calendar_invalid_range(self, client):
+        """Test 'to' przed 'from'"""
+        response = client.get("/api/calendar", params={"from": "2026-07-01", "to": "2026-06-01"})
+
+        assert response.status_code == 400
+
+
+class TestGeoAPI:
+    """Testy filtra near/radius_km w /api/events"""
+
+    def test_near_city(self, client):
+        """Test wyszukiwania w promieniu od miasta"""
+        near_krakow = client.get("/api/events", params={"near": "Katowice", "radius_km": 80}).json()
+        both = client.get("/api/events", params={"near": "Kielce", "radius_km": 200}).json()
+
+        assert [e['name'] for e in near_krakow] == ['Test Event 2']
+        assert sorted(e['name'] for e in both) == ['Test Event 1', 'Test Event 2']
+
+    def test_near_coordinates_with_filters(self, client):
+        """Test współrzędnych łączonych z innymi filtrami"""
+        response = client.get("/api/events", params={"near": "52.23,21.01", "radius_km": 5, "category": "OCR"})
+
+        assert [e['name'] for e in response.json()] == ['Test Event 1']
+
+    def test_near_follows_city_update(self, client, init_test_db):
+        """Test ponownego geokodowania po zmianie miasta"""
+        conn = sqlite3.connect(init_test_db)
+        conn.execute("UPDATE events SET city = 'Gdansk' WHERE id = 2")
+        conn.commit()
+        conn.close()
+
+        data = client.get("/api/events", params={"near": "Gdynia", "radius_km": 30}).json()
+        assert [e['name'] for e in data] == ['Test Event 2']
+
+    def test_near_unknown(self, client):
+        """Test nieznanej lokalizacji"""
+        response = client.get("/api/events", params={"near": "Atlantyda"})
+
+        assert response.status_code == 400
+
+
+class TestArchiveAPI:
+    """Testy include_archived"""
+
+    @pytest.fixture
+    def archived(self, client, init_test_db, tmp_path, monkeypatch):
+        """Test Event 1 (z leadem) przeniesiony do archiwum"""
+        monkeypatch.setenv('ARCHIVE_DATABASE_PATH', str(tmp_path / "archive.db"))
+        conn = sqlite3.connect(init_test_db)
+        archive.archive_events(conn, before=date(2026, 7, 1))
+        conn.close()
+        return client
+
+    def test_hot_only_by_default(self, archived):
+        """Test listy bez archiwum"""
+        events = archived.get("/api/events").json()
+
+        assert [e['name'] for e in events] == ['Test Event 2']
+        assert archived.get("/api/events/1").status_code == 404
+        assert archived.get("/api/leads").json() == []
+
+    def test_include_archived(self, archived):
+        """Test UNION z archiwum"""
+        events = archived.get("/api/events", params={"include_archived": True, "fields": "summary"}).json()
+        detail = archived.get("/api/events/1", params={"include_archived": True})
+        leads = archived.get("/api/leads", params={"include_archived": True}).json()
+
+        assert [e['name'] for e in events] == ['Test Event 1', 'Test Event 2']
+        assert detail.json()['name'] == 'Test Event 1'
+        assert [lead['company'] for lead in leads] == ['Test Company']
+
+    def test_include_archived_with_filters(self, archived):
+        """Test filtrów działających na obu częściach"""
+        ocr = archived.get("/api/events", params={"include_archived": True, "category": "OCR"}).json()
+        later = archived.get("/api/events", params={"include_archived": True, "date_from": "2026-07-01"}).json()
+
+        assert [e['name'] for e in ocr] == ['Test Event 1']
+        assert [e['name'] for e in later] == ['Test Event 2']
+
+
+# ============= TESTY SZYBKIEJ SERIALIZACJI =============
+
+class TestFastSerialization:
+    """Testy szybkiej ścieżki list (bez walidacji Pydantic)"""
+    
+    def test_list_events_same_as_pydantic(self, client):
+        """Test że szybka ścieżka daje ten sam JSON co model odpowiedzi"""
+        import api
+        
+        events = client.get("/api/events").json()
+        
+        for event in events:
+            assert event == api.EventResponse(**event).model_dump(mode='json')
+            assert list(event) == list(api.EVENT_RESPONSE_COLUMNS)
+    
+    def test_list_leads_same_as_pydantic(self, client):
+        """Test JSON leadów zgodny z LeadResponse"""
+        import api
+        
+        leads = client.get("/api/leads").json()
+        
+        assert leads[0] == api.LeadResponse(**leads[0]).model_dump(mode='json')
+        assert leads[0]['company'] == 'Test Company'
+    
+    def test_openapi_schema_full_or_partial(self, client):
+        """Test że schemat OpenAPI opisuje pełne obiekty albo tylko pola z fields="""
+        schema = client.get("/openapi.json").json()
+        
+        for path, model in [("/api/events", "EventResponse"), ("/api/leads", "LeadResponse")]:
+            response_schema = schema['paths'][path]['get']['responses']['200']['content']['application/json']['schema']
+            variants = [variant['items']['$ref'].rsplit('/', 1)[-1] for variant in response_schema['anyOf']]
+            assert variants == [model, model.replace("Response", "FieldsResponse")]
+            assert schema['components']['schemas'][variants[1]]['required'] == ['id']
+    
+    def test_list_events_compressed(self, client):
+        """Test kompresji dużych list (powyżej progu)"""
+        for i in range(30):
+            client.post("/api/events", json={
+                "name": f"Bulk Event {i}", "organizer": "Org", "date_start": "2026-09-01",
+                "location": "Poznań", "category": "Targi", "source": "API"
+            })
+        
+        response = client.get("/api/events?limit=50", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 32
+    
+    def test_fast_path_matches_pydantic_without_validation(self, client, monkeypatch):
+        """Test szybkiej ścieżki: ten sam JSON co walidacja Pydantic, bez serialize_response (czas - benchmark.py)"""
+        import api
+        import fastapi.routing
+        from fastapi.encoders import jsonable_encoder
+
+        validated = []
+        serialize_response = fastapi.routing.serialize_response
+
+        async def counting_serialize_response(*args, **kwargs):
+            validated.append(kwargs.get("field"))
+            return await serialize_response(*args, **kwargs)
+
+        monkeypatch.setattr(fastapi.routing, "serialize_response", counting_serialize_response)
+
+        rows = client.get("/api/events").json()
+        assert validated == []
+
+        assert rows == jsonable_encoder([api.EventResponse.model_validate(row) for row in rows])
+        assert rows[0] == client.get(f"/api/events/{rows[0]['id']}").json()
+        assert len(validated) == 1
+
+
+# ============= TESTY PROJEKCJI KOLUMN =============
+
+class TestSparseFieldsets:
+    """Testy parametru fields= na listach"""
+    
+    def test_list_events_with_fields(self, client):
+        """Test wybranych pól (id zawsze dołączone)"""
+        response = client.get("/api/events?fields=name,city")
+        
+        assert response.status_code == 200
+        events = response.json()
+        assert all(list(e) == ['name', 'city', 'id'] for e in events)
+    
+    def test_list_events_summary_preset(self, client):
+        """Test presetu summary"""
+        import api
+        
+        events = client.get("/api/events?fields=summary").json()
+        
+        assert set(events[0]) == set(api.EVENT_FIELD_PRESETS['summary'])
+        assert 'description' not in events[0]
+        assert 'notes' not in events[0]
+    
+    def test_list_events_fields_with_filters(self, client):
+        """Test projekcji razem z filtrami po niewybranych kolumnach"""
+        events = client.get("/api/events?fields=name&search=Warsaw&category=OCR").json()
+        
+        assert events == [{'name': 'Test Event 1', 'id': 1}]
+    
+    def test_list_events_unknown_field(self, client):
+        """Test nieznanego pola"""
+        response = client.get("/api/events?fields=name,hash")
+        
+        assert response.status_code == 400
+        assert "hash" in response.json()['detail']
+    
+    def test_list_leads_with_fields(self, client):
+        """Test projekcji na leadach"""
+        leads = client.get("/api/leads?fields=summary").json()
+        
+        assert leads[0]['company'] == 'Test Company'
+        assert 'email' not in leads[0]
+
+
 # ============= TESTY LEADS API =============
 
 class TestLeadsAPI:
@@ -312,6 +606,48 @@ class TestLeadsAPI:
         assert response.status_code == 404
 
 
+# ============= TESTY FOLLOW-UP =============
+
+class TestDueLeadsAPI:
+    """Testy /api/leads/due"""
+
+    @pytest.fixture
+    def due_db(self, init_test_db):
+        today = datetime.now().date()
+        conn = sqlite3.connect(init_test_db)
+        conn.executemany(
+            "INSERT INTO leads (event_id, company, status, follow_up_date, created_at, updated_at) "
+            "VALUES (1, ?, ?, ?, '', '')", [
+                ('Zaległy', 'active', (today - timedelta(days=3)).isoformat()),
+                ('Za 2 dni', 'new', (today + timedelta(days=2)).isoformat()),
+                ('Za miesiąc', 'new', (today + timedelta(days=30)).isoformat()),
+                ('Wygrany', 'won', today.isoformat()),
+            ])
+        conn.commit()
+        conn.close()
+        return init_test_db
+
+    def test_due_default(self, client, due_db):
+        """Test zaległych i nadchodzących w 7 dni"""
+        response = client.get("/api/leads/due")
+
+        assert response.status_code == 200
+        leads = response.json()
+        assert [(lead['company'], lead['overdue']) for lead in leads] == [('Zaległy', True), ('Za 2 dni', False)]
+
+    def test_due_without_overdue(self, client, due_db):
+        """Test tylko nadchodzących w dłuższym oknie"""
+        leads = client.get("/api/leads/due", params={"overdue": "false", "days": 31}).json()
+
+        assert [lead['company'] for lead in leads] == ['Za 2 dni', 'Za miesiąc']
+
+    def test_due_by_status(self, client, due_db):
+        """Test filtra statusu (także zamkniętych)"""
+        leads = client.get("/api/leads/due", params={"status": "won"}).json()
+
+        assert [lead['company'] for lead in leads] == ['Wygrany']
+
+
 # ============= TESTY OFFERS API =============
 
 class TestOffersAPI:
@@ -336,6 +672,73 @@ class TestOffersAPI:
         assert offer['base_price'] == 2490
         assert 'total_price' in offer
         assert 'valid_until' in offer
+        assert offer['number'] == f"OF/{datetime.now().year}/{datetime.now().month:02d}/0001"
+    
+    def test_create_offer_numbers_are_sequential(self, client):
+        """Test kolejnych numerów ofert"""
+        offer_data = {"lead_id": 1, "event_id": 1, "package": "basic"}
+        
+        numbers = [client.post("/api/offers", json=offer_data).json()['number'] for _ in range(3)]
+        
+        assert [n.rsplit('/', 1)[1] for n in numbers] == ['0001', '0002', '0003']
+    
+    def test_create_offer_uses_pricing_engine(self, client):
+        """Test że oferta liczy usługi i VAT z jednego cennika"""
+        offer_data = {
+            "lead_id": 1,
+            "event_id": 1,
+            "package": "basic",
+            "additional_services": ["led_screen"],
+            "discount": 0
+        }
+        
+        response = client.post("/api/offers", json=offer_data)
+        
+        assert response.status_code == 200
+        offer = response.json()
+        assert offer['total_price'] == 990 + 1500
+        assert offer['gross_price'] == round((990 + 1500) * 1.23, 2)
+    
+    def test_quote_offers_batch(self, client):
+        """Test wsadowej wyceny ofert"""
+        items = [
+            {"package": package, "additional_services": services, "discount": discount}
+            for package in ["basic", "standard", "premium"]
+            for services in [[], ["drone"], ["drone", "vod"]]
+            for discount in [0, 10]
+        ]
+        
+        response = client.post("/api/offers/quote", json={"items": items})
+        
+        assert response.status_code == 200
+        quotes = response.json()
+        assert len(quotes) == len(items)
+        assert quotes[0]['package'] == "basic"
+        assert quotes[0]['net'] == 990
+        assert quotes[-1]['additional_services'] == ["drone", "vod"]
+        assert quotes[-1]['net'] == (4990 + 800 + 200) * 0.9
+    
+    def test_quote_offers_invalid_package(self, client):
+        """Test wyceny z nieprawidłowym pakietem"""
+        response = client.post("/api/offers/quote", json={"items": [{"package": "nonexistent"}]})
+        
+        assert response.status_code == 422
+    
+    def test_quote_offers_discount_out_of_range(self, client):
+        """Test wyceny z rabatem spoza 0-100%"""
+        for discount in [-5, 150]:
+            response = client.post("/api/offers/quote", json={"items": [{"package": "basic", "discount": discount}]})
+            assert response.status_code == 422
+    
+    def test_quote_offers_unknown_services(self, client):
+        """Test wyceny z nieznanymi usługami - 422 z listą błędnych kodów"""
+        items = [{"package": "basic", "additional_services": ["drone", "jetpack", "hologram"]}]
+        response = client.post("/api/offers/quote", json={"items": items})
+        
+        assert response.status_code == 422
+        message = response.json()['detail'][0]['msg']
+        assert "hologram, jetpack" in message
+        assert "drone" not in message
     
     def test_create_offer_with_invalid_package(self, client):
         """Test tworzenia oferty z nieprawidłowym pakietem"""
@@ -372,6 +775,283 @@ class TestStatsAPI:
         assert stats['events']['total'] >= 2
         assert stats['leads']['total'] >= 1
 
+    def test_stats_cache_follows_other_process_writes(self, client, init_test_db):
+        """Test unieważnienia cache zapisem spoza workera (wersja dziennika zmian)"""
+        first = client.get("/api/stats").json()
+        assert client.get("/api/stats").json() == first
+
+        conn = sqlite3.connect(init_test_db)
+        conn.execute("INSERT INTO leads (event_id, company, status) VALUES (2, 'Inny worker', 'new')")
+        conn.commit()
+        conn.close()
+
+        assert client.get("/api/stats").json()['leads']['total'] == first['leads']['total'] + 1
+
+
+# ============= TESTY STREAM (SSE) =============
+
+async def read_sse(app, until, path="/api/stream", timeout=5.0):
+    """Czyta ramki SSE bezpośrednio z ASGI (TestClient buforuje całe body) do spełnienia until(ramki)"""
+    frames = []
+    buffer = b""
+    disconnect = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal buffer
+        if message["type"] != "http.response.body":
+            return
+        buffer += message.get("body", b"")
+        *complete, buffer = buffer.split(b"\n\n")
+        for raw in complete:
+            fields = dict(line.split(": ", 1) for line in raw.decode().splitlines() if ": " in line)
+            if "event" in fields:
+                frames.append((fields["event"], json.loads(fields["data"])))
+        if until(frames):
+            disconnect.set()
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "headers": [(b"host", b"testserver")], "client": ("test", 1),
+             "server": ("testserver", 80)}
+    await asyncio.wait_for(app(scope, receive, send), timeout=timeout)
+    return frames
+
+
+class TestStreamAPI:
+    """Testy kanału push /api/stream"""
+
+    async def test_snapshot_on_connect(self, client):
+        """Test snapshotu statystyk po podłączeniu"""
+        import api
+
+        frames = await read_sse(api.app, lambda frames: len(frames) >= 1)
+
+        event, data = frames[0]
+        assert event == "snapshot"
+        assert data["events"]["total"] == 2
+        assert api.broadcaster.subscribers == set()
+
+    async def test_pushes_external_changes(self, client, init_test_db):
+        """Test push nowego wydarzenia i delty statystyk po zapisie z innego procesu"""
+        import api
+        api.change_watcher.interval = 0.02
+
+        def write_when_connected(frames):
+            if len(frames) == 1:
+                now = datetime.now().isoformat()
+                conn = sqlite3.connect(init_test_db)
+                conn.execute("""
+                    INSERT INTO events (hash, name, city, source, status, discovered_at, updated_at)
+                    VALUES ('hash3', 'Pushed Event', 'Gdańsk', 'HYROX.com', 'new', ?, ?)
+                """, (now, now))
+                conn.execute("UPDATE leads SET status = 'won', updated_at = ? WHERE id = 1", (now,))
+                conn.commit()
+                conn.close()
+            return {"stats", "events", "leads"} <= {event for event, _ in frames}
+
+        frames = await read_sse(api.app, write_when_connected)
+        pushed = dict(frames)
+
+        assert pushed["events"][0]["name"] == "Pushed Event"
+        assert pushed["events"][0]["change"] == "created"
+        assert pushed["leads"][0]["change"] == "updated"
+        assert pushed["leads"][0]["status"] == "won"
+        assert pushed["stats"]["events"] == {"total": 1, "new": 1}
+        assert pushed["stats"]["sources"] == {"HYROX.com": 1}
+
+    async def test_pushes_offer_lifecycle(self, client, init_test_db):
+        """Test push leada po wysłaniu oferty - zapis w API budzi watcher bez czekania na interwał"""
+        import api
+        api.change_watcher.interval = 30
+        conn = sqlite3.connect(init_test_db)
+        conn.row_factory = sqlite3.Row
+        conn.execute("INSERT INTO offers (lead_id, event_id, package, status) VALUES (1, 1, 'standard', 'draft')")
+        conn.commit()
+
+        def send_when_connected(frames):
+            if len(frames) == 1:
+                asyncio.get_running_loop().create_task(api.send_offer(1, db=conn))
+            return {"stats", "leads"} <= {event for event, _ in frames}
+
+        try:
+            frames = await read_sse(api.app, send_when_connected, timeout=5)
+        finally:
+            conn.close()
+        pushed = dict(frames)
+
+        assert pushed["leads"][0]["id"] == 1
+        assert (pushed["leads"][0]["status"], pushed["leads"][0]["change"]) == ("offer_sent", "updated")
+
+    async def test_pushes_event_contacted_on_new_lead(self, client, init_test_db):
+        """Test push wydarzenia 'contacted' po dodaniu leada przez API"""
+        import api
+        api.change_watcher.interval = 30
+        conn = sqlite3.connect(init_test_db)
+        conn.row_factory = sqlite3.Row
+        lead = api.LeadCreate(event_id=1, company="Nowa Firma", contact_person="Anna Nowak")
+
+        def create_when_connected(frames):
+            if len(frames) == 1:
+                asyncio.get_running_loop().create_task(api.create_lead(lead, db=conn))
+            return {"events", "leads"} <= {event for event, _ in frames}
+
+        try:
+            frames = await read_sse(api.app, create_when_connected, timeout=5)
+        finally:
+            conn.close()
+        pushed = dict(frames)
+
+        assert pushed["events"][0]["id"] == 1
+        assert (pushed["events"][0]["status"], pushed["events"][0]["change"]) == ("contacted", "updated")
+        assert pushed["leads"][0]["company"] == "Nowa Firma"
+
+
+# ============= TESTY CHANGE FEED =============
+
+class TestChangesAPI:
+    """Testy /api/changes"""
+
+    def test_full_copy_then_incremental(self, client):
+        """Test pełnej kopii (since=0), a potem tylko zmian"""
+        full = client.get("/api/changes").json()
+
+        assert {(c['table'], c['id']) for c in full['changes']} == {('events', 1), ('events', 2), ('leads', 1)}
+        assert full['changes'][0]['data']['name'] == 'Test Event 1'
+
+        client.patch("/api/leads/1", json={"status": "won"})
+        delta = client.get("/api/changes", params={"since": full['version']}).json()
+
+        assert [(c['table'], c['id'], c['op']) for c in delta['changes']] == [('leads', 1, 'update')]
+        assert delta['changes'][0]['data']['status'] == 'won'
+        assert delta['version'] > full['version']
+
+    def test_delete_and_filter(self, client):
+        """Test tombstone po usunięciu i filtra tables"""
+        since = client.get("/api/changes").json()['version']
+        client.delete("/api/events/2")
+
+        events = client.get("/api/changes", params={"since": since, "tables": "events"}).json()
+        leads = client.get("/api/changes", params={"since": since, "tables": "leads"}).json()
+
+        assert events['changes'] == [{'version': since + 1, 'table': 'events', 'id': 2, 'op': 'delete', 'data': None}]
+        assert leads['changes'] == []
+        assert leads['version'] == events['version']
+
+    def test_unknown_table(self, client):
+        """Test nieznanej tabeli"""
+        response = client.get("/api/changes", params={"tables": "events,users"})
+
+        assert response.status_code == 400
+        assert "users" in response.json()['detail']
+
+
+# ============= TESTY ANALYTICS API =============
+
+class TestAnalyticsAPI:
+    """Testy endpointów /api/analytics"""
+    
+    def test_get_pipeline_analytics(self, client):
+        """Test raportu pipeline'u"""
+        response = client.get("/api/analytics/pipeline")
+        
+        assert response.status_code == 200
+        report = response.json()
+        
+        assert report['pipeline']['new'] == 2490.0
+        assert report['pipeline']['total'] == 2490.0
+        assert report['conversion']['total_leads'] == 1
+        assert report['by_category'][0]['key'] == 'OCR'
+        assert report['by_source'][0]['key'] == 'TestSource'
+
+    def test_funnel(self, client):
+        """Test lejka wg źródła, kategorii i miesiąca"""
+        data = client.get("/api/analytics/funnel").json()
+
+        assert data['total']['events'] == 2
+        assert data['total']['leads'] == 1
+        assert data['total']['lead_rate'] == 50.0
+        ocr = next(g for g in data['groups'] if g['category'] == 'OCR')
+        assert (ocr['source'], ocr['engaged'], ocr['share']) == ('TestSource', 1, 50.0)
+        assert ocr['month'] == datetime.now().strftime('%Y-%m')
+
+    def test_funnel_follows_writes(self, client):
+        """Test przyrostowego odświeżenia po ofercie i wygranej"""
+        client.post("/api/offers", json={"lead_id": 1, "event_id": 1, "package": "standard"})
+        client.patch("/api/leads/1", json={"status": "won"})
+
+        data = client.get("/api/analytics/funnel", params={"group_by": "source"}).json()
+        assert data['group_by'] == ['source']
+        test_source = next(g for g in data['groups'] if g['source'] == 'TestSource')
+        assert (test_source['offered'], test_source['won'], test_source['win_rate']) == (1, 1, 100.0)
+        assert 'category' not in test_source
+
+    def test_funnel_invalid_params(self, client):
+        """Test nieznanego wymiaru i złego miesiąca"""
+        assert client.get("/api/analytics/funnel", params={"group_by": "city"}).status_code == 400
+        assert client.get("/api/analytics/funnel", params={"from": "2026-1"}).status_code == 422
+
+    def test_duckdb_engine_matches_sqlite(self, client, init_test_db, tmp_path, monkeypatch):
+        """Test ANALYTICS_ENGINE=duckdb na snapshocie Parquet - te same odpowiedzi co z SQLite"""
+        if not (olap.DUCKDB_AVAILABLE and snapshot.PYARROW_AVAILABLE):
+            pytest.skip("duckdb lub pyarrow niedostępny")
+        paths = ["/api/analytics/pipeline", "/api/analytics/funnel", "/api/analytics/funnel?group_by=month"]
+        expected = [client.get(path).json() for path in paths]
+        conn = sqlite3.connect(init_test_db)
+        snapshot.export_snapshot(conn, str(tmp_path / "snapshot"))
+        conn.close()
+
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+        import importlib
+        import api
+        importlib.reload(api)
+        assert api.analytics_engine.source == "parquet"
+        with TestClient(api.app) as duck_client:
+            assert [duck_client.get(path).json() for path in paths] == expected
+
+    def test_duckdb_parquet_cache_follows_snapshot(self, client, init_test_db, tmp_path, monkeypatch):
+        """Test cache analityki na Parquet - nowy snapshot widoczny bez zapisu w SQLite"""
+        if not (olap.DUCKDB_AVAILABLE and snapshot.PYARROW_AVAILABLE):
+            pytest.skip("duckdb lub pyarrow niedostępny")
+        conn = sqlite3.connect(init_test_db)
+        snapshot.export_snapshot(conn, str(tmp_path / "snapshot"))
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "snapshot"))
+        import importlib
+        import api
+        importlib.reload(api)
+        try:
+            with TestClient(api.app) as duck_client:
+                conn.execute("UPDATE leads SET status = 'won' WHERE id = 1")
+                conn.commit()
+                assert duck_client.get("/api/analytics/pipeline").json()['pipeline']['new'] == 2490.0
+
+                snapshot.export_snapshot(conn, str(tmp_path / "snapshot"))
+                assert duck_client.get("/api/analytics/pipeline").json()['pipeline']['new'] == 0
+        finally:
+            conn.close()
+
+    def test_duckdb_engine_failure_starts_on_sqlite(self, client, tmp_path, monkeypatch):
+        """Test ANALYTICS_ENGINE=duckdb z niedostępnym źródłem - API startuje, analityka z SQLite"""
+        expected = client.get("/api/analytics/pipeline").json()
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "brak"))
+        import importlib
+        import api
+        importlib.reload(api)
+        assert api.analytics_engine is None
+        with TestClient(api.app) as fallback_client:
+            assert fallback_client.get("/api/analytics/pipeline").json() == expected
+
 
 # ============= TESTY PACKAGES API =============
 
@@ -394,6 +1074,17 @@ class TestPackagesAPI:
         assert packages['standard']['price'] == 2490
         assert packages['premium']['price'] == 4990
     
+    def test_get_packages_precompressed(self, client):
+        """Test że katalog pakietów jest serwowany skompresowany z pamięci"""
+        import api
+        
+        response = client.get("/api/packages", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.status_code == 200
+        if "gzip" in api.PACKAGES_PAYLOAD.variants:
+            assert response.headers["content-encoding"] == "gzip"
+        assert response.json()['basic']['price'] == 990
+    
     def test_get_additional_services(self, client):
         """Test pobierania usług dodatkowych"""
         response = client.get("/api/additional-services")
@@ -425,6 +1116,72 @@ class TestSyncAPI:
         assert 'sources_synced' in result
         assert 'duration_seconds' in result
 
+    async def test_resync_keeps_patched_fields(self, client, init_test_db):
+        """Test ponownej synchronizacji źródła po edycji wydarzenia w API"""
+        from aggregator import Database, EventAggregator, HyroxScraper
+        db = Database(init_test_db)
+        aggregator = EventAggregator(db)
+        await aggregator.sync_source(HyroxScraper(), "run-1")
+        event = client.get("/api/events", params={"source": "HYROX.com"}).json()[0]
+        update = {"organizer_email": "handlowiec@streamflow.pl", "organizer_phone": "+48 600 100 200",
+                  "description": "Ustalenia z organizatorem"}
+        assert client.patch(f"/api/events/{event['id']}", json=update).status_code == 200
+
+        await aggregator.sync_source(HyroxScraper(), "run-2")
+        db.conn.close()
+        after = client.get(f"/api/events/{event['id']}").json()
+        assert {key: after[key] for key in update} == update
+
+    def test_sync_runs_empty(self, client):
+        """Test pustej historii synchronizacji"""
+        response = client.get("/api/sync/runs")
+        
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_sync_runs_history(self, client, init_test_db):
+        """Test historii i podsumowania per źródło"""
+        conn = sqlite3.connect(init_test_db)
+        sync_history.record_run(conn, SourceRun('r1', 'HYROX.com', '2026-01-01T10:00:00',
+                                                http_seconds=1.5, bytes_downloaded=2048,
+                                                total_seconds=2.0, found=4, new=4))
+        sync_history.record_run(conn, SourceRun('r1', 'MTP.pl', '2026-01-01T10:00:03',
+                                                status='error', error='timeout', total_seconds=30.0))
+        conn.close()
+
+        runs = client.get("/api/sync/runs", params={"source": "HYROX.com"}).json()
+        summary = client.get("/api/sync/runs/summary").json()
+
+        assert len(runs) == 1
+        assert runs[0]['http_seconds'] == 1.5
+        assert runs[0]['bytes_downloaded'] == 2048
+        assert [s['source'] for s in summary] == ['MTP.pl', 'HYROX.com']
+        assert summary[0]['errors'] == 1
+
+    def test_sync_runs_since(self, client, init_test_db):
+        """Test filtra since"""
+        conn = sqlite3.connect(init_test_db)
+        sync_history.record_run(conn, SourceRun('r1', 'GoOut.net', '2025-12-01T10:00:00'))
+        conn.close()
+
+        response = client.get("/api/sync/runs", params={"since": "2026-01-01"})
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_sync_schedule(self, client, init_test_db):
+        """Test terminów demona (najbliższe pierwsze)"""
+        conn = sqlite3.connect(init_test_db)
+        conn.executemany("INSERT INTO sync_schedule (source, next_run_at, interval_seconds) VALUES (?, ?, ?)",
+                         [('MTP.pl', '2026-01-02T10:00:00', 43200), ('HYROX.com', '2026-01-01T10:30:00', 1800)])
+        conn.commit()
+        conn.close()
+
+        schedule = client.get("/api/sync/schedule").json()
+
+        assert [s['source'] for s in schedule] == ['HYROX.com', 'MTP.pl']
+        assert schedule[0]['skipped'] == 0
+
 
 # ============= TESTY WALIDACJI =============
 
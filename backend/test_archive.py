@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy archiwum wydarzeń
+"""
+
+import pytest
+from datetime import date
+
+import archive
+from aggregator import Database
+from archive import archive_events, archive_path, attach, union_source
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Baza ze schematem aplikacji: dwa minione wydarzenia z leadami i ofertami, jedno nadchodzące"""
+    monkeypatch.delenv("ARCHIVE_DATABASE_PATH", raising=False)
+    database = Database(str(tmp_path / "hot.db"))
+    conn = database.conn
+    conn.executemany("INSERT INTO events (name, date_start, category, source, discovered_at) VALUES (?, ?, ?, ?, ?)", [
+        ('Zimowy OCR', '2025-01-10', 'OCR', 'Runmageddon.pl', '2024-11-01'),
+        ('Wiosenny HYROX', '2025-03-15', 'Fitness', 'HYROX.com', '2024-12-01'),
+        ('Letni HYROX', '2026-07-01', 'Fitness', 'HYROX.com', '2026-01-01'),
+        ('Bez daty', None, 'OCR', 'GoOut.net', '2026-01-01'),
+    ])
+    conn.executemany("INSERT INTO leads (event_id, company, status, value) VALUES (?, ?, ?, ?)", [
+        (1, 'Firma A', 'won', 2490.0), (1, 'Firma B', 'lost', 0), (2, 'Firma C', 'new', 990.0),
+        (3, 'Firma D', 'new', 4990.0),
+    ])
+    conn.executemany("INSERT INTO offers (lead_id, event_id, package) VALUES (?, ?, ?)", [
+        (1, 1, 'standard'), (3, None, 'basic'), (4, 3, 'premium'),
+    ])
+    conn.commit()
+    yield database
+    conn.close()
+
+
+def count(conn, schema, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {schema}.{table}").fetchone()[0]
+
+
+# ============= TESTY =============
+
+class TestArchiveEvents:
+    """Testy przenoszenia do archiwum"""
+
+    def test_moves_past_events_with_leads_and_offers(self, db):
+        results = archive_events(db.conn, before=date(2026, 1, 1))
+
+        assert (results['events'], results['leads'], results['offers'], results['batches']) == (2, 3, 2, 1)
+        remaining = [r[0] for r in db.conn.execute("SELECT name FROM main.events ORDER BY id")]
+        assert remaining == ['Letni HYROX', 'Bez daty']
+        assert (count(db.conn, 'main', 'leads'), count(db.conn, 'main', 'offers')) == (1, 1)
+        assert (count(db.conn, 'archive', 'leads'), count(db.conn, 'archive', 'offers')) == (3, 2)
+        assert db.conn.execute("SELECT COUNT(*) FROM archive.events WHERE archived_at IS NOT NULL").fetchone()[0] == 2
+
+    def test_batches_and_rerun(self, db):
+        first = archive_events(db.conn, before=date(2026, 1, 1), batch_size=1, max_batches=1)
+        rest = archive_events(db.conn, before=date(2026, 1, 1), batch_size=1)
+        again = archive_events(db.conn, before=date(2026, 1, 1))
+
+        assert (first['events'], rest['events'], rest['batches'], again['events']) == (1, 1, 1, 0)
+        assert [r[0] for r in db.conn.execute("SELECT name FROM archive.events ORDER BY date_start")] == \
+            ['Zimowy OCR', 'Wiosenny HYROX']
+
+    def test_default_retention_keeps_recent(self, db):
+        assert archive_events(db.conn, retention_days=10_000)['events'] == 0
+
+    def test_funnel_keeps_archived_history(self, db):
+        import funnel
+        funnel.refresh(db.conn)
+        before = db.conn.execute("SELECT SUM(events), SUM(leads), SUM(won) FROM funnel_rollup").fetchone()[:]
+        db.conn.execute("UPDATE leads SET status = 'won' WHERE id = 3")
+        db.conn.commit()
+
+        archive_events(db.conn, before=date(2026, 1, 1))
+        funnel.refresh(db.conn)
+
+        after = db.conn.execute("SELECT SUM(events), SUM(leads), SUM(won) FROM funnel_rollup").fetchone()[:]
+        assert after == (before[0], before[1], before[2] + 1)
+
+
+class TestArchiveSchema:
+    """Testy dołączania archiwum"""
+
+    def test_archive_path(self, monkeypatch):
+        assert archive_path('/data/streamflow.db') == '/data/streamflow_archive.db'
+        monkeypatch.setenv('ARCHIVE_DATABASE_PATH', '/mnt/cold.db')
+        assert archive_path('/data/streamflow.db') == '/mnt/cold.db'
+
+    def test_attach_creates_file_and_follows_migrations(self, db, tmp_path):
+        attach(db.conn)
+        db.conn.execute("ALTER TABLE main.events ADD COLUMN ticket_url TEXT")
+        attach(db.conn)
+
+        assert (tmp_path / "hot_archive.db").exists()
+        assert 'ticket_url' in archive.stored_columns(db.conn, 'events', 'archive')
+        assert 'start_week' not in archive.stored_columns(db.conn, 'events', 'archive')
+
+    def test_union_source(self, db):
+        archive_events(db.conn, before=date(2026, 1, 1))
+        source = union_source(db.conn, 'events')
+
+        names = [r[0] for r in db.conn.execute(f"SELECT name FROM {source} WHERE category = 'OCR' ORDER BY id")]
+        assert names == ['Zimowy OCR', 'Bez daty']
+        plan = " ".join(r[-1] for r in db.conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM {source} WHERE date_start < '2025-06-01'"))
+        assert "idx_events_date" in plan and "idx_archive_events_date" in plan
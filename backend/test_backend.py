@@ -19,7 +19,8 @@ from unittest.mock import AsyncMock, MagicMock, patch
 # Import modułów do testowania
 from aggregator import (
     Event, Database, BaseScraper, RunmageddonScraper, 
-    HyroxScraper, GoOutScraper, MTPScraper, EventAggregator
+    HyroxScraper, GoOutScraper, MTPScraper, EventAggregator,
+    EVENT_FIELDS
 )
 
 
@@ -96,6 +97,21 @@ class TestEventModel:
         assert data['organizer'] == "Test Organizer Sp. z o.o."
         assert data['city'] == "Warszawa"
     
+    def test_event_to_dict_field_order(self, sample_event):
+        """Test że to_dict zachowuje kolejność kolumn"""
+        assert tuple(sample_event.to_dict()) == EVENT_FIELDS
+        assert sample_event.to_tuple() == tuple(sample_event.to_dict().values())
+    
+    def test_event_uses_slots(self, sample_event):
+        """Test kompaktowej reprezentacji (bez __dict__)"""
+        assert not hasattr(sample_event, '__dict__')
+        with pytest.raises(AttributeError):
+            sample_event.unknown_field = 1
+    
+    def test_event_from_row_roundtrip(self, sample_event):
+        """Test mapowania wiersz -> Event"""
+        assert Event.from_row(sample_event.to_tuple()) == sample_event
+    
     def test_event_hash_calculation(self, sample_event):
         """Test generowania hash'a"""
         hash1 = sample_event.calculate_hash()
@@ -154,6 +170,43 @@ class TestDatabase:
         # Powinien zwrócić to samo ID (event już istnieje)
         assert id1 == id2
     
+    def test_save_events_bulk(self, temp_db, sample_event):
+        """Test zapisu wsadowego z pominięciem duplikatów"""
+        temp_db.save_event(sample_event)
+        events = [sample_event] + [Event(name=f"Bulk {i}", date_start="2026-05-01") for i in range(5)]
+        
+        assert temp_db.save_events(events) == 5
+        assert temp_db.get_stats()['total'] == 6
+    
+    def test_upsert_event_outcomes(self, temp_db, sample_event):
+        """Test upsert: nowe, bez zmian, zaktualizowane (status zostaje)"""
+        event_id, outcome = temp_db.upsert_event(sample_event)
+        assert outcome == 'new'
+        temp_db.conn.execute("UPDATE events SET status = 'contacted' WHERE id = ?", (event_id,))
+        
+        assert temp_db.upsert_event(sample_event) == (event_id, 'unchanged')
+        
+        sample_event.estimated_audience = 12345
+        assert temp_db.upsert_event(sample_event) == (event_id, 'updated')
+        row = temp_db.conn.execute("SELECT status, estimated_audience FROM events WHERE id = ?",
+                                   (event_id,)).fetchone()
+        assert tuple(row) == ('contacted', 12345)
+    
+    def test_upsert_event_keeps_user_edits(self, temp_db, sample_event):
+        """Test upsert: pola edytowane w API nie są nadpisywane, puste są uzupełniane"""
+        event_id, _ = temp_db.upsert_event(sample_event)
+        temp_db.conn.execute("UPDATE events SET organizer_email = 'sprzedaz@firma.pl', description = '' "
+                             "WHERE id = ?", (event_id,))
+        
+        sample_event.organizer_email = None
+        sample_event.organizer_phone = ''
+        sample_event.description = 'Opis ze źródła'
+        assert temp_db.upsert_event(sample_event) == (event_id, 'updated')
+        row = temp_db.conn.execute("SELECT organizer_email, organizer_phone, description FROM events WHERE id = ?",
+                                   (event_id,)).fetchone()
+        assert tuple(row) == ('sprzedaz@firma.pl', '+48 500 000 000', 'Opis ze źródła')
+        assert temp_db.upsert_event(sample_event) == (event_id, 'unchanged')
+    
     def test_get_events_empty(self, temp_db):
         """Test pobierania z pustej bazy"""
         events = temp_db.get_events()
@@ -210,6 +263,18 @@ class TestDatabase:
         assert stats['total'] == 1
         assert stats['new'] == 1
     
+    def test_get_event_records(self, temp_db, sample_event):
+        """Test pobierania wydarzeń jako obiektów Event"""
+        event_id = temp_db.save_event(sample_event)
+        
+        records = temp_db.get_event_records()
+        assert len(records) == 1
+        assert isinstance(records[0], Event)
+        assert records[0].id == event_id
+        assert records[0].name == sample_event.name
+        assert records[0].status == 'new'
+        assert records[0].to_dict() == {k: v for k, v in temp_db.get_events()[0].items() if k != 'hash'}
+    
     def test_events_ordered_by_date(self, temp_db):
         """Test sortowania po dacie"""
         event1 = Event(name="Later", date_start="2026-12-01", location="A", organizer="X")
@@ -332,6 +397,17 @@ class TestEventAggregator:
         assert results['sources_synced'] == 4
         assert results['total_found'] >= 8  # Min 2 eventy z każdego źródła
     
+    @pytest.mark.asyncio
+    async def test_sync_records_metrics(self, aggregator):
+        """Test metryk synchronizacji per źródło"""
+        import metrics
+        before = metrics.SYNC_RUNS.value("HYROX.com", "ok")
+        
+        await aggregator.sync_all()
+        
+        assert metrics.SYNC_RUNS.value("HYROX.com", "ok") == before + 1
+        assert metrics.SYNC_DURATION.count("HYROX.com") >= 1
+    
     @pytest.mark.asyncio
     async def test_sync_saves_to_database(self, aggregator):
         """Test że synchronizacja zapisuje do bazy"""
@@ -353,6 +429,24 @@ class TestEventAggregator:
         count2 = aggregator.db.get_stats()['total']
         
         assert count1 == count2
+    
+    @pytest.mark.asyncio
+    async def test_sync_records_run_history(self, aggregator):
+        """Test historii przebiegów per źródło"""
+        import sync_history
+        first = await aggregator.sync_all()
+        second = await aggregator.sync_all()
+        
+        runs = sync_history.list_runs(aggregator.db.conn, source="HYROX.com")
+        
+        assert len(runs) == 2
+        assert runs[0]['run_id'] == second['run_id']
+        assert runs[1]['run_id'] == first['run_id']
+        assert runs[1]['new'] == runs[1]['found'] > 0
+        assert runs[0]['new'] == 0 and runs[0]['unchanged'] == runs[0]['found']
+        assert all(r['status'] == 'ok' and r['total_seconds'] >= r['write_seconds'] for r in runs)
+        assert first['new_events'] == first['total_found']
+        assert second['new_events'] == 0
 
 
 # ============= TESTY INTEGRACYJNE =============
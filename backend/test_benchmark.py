@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy zestawu benchmarków (mały rozmiar, tylko poprawność)
+"""
+
+import benchmark
+from benchmark import generate_events, check_targets, compare
+
+
+class TestBenchmark:
+    """Testy generatora danych i raportu"""
+
+    def test_generate_events_deterministic(self):
+        first = [e.to_tuple() for e in generate_events(50, seed=7)]
+        second = [e.to_tuple() for e in generate_events(50, seed=7)]
+        assert first == second
+        assert len({e[2] for e in first}) == 50  # unikalne nazwy -> unikalne hashe
+
+    def test_list_events_cases_cover_all_combinations(self):
+        cases = list(benchmark._list_events_cases())
+        assert len(cases) == 2 ** len(benchmark.LIST_EVENTS_FILTERS)
+        assert {} in cases
+
+    def test_run_report(self):
+        report = benchmark.run(sizes=[200], repeat=1, only="db.")
+
+        names = {r["name"] for r in report["results"]}
+        assert {"db.get_events", "db.get_stats"} <= names
+        assert all(r["size"] == 200 and r["median_ms"] >= 0 for r in report["results"])
+        assert report["meta"]["sizes"] == [200]
+
+    def test_compare(self):
+        baseline = {"results": [{"name": "a", "size": 1, "median_ms": 10.0},
+                                {"name": "b", "size": 1, "median_ms": 10.0}]}
+        report = {"results": [{"name": "a", "size": 1, "median_ms": 15.0},
+                              {"name": "b", "size": 1, "median_ms": 10.5},
+                              {"name": "c", "size": 1, "median_ms": 1.0}]}
+
+        rows = {r["name"]: r["verdict"] for r in compare(report, baseline)}
+
+        assert rows == {"a": "regression", "b": "same"}
+
+    def test_run_report_datagen(self):
+        report = benchmark.run(sizes=[300], repeat=1, only="datagen")
+
+        result, = report["results"]
+        assert (result["name"], result["size"]) == ("datagen.generate", 300)
+        assert result["ops"] > 300 and result["ops_per_sec"] > 0
+
+    def test_check_targets(self):
+        report = {"results": [{"name": "datagen.generate", "size": 10, "ops_per_sec": 90_000.0},
+                              {"name": "datagen.generate", "size": 20, "ops_per_sec": 150_000.0},
+                              {"name": "db.get_stats", "size": 10, "ops_per_sec": 1.0}]}
+
+        failures = check_targets(report, {"datagen.generate": 100_000})
+
+        assert [(f["size"], f["target"]) for f in failures] == [(10, 100_000)]
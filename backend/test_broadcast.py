@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy kanału push (SSE)
+"""
+
+import pytest
+import asyncio
+import json
+import sqlite3
+
+import broadcast
+from broadcast import Broadcaster, ChangeWatcher, format_event, stats_delta
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT, date_start TEXT, city TEXT, category TEXT,
+            source TEXT, potential_score INTEGER, status TEXT, discovered_at TEXT, updated_at TEXT);
+        CREATE TABLE leads (id INTEGER PRIMARY KEY, event_id INTEGER, company TEXT, status TEXT, value REAL,
+            package TEXT, follow_up_date TEXT, created_at TEXT, updated_at TEXT);
+        INSERT INTO events (name, status, discovered_at, updated_at) VALUES ('A', 'new', '2026-01-01', '2026-01-01');
+    ''')
+    yield conn
+    conn.close()
+
+
+def count_stats(conn):
+    return {"events": {"total": conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]}}
+
+
+def parse(frame: bytes):
+    fields = dict(line.split(": ", 1) for line in frame.decode().splitlines() if line)
+    return fields["event"], json.loads(fields["data"])
+
+
+# ============= TESTY =============
+
+class TestFormat:
+    """Testy ramek i delt"""
+
+    def test_format_event(self):
+        frame = format_event("stats", {"miasto": "Łódź"}, 7)
+        assert frame == 'id: 7\nevent: stats\ndata: {"miasto":"Łódź"}\n\n'.encode()
+
+    def test_stats_delta(self):
+        before = {"events": {"total": 2, "new": 1}, "revenue": {"won": 0},
+                  "sources": [{"name": "MTP.pl", "count": 2}]}
+        after = {"events": {"total": 3, "new": 1}, "revenue": {"won": 2490.0},
+                 "sources": [{"name": "MTP.pl", "count": 2}, {"name": "HYROX.com", "count": 1}]}
+
+        assert stats_delta(before, after) == {"events": {"total": 1}, "revenue": {"won": 2490.0},
+                                              "sources": {"HYROX.com": 1}}
+        assert stats_delta(after, after) == {}
+
+
+class TestBroadcaster:
+    """Testy fan-out"""
+
+    async def test_fan_out_same_frame(self):
+        hub = Broadcaster()
+        queues = [hub.subscribe() for _ in range(3)]
+
+        assert hub.publish("events", [{"id": 1}]) == 3
+
+        frames = [q.get_nowait() for q in queues]
+        assert frames[0] is frames[1] is frames[2]
+
+    async def test_slow_client_dropped(self):
+        hub = Broadcaster(queue_size=2)
+        slow, fast = hub.subscribe(), hub.subscribe()
+        for i in range(2):
+            hub.publish("stats", {"i": i})
+            fast.get_nowait()
+
+        hub.publish("stats", {"i": 2})
+
+        assert hub.subscribers == {fast}
+        assert slow.get_nowait() is None
+
+    async def test_stream_heartbeat_and_end(self):
+        hub = Broadcaster()
+        queue = hub.subscribe()
+        stream = hub.stream(queue, first=format_event("snapshot", {}), heartbeat=0.01)
+
+        assert b"event: snapshot" in await stream.__anext__()
+        assert await stream.__anext__() == b": ping\n\n"
+        queue.put_nowait(None)
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert hub.subscribers == set()
+
+
+class TestChangeWatcher:
+    """Testy odczytu zmian"""
+
+    def make_watcher(self, conn):
+        hub = Broadcaster()
+        queue = hub.subscribe()
+        watcher = ChangeWatcher(hub, lambda: conn, count_stats)
+        watcher.open()
+        return watcher, queue
+
+    def test_created_and_updated(self, conn):
+        watcher, queue = self.make_watcher(conn)
+        conn.execute("INSERT INTO events (name, discovered_at, updated_at) VALUES ('B', '2026-02-01', '2026-02-01')")
+        conn.execute("UPDATE events SET status = 'won', updated_at = '2026-02-01' WHERE id = 1")
+        watcher.data_version = None
+
+        assert watcher.poll() == 2
+
+        event, rows = parse(queue.get_nowait())
+        assert event == "events"
+        assert {r["name"]: r["change"] for r in rows} == {"A": "updated", "B": "created"}
+        assert parse(queue.get_nowait()) == ("stats", {"events": {"total": 1}})
+
+    def test_no_change_no_query(self, conn):
+        watcher, queue = self.make_watcher(conn)
+        assert watcher.poll() == 0
+        assert queue.empty()
+
+    def test_bulk_load_sends_resync(self, conn, monkeypatch):
+        monkeypatch.setattr(broadcast, "MAX_BATCH", 5)
+        watcher, queue = self.make_watcher(conn)
+        conn.executemany("INSERT INTO events (name, discovered_at, updated_at) VALUES (?, '2026-03-01', '2026-03-01')",
+                         [(f"E{i}",) for i in range(10)])
+        watcher.data_version = None
+
+        watcher.poll()
+
+        assert parse(queue.get_nowait()) == ("resync", {"table": "events"})
+        assert watcher.watermarks["events"] == ("2026-03-01", 11)
+
+    async def test_stops_without_subscribers(self, conn):
+        hub = Broadcaster()
+        watcher = ChangeWatcher(hub, lambda: sqlite3.connect(":memory:"), lambda c: {}, interval=0.01)
+        hub.subscribe()
+        watcher.open = lambda: None
+        watcher.poll = lambda: 0
+
+        watcher.ensure_running()
+        await asyncio.sleep(0.03)
+        hub.subscribers.clear()
+        await asyncio.wait_for(watcher.task, timeout=1)
+
+        assert watcher.task.done()
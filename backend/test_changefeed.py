@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy dziennika zmian
+"""
+
+import pytest
+import sqlite3
+
+import changefeed
+from changefeed import read_changes, current_version, backfill
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, status TEXT DEFAULT 'new');
+        CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER, status TEXT DEFAULT 'new');
+        CREATE TABLE offers (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER, total_price REAL);
+    ''')
+    conn.executescript(changefeed.SCHEMA)
+    yield conn
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestChangeFeed:
+    """Testy triggerów i odczytu zmian"""
+
+    def test_versions_monotonic_and_compacted(self, conn):
+        conn.execute("INSERT INTO events (name) VALUES ('A')")
+        conn.execute("INSERT INTO events (name) VALUES ('B')")
+        for status in ('contacted', 'qualified', 'won'):
+            conn.execute("UPDATE events SET status = ? WHERE id = 1", (status,))
+        conn.commit()
+
+        feed = read_changes(conn)
+
+        assert [(c['id'], c['op'], c['version']) for c in feed['changes']] == [(2, 'insert', 2), (1, 'update', 5)]
+        assert feed['changes'][1]['data'] == {'id': 1, 'name': 'A', 'status': 'won'}
+        assert feed['version'] == feed['current_version'] == 5
+
+    def test_since_returns_only_newer(self, conn):
+        conn.execute("INSERT INTO events (name) VALUES ('A')")
+        conn.commit()
+        version = read_changes(conn)['version']
+
+        conn.execute("INSERT INTO leads (event_id) VALUES (1)")
+        conn.execute("INSERT INTO offers (lead_id, total_price) VALUES (1, 2490)")
+        conn.commit()
+        feed = read_changes(conn, since=version)
+
+        assert [(c['table'], c['op']) for c in feed['changes']] == [('leads', 'insert'), ('offers', 'insert')]
+        assert read_changes(conn, since=feed['version'])['changes'] == []
+
+    def test_delete_tombstone(self, conn):
+        conn.execute("INSERT INTO events (name) VALUES ('A')")
+        conn.execute("DELETE FROM events WHERE id = 1")
+        conn.commit()
+
+        [change] = read_changes(conn)['changes']
+
+        assert change['op'] == 'delete'
+        assert change['data'] is None
+
+    def test_pagination(self, conn):
+        conn.executemany("INSERT INTO events (name) VALUES (?)", [(f"E{i}",) for i in range(7)])
+        conn.commit()
+
+        seen, since, pages = [], 0, 0
+        while True:
+            feed = read_changes(conn, since=since, limit=3)
+            seen += [c['id'] for c in feed['changes']]
+            since, pages = feed['version'], pages + 1
+            if not feed['has_more']:
+                break
+
+        assert seen == list(range(1, 8))
+        assert pages == 3
+
+    def test_table_filter_advances_cursor(self, conn):
+        conn.execute("INSERT INTO events (name) VALUES ('A')")
+        conn.commit()
+
+        feed = read_changes(conn, tables=['leads'])
+
+        assert feed['changes'] == []
+        assert feed['version'] == current_version(conn) == 1
+
+    def test_backfill_existing_rows(self):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript('''
+            CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+            CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER);
+            CREATE TABLE offers (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER);
+            INSERT INTO events (name) VALUES ('A'), ('B');
+            INSERT INTO leads (event_id) VALUES (1);
+        ''')
+        conn.executescript(changefeed.SCHEMA)
+
+        assert backfill(conn) == 3
+        assert backfill(conn) == 0
+        assert {(c['table'], c['id']) for c in read_changes(conn)['changes']} == \
+            {('events', 1), ('events', 2), ('leads', 1)}
+        conn.close()
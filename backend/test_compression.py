@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy kompresji odpowiedzi
+"""
+
+import pytest
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import compression
+from compression import CompressionMiddleware, PrecompressedPayload, choose_encoding
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def client():
+    """Mała aplikacja z middleware kompresji"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse("x" * 5000)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield "y" * 500
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(compression, 'BROTLI_AVAILABLE', False)
+
+
+# ============= TESTY =============
+
+class TestChooseEncoding:
+    """Testy negocjacji kodowania"""
+
+    def test_gzip(self, no_brotli):
+        assert choose_encoding("gzip, deflate, br") == "gzip"
+
+    def test_brotli_preferred(self):
+        if not compression.BROTLI_AVAILABLE:
+            pytest.skip("brotli niedostępny")
+        assert choose_encoding("gzip, deflate, br") == "br"
+
+    def test_none(self):
+        assert choose_encoding("") is None
+        assert choose_encoding("identity") is None
+        assert choose_encoding("gzip;q=0") is None
+
+
+class TestCompressionMiddleware:
+    """Testy middleware"""
+
+    def test_large_response_compressed(self, client, no_brotli):
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < 5000
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.text == "x" * 5000
+
+    def test_small_response_skipped(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip, br"})
+        assert "content-encoding" not in response.headers
+        assert response.text == "ok"
+
+    def test_no_accept_encoding(self, client):
+        response = client.get("/big", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_passthrough(self, client):
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text == "y" * 1500
+
+
+class TestPrecompressedPayload:
+    """Testy payloadów kompresowanych przy starcie"""
+
+    def test_variants_prepared_once(self, no_brotli):
+        body = b'{"a": "' + b"b" * 2000 + b'"}'
+        payload = PrecompressedPayload(body)
+        assert gzip.decompress(payload.variants["gzip"]) == body
+
+        response = payload.response("gzip")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.body is payload.variants["gzip"]
+
+    def test_identity_fallback(self):
+        payload = PrecompressedPayload(b'{"a": 1}')
+        response = payload.response("")
+        assert response.body == b'{"a": 1}'
+        assert "content-encoding" not in response.headers
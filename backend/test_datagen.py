@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy generatora danych
+"""
+
+import pytest
+from collections import Counter
+from datetime import datetime
+
+import changefeed
+import datagen
+from aggregator import Database
+from sequencer import NumberSequencer
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def db(tmp_path):
+    """Pusta baza ze schematem aplikacji"""
+    database = Database(str(tmp_path / "gen.db"))
+    yield database
+    database.conn.close()
+
+
+# ============= TESTY =============
+
+class TestEventRows:
+    """Testy rozkładów generowanych wydarzeń"""
+
+    def test_reproducible(self):
+        first = list(datagen.generate_event_rows(500, seed=7))
+        second = list(datagen.generate_event_rows(500, seed=7))
+        assert [r[:-2] for r in first] == [r[:-2] for r in second]  # bez znaczników czasu
+        assert first[0][1] != next(datagen.generate_event_rows(1, seed=8))[1]
+
+    def test_distributions(self):
+        rows = list(datagen.generate_event_rows(20000, seed=1))
+        cities = Counter(r[11] for r in rows)
+        categories = Counter(r[12] for r in rows)
+        audiences = sorted(r[16] for r in rows)
+
+        assert cities.most_common(1)[0][0] == 'Warszawa'
+        assert set(categories) <= set(datagen.CATEGORIES)
+        assert categories['Bieganie'] > categories['Koszykówka']
+        assert audiences[len(audiences) // 2] < sum(audiences) / len(audiences)  # prawoskośny
+        assert len({r[1] for r in rows}) == len(rows)
+
+    def test_near_duplicates(self):
+        rows = list(datagen.generate_event_rows(5000, seed=3))
+        by_day_org = Counter((r[8], r[4], r[11]) for r in rows)
+        assert any(count > 1 for count in by_day_org.values())
+
+
+class TestGenerate:
+    """Testy wstawiania wsadowego"""
+
+    def test_generate_counts_and_links(self, db):
+        result = datagen.generate(db.conn, 3000, seed=5, chunk_size=1000, workers=1)
+
+        conn = db.conn
+        assert result['events'] == conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 3000
+        assert result['leads'] == conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0] > 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM leads l LEFT JOIN events e ON e.id = l.event_id WHERE e.id IS NULL"
+        ).fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM offers o JOIN leads l ON l.id = o.lead_id AND l.event_id = o.event_id"
+        ).fetchone()[0] == result['offers'] > 0
+
+    def test_indexes_restored(self, db):
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ('events', 'leads', 'offers')"
+        before = {r[0] for r in db.conn.execute(query)}
+        datagen.generate(db.conn, 500, workers=1)
+        after = {r[0] for r in db.conn.execute(query)}
+        assert before == after
+
+    def test_geocoded_after_bulk_load(self, db):
+        query = "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_events_geo%'"
+        before = {r[0] for r in db.conn.execute(query)}
+        datagen.generate(db.conn, 500, workers=1)
+
+        assert {r[0] for r in db.conn.execute(query)} == before
+        assert db.conn.execute("SELECT COUNT(*) FROM events_geo").fetchone()[0] == 500
+
+    def test_funnel_rebuilt_after_bulk_load(self, db):
+        result = datagen.generate(db.conn, 500, workers=1)
+
+        events, leads = db.conn.execute("SELECT SUM(events), SUM(leads) FROM funnel_rollup").fetchone()
+        assert (events, leads) == (result['events'], result['leads'])
+        assert db.conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'trg_funnel_%'").fetchone()[0] == 9
+
+    def test_changefeed_backfilled_after_bulk_load(self, db):
+        query = "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_changes_%'"
+        before = {r[0] for r in db.conn.execute(query)}
+        datagen.generate(db.conn, 500, seed=1, workers=1)
+        datagen.generate(db.conn, 500, seed=2, workers=1)
+
+        assert {r[0] for r in db.conn.execute(query)} == before
+        for table in changefeed.TRACKED_TABLES:
+            rows, logged = db.conn.execute(
+                f"SELECT COUNT(*), COUNT(c.row_id) FROM {table} t "
+                f"LEFT JOIN changes c ON c.table_name = '{table}' AND c.row_id = t.id").fetchone()
+            assert rows == logged
+
+    def test_repeated_runs_append(self, db):
+        datagen.generate(db.conn, 1000, seed=1, workers=1)
+        datagen.generate(db.conn, 1000, seed=1, workers=1)
+
+        total, distinct = db.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT external_id) FROM events").fetchone()
+        assert total == distinct == 2000
+
+    def test_offer_numbers_continue_sequencer(self, db):
+        datagen.generate(db.conn, 2000, seed=2, workers=1)
+        period, = db.conn.execute(
+            "SELECT period FROM number_sequences WHERE series = 'OF' ORDER BY last_value DESC").fetchone()
+        year, month = map(int, period.split('/'))
+
+        number = NumberSequencer(db.db_path, block_size=1).offer_number(datetime(year, month, 1))
+
+        assert db.conn.execute("SELECT COUNT(*) FROM offers WHERE number = ?", (number,)).fetchone()[0] == 0
+
+    def test_worker_processes_same_data(self, tmp_path):
+        hashes = []
+        for workers in (1, 2):
+            database = Database(str(tmp_path / f"w{workers}.db"))
+            datagen.generate(database.conn, 1200, seed=9, chunk_size=400, workers=workers)
+            hashes.append([r[0] for r in database.conn.execute("SELECT hash FROM events ORDER BY id")])
+            database.conn.close()
+        assert hashes[0] == hashes[1]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy kalendarza wydarzeń
+"""
+
+import pytest
+import sqlite3
+from datetime import date, timedelta
+
+import event_calendar
+from event_calendar import add_date_columns, calendar, iso_week, bucket_start
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, date_start TEXT, city TEXT,
+            category TEXT, potential_score INTEGER, estimated_audience INTEGER)
+    ''')
+    add_date_columns(conn)
+    conn.executemany(
+        "INSERT INTO events (name, date_start, city, category, potential_score, estimated_audience) "
+        "VALUES (?, ?, 'Poznań', ?, ?, ?)", [
+            ('Sylwester Run', '2025-12-31', 'Bieganie', 3, 800),
+            ('Noworoczny OCR', '2026-01-01T10:00:00', 'OCR', 5, 3000),
+            ('Zimowy HYROX', '2026-01-01', 'Fitness', 5, 1500),
+            ('Styczniowa Liga', '2026-01-03', 'Siatkówka', 2, None),
+            ('Luty Cup', '2026-02-14', 'Bieganie', 4, 1200),
+            ('Bez daty', None, 'OCR', 5, 100),
+        ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestGeneratedColumns:
+    """Testy kolumn generowanych"""
+
+    def test_values(self, conn):
+        rows = conn.execute("SELECT start_year, start_month, start_week FROM events ORDER BY id").fetchall()
+
+        assert rows[0] == (2025, 12, '2026-W01')
+        assert rows[1] == (2026, 1, '2026-W01')
+        assert rows[5] == (None, None, None)
+
+    def test_iso_week_matches_python(self, conn):
+        day = date(2024, 12, 20)
+        for _ in range(30):
+            sql_week = conn.execute(f"SELECT {event_calendar.GENERATED_COLUMNS['start_week']} "
+                                    "FROM (SELECT ? AS date_start)", (day.isoformat(),)).fetchone()[0]
+            assert sql_week == iso_week(day)
+            day += timedelta(days=3)
+
+    def test_idempotent(self, conn):
+        add_date_columns(conn)
+        columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(events)")]
+        assert columns.count('start_week') == 1
+
+    def test_uses_index(self, conn):
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM events WHERE start_week BETWEEN '2026-W01' AND '2026-W05'"))
+        assert "idx_events_week" in plan
+
+
+class TestCalendar:
+    """Testy kubełków"""
+
+    def test_days(self, conn):
+        buckets = calendar(conn, date(2026, 1, 1), date(2026, 1, 31))
+
+        assert [(b['key'], b['events'], b['audience']) for b in buckets] == \
+            [('2026-01-01', 2, 4500), ('2026-01-03', 1, 0)]
+        assert [e['name'] for e in buckets[0]['top']] == ['Noworoczny OCR', 'Zimowy HYROX']
+
+    def test_weeks_cover_full_iso_weeks(self, conn):
+        buckets = calendar(conn, date(2026, 1, 1), date(2026, 1, 1), granularity='week', top=1)
+
+        [week] = buckets
+        assert week['key'] == '2026-W01'
+        assert week['start'] == '2025-12-29'
+        assert week['events'] == 4
+        assert [e['name'] for e in week['top']] == ['Noworoczny OCR']
+
+    def test_months_and_category(self, conn):
+        buckets = calendar(conn, date(2025, 12, 1), date(2026, 2, 28), granularity='month', top=0)
+        running = calendar(conn, date(2025, 12, 1), date(2026, 2, 28), granularity='month', category='Bieganie')
+
+        assert [(b['key'], b['events']) for b in buckets] == [('2025-12', 1), ('2026-01', 3), ('2026-02', 1)]
+        assert all(b['top'] == [] for b in buckets)
+        assert [b['key'] for b in running] == ['2025-12', '2026-02']
+
+    def test_bucket_start(self):
+        assert bucket_start('week', '2026-W53') == '2026-12-28'
+        assert bucket_start('month', '2026-02') == '2026-02-01'
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy follow-upów
+"""
+
+import asyncio
+import pytest
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import changefeed
+from followups import FollowUpScheduler, due_at, due_leads
+
+
+# ============= FIXTURES =============
+
+NOW = datetime(2026, 3, 10, 8, 0)
+
+
+class FakeClock:
+    def __init__(self, now: datetime = NOW):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def create_schema(conn: sqlite3.Connection):
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+        CREATE TABLE leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER, company TEXT, contact_person TEXT,
+            email TEXT, phone TEXT, status TEXT DEFAULT 'new', value REAL DEFAULT 0, package TEXT,
+            follow_up_date TEXT
+        );
+        CREATE TABLE offers (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER);
+        CREATE INDEX idx_leads_follow_up ON leads(follow_up_date, status);
+    ''')
+    conn.executescript(changefeed.SCHEMA)
+    conn.executemany("INSERT INTO leads (company, status, follow_up_date) VALUES (?, ?, ?)", [
+        ('Zaległy', 'active', '2026-03-01'),
+        ('Dziś', 'new', '2026-03-10'),
+        ('Dziś po południu', 'new', '2026-03-10T15:30:00'),
+        ('Jutro', 'negotiation', '2026-03-11'),
+        ('Za tydzień', 'new', '2026-03-17'),
+        ('Wygrany', 'won', '2026-03-10'),
+        ('Bez terminu', 'new', None),
+    ])
+    conn.commit()
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    create_schema(conn)
+    yield conn
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestDueLeads:
+    """Testy kolejki z indeksu"""
+
+    def test_due_at(self):
+        assert due_at('2026-03-10') == datetime(2026, 3, 10, 9, 0)
+        assert due_at('2026-03-10T15:30:00') == datetime(2026, 3, 10, 15, 30)
+        assert due_at(None) is None
+        assert due_at('wkrótce') is None
+
+    def test_window_and_open_statuses(self, conn):
+        rows = due_leads(conn, until=date(2026, 3, 11))
+
+        assert [r['company'] for r in rows] == ['Zaległy', 'Dziś', 'Dziś po południu', 'Jutro']
+        assert rows[0]['overdue'] is True
+
+    def test_without_overdue_and_status(self, conn):
+        upcoming = due_leads(conn, until=date(2026, 3, 17), since=date(2026, 3, 10))
+        won = due_leads(conn, until=date(2026, 3, 17), status='won')
+
+        assert 'Zaległy' not in [r['company'] for r in upcoming]
+        assert [r['company'] for r in won] == ['Wygrany']
+
+    def test_uses_index(self, conn):
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM leads WHERE follow_up_date IS NOT NULL AND follow_up_date < ? "
+            "AND status NOT IN ('won', 'lost') ORDER BY follow_up_date", ('2026-03-12',)))
+        assert "idx_leads_follow_up" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestFollowUpScheduler:
+    """Testy heapu przypomnień"""
+
+    def make_scheduler(self, conn, clock):
+        fired = []
+        scheduler = FollowUpScheduler(notify=fired.append, clock=clock)
+        scheduler.load(conn)
+        return scheduler, fired
+
+    def test_load_window_only(self, conn):
+        scheduler, _ = self.make_scheduler(conn, FakeClock())
+
+        due = {lead_id: when for lead_id, when in scheduler.pending.items()}
+        assert due == {2: datetime(2026, 3, 10, 9, 0), 3: datetime(2026, 3, 10, 15, 30),
+                       4: datetime(2026, 3, 11, 9, 0)}
+
+    def test_fires_on_time_once(self, conn):
+        clock = FakeClock()
+        scheduler, fired = self.make_scheduler(conn, clock)
+
+        assert scheduler.fire_due(conn) == []
+        assert scheduler.seconds_until_next() == 30.0
+        clock.now = datetime(2026, 3, 10, 9, 0)
+        assert [r['company'] for r in scheduler.fire_due(conn)] == ['Dziś']
+        clock.now = datetime(2026, 3, 10, 16, 0)
+        scheduler.fire_due(conn)
+
+        assert [r['company'] for r in fired] == ['Dziś', 'Dziś po południu']
+
+    def test_changes_reschedule_and_cancel(self, conn):
+        clock = FakeClock()
+        scheduler, fired = self.make_scheduler(conn, clock)
+        conn.execute("UPDATE leads SET follow_up_date = '2026-03-10T12:00:00' WHERE id = 4")
+        conn.execute("UPDATE leads SET status = 'lost' WHERE id = 2")
+        conn.execute("INSERT INTO leads (company, follow_up_date) VALUES ('Nowy', '2026-03-10T10:00:00')")
+        conn.commit()
+
+        assert scheduler.refresh(conn) == 3
+        clock.now = datetime(2026, 3, 11, 23, 0)
+        scheduler.fire_due(conn)
+
+        assert [r['company'] for r in fired] == ['Nowy', 'Jutro', 'Dziś po południu']
+
+    def test_unrelated_edit_keeps_passed_reminder(self, conn):
+        clock = FakeClock()
+        scheduler, fired = self.make_scheduler(conn, clock)
+        clock.now = datetime(2026, 3, 10, 9, 0, 5)
+        conn.execute("UPDATE leads SET company = 'Dziś (notatka)' WHERE id = 2")
+        conn.commit()
+
+        scheduler.refresh(conn)
+        scheduler.fire_due(conn)
+
+        assert [r['company'] for r in fired] == ['Dziś (notatka)']
+
+    def test_window_moves_daily(self, conn):
+        clock = FakeClock()
+        scheduler, _ = self.make_scheduler(conn, clock)
+        assert scheduler.loaded_until == datetime(2026, 3, 12)
+
+        queries = []
+        conn.set_trace_callback(queries.append)
+        clock.now = datetime(2026, 3, 10, 20, 0)
+        scheduler.refresh(conn)
+        assert not any("follow_up_date >=" in q for q in queries)
+
+        clock.now += timedelta(days=6)
+        scheduler.refresh(conn)
+        assert 5 in scheduler.pending
+        conn.set_trace_callback(None)
+
+    async def test_run_retries_until_schema_exists(self, tmp_path):
+        path = str(tmp_path / "fresh.db")
+        scheduler = FollowUpScheduler(notify=lambda row: None, clock=FakeClock())
+        stop = asyncio.Event()
+        task = asyncio.create_task(scheduler.run(lambda: sqlite3.connect(path), stop, interval=0.01))
+        await asyncio.sleep(0.05)
+        assert not task.done() and not scheduler.loaded
+
+        db = sqlite3.connect(path)
+        create_schema(db)
+        db.close()
+        for _ in range(100):
+            if scheduler.loaded:
+                break
+            await asyncio.sleep(0.01)
+        stop.set()
+        await task
+
+        assert scheduler.loaded and set(scheduler.pending) == {2, 3, 4}
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy lejka konwersji
+"""
+
+import pytest
+import sqlite3
+
+import funnel
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, source TEXT, category TEXT,
+            discovered_at TEXT);
+        CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER, status TEXT DEFAULT 'new',
+            value REAL DEFAULT 0);
+        CREATE TABLE offers (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER, event_id INTEGER);
+    ''')
+    funnel.install(conn)
+    conn.executemany("INSERT INTO events (name, source, category, discovered_at) VALUES (?, ?, ?, ?)", [
+        ('Runmageddon Zima', 'Runmageddon.pl', 'OCR', '2026-01-05T10:00:00'),
+        ('Runmageddon Wiosna', 'Runmageddon.pl', 'OCR', '2026-02-03T10:00:00'),
+        ('HYROX Poznań', 'HYROX.com', 'Fitness', '2026-01-20T10:00:00'),
+        ('Bez źródła', None, None, None),
+    ])
+    conn.executemany("INSERT INTO leads (event_id, status, value) VALUES (?, ?, ?)", [
+        (1, 'won', 1000.0), (1, 'new', 500.0), (2, 'won', 2000.0), (2, 'won', 1500.0), (3, 'lost', 990.0),
+    ])
+    conn.executemany("INSERT INTO offers (lead_id) VALUES (?)", [(1,), (1,), (3,), (5,)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def rollup(conn):
+    return conn.execute("SELECT * FROM funnel_rollup ORDER BY source, category, month").fetchall()
+
+
+# ============= TESTY =============
+
+class TestRollup:
+    """Testy przyrostowego rollupu"""
+
+    def test_refresh_counts_stages(self, conn):
+        assert funnel.refresh(conn) == 4
+        assert funnel.refresh(conn) == 0
+
+        assert rollup(conn) == [
+            ('', '', '', 1, 0, 0, 0, 0, 0.0),
+            ('HYROX.com', 'Fitness', '2026-01', 1, 1, 1, 1, 0, 0.0),
+            ('Runmageddon.pl', 'OCR', '2026-01', 1, 1, 2, 1, 1, 1000.0),
+            ('Runmageddon.pl', 'OCR', '2026-02', 1, 1, 2, 1, 2, 3500.0),
+        ]
+
+    def test_incremental_matches_rebuild(self, conn):
+        funnel.refresh(conn)
+        conn.execute("UPDATE events SET category = 'Fitness', source = 'HYROX.com' WHERE id = 1")
+        conn.execute("UPDATE leads SET event_id = 3, status = 'won' WHERE id = 2")
+        conn.execute("DELETE FROM offers WHERE lead_id = 5")
+        conn.execute("DELETE FROM leads WHERE id = 4")
+        conn.execute("DELETE FROM events WHERE id = 4")
+        conn.commit()
+
+        assert funnel.refresh(conn) == 4
+        incremental = rollup(conn)
+        funnel.rebuild(conn)
+        assert incremental == rollup(conn)
+        assert ('', '', '', 1, 0, 0, 0, 0, 0.0) not in incremental
+
+    def test_unchanged_values_do_not_mark(self, conn):
+        funnel.refresh(conn)
+        conn.execute("UPDATE events SET source = source, category = category, name = 'Nowa nazwa'")
+        conn.execute("UPDATE leads SET status = status")
+
+        assert conn.execute("SELECT COUNT(*) FROM funnel_dirty").fetchone()[0] == 0
+
+    def test_install_builds_existing_data(self, conn):
+        conn.execute("DELETE FROM funnel_events")
+        conn.execute("DELETE FROM funnel_dirty")
+        funnel.install(conn)
+
+        assert len(rollup(conn)) == 4
+
+
+class TestReport:
+    """Testy raportu z funkcjami okna"""
+
+    def test_totals_and_rates(self, conn):
+        result = funnel.report(conn)
+
+        assert result['total']['events'] == 4
+        assert result['total']['lead_rate'] == 75.0
+        assert result['total']['offer_rate'] == 60.0
+        assert result['total']['win_rate'] == 60.0
+        assert result['groups'][0]['source'] is None
+
+    def test_month_over_month(self, conn):
+        result = funnel.report(conn, group_by=['source', 'month'], source='Runmageddon.pl')
+
+        assert [(g['month'], g['won'], g['won_delta']) for g in result['groups']] == \
+            [('2026-01', 1, None), ('2026-02', 2, 1)]
+        assert [g['share'] for g in result['groups']] == [50.0, 50.0]
+
+    def test_group_by_single_dimension(self, conn):
+        result = funnel.report(conn, group_by=['category'], month_from='2026-01', month_to='2026-01')
+
+        assert [(g['category'], g['events'], g['won_delta']) for g in result['groups']] == \
+            [('Fitness', 1, None), ('OCR', 1, None)]
+        assert 'source' not in result['groups'][0]
+
+    def test_unknown_dimension(self, conn):
+        with pytest.raises(ValueError):
+            funnel.report(conn, group_by=['city'])
+        with pytest.raises(ValueError):
+            funnel.report(conn, group_by=[])
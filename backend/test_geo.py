@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy geolokalizacji
+"""
+
+import pytest
+import sqlite3
+
+import geo
+from geo import bounding_box, haversine_km, install, lookup, near_filter, parse_near
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, city TEXT, location TEXT)")
+    conn.executemany("INSERT INTO events (name, city, location) VALUES (?, ?, ?)", [
+        ('Przed instalacją', 'Poznań', 'MTP'),
+        ('Tylko lokalizacja', '', 'Spodek, Katowice'),
+    ])
+    install(conn)
+    conn.executemany("INSERT INTO events (name, city, location) VALUES (?, ?, ?)", [
+        ('Bez znaków', 'krakow', 'Tauron Arena'),
+        ('Alias', 'Warsaw', 'PGE Narodowy'),
+        ('Dłuższa nazwa wygrywa', None, 'Trasa Sopot - Gdańsk'),
+        ('Nieznane', 'Atlantyda', 'Hala nr 1'),
+    ])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def point(conn, event_id):
+    return conn.execute("SELECT min_lat, min_lon FROM events_geo WHERE id = ?", (event_id,)).fetchone()
+
+
+def near(conn, lat, lon, radius_km):
+    clause, params = near_filter(conn, lat, lon, radius_km)
+    return [row[0] for row in conn.execute(f"SELECT name FROM events WHERE {clause} ORDER BY id", params)]
+
+
+# ============= TESTY =============
+
+class TestGeocoding:
+    """Testy geokodowania przy zapisie"""
+
+    def test_backfill_and_triggers(self, conn):
+        located = [row[0] for row in conn.execute("SELECT id FROM events_geo ORDER BY id")]
+
+        assert located == [1, 2, 3, 4, 5]
+        assert point(conn, 2) == pytest.approx(geo.GAZETTEER['Katowice'], abs=1e-4)
+        assert point(conn, 4) == pytest.approx(geo.GAZETTEER['Warszawa'], abs=1e-4)
+
+    def test_location_prefers_longest_name(self, conn):
+        assert point(conn, 5) == pytest.approx(geo.GAZETTEER['Gdańsk'], abs=1e-4)
+
+    def test_location_whole_words_only(self, conn):
+        conn.executemany("INSERT INTO events (name, city, location) VALUES (?, ?, ?)", [
+            ('Ulica', '', 'ul. Gdańska 100, Łódź'),
+            ('Prefiks', '', 'Radomsko'),
+            ('Inne miasto', '', 'Opole Lubelskie'),
+            ('Nawias', '', 'Hala (Katowice)'),
+        ])
+
+        assert point(conn, 7) == pytest.approx(geo.GAZETTEER['Łódź'], abs=1e-4)
+        assert [point(conn, 8), point(conn, 9)] == [None, None]
+        assert point(conn, 10) == pytest.approx(geo.GAZETTEER['Katowice'], abs=1e-4)
+
+    def test_unicode_case(self, conn):
+        conn.executemany("INSERT INTO events (name, city, location) VALUES (?, ?, ?)", [
+            ('Wielkie litery', 'ŁÓDŹ', ''),
+            ('Wielkie litery w lokalizacji', None, 'TAURON ARENA KRAKÓW'),
+        ])
+        conn.execute("DELETE FROM events_geo WHERE id = 8")
+
+        assert point(conn, 7) == pytest.approx(geo.GAZETTEER['Łódź'], abs=1e-4)
+        assert geo.backfill(conn) == 1
+        assert point(conn, 8) == pytest.approx(geo.GAZETTEER['Kraków'], abs=1e-4)
+
+    def test_update_and_delete(self, conn):
+        conn.execute("UPDATE events SET city = 'Lublin' WHERE id = 1")
+        conn.execute("UPDATE events SET city = 'Atlantyda', location = 'Rynek w Toruniu' WHERE id = 3")
+        conn.execute("DELETE FROM events WHERE id = 4")
+
+        assert point(conn, 1) == pytest.approx(geo.GAZETTEER['Lublin'], abs=1e-4)
+        assert point(conn, 3) is None
+        assert point(conn, 4) is None
+
+    def test_install_idempotent(self, conn):
+        assert install(conn) == 0
+        assert conn.execute("SELECT COUNT(*) FROM events_geo").fetchone()[0] == 5
+
+
+class TestNear:
+    """Testy filtra odległości"""
+
+    def test_parse_near(self):
+        assert parse_near('52.41, 16.93') == (52.41, 16.93)
+        assert parse_near('ŁÓDŹ') == geo.GAZETTEER['Łódź']
+        assert parse_near('Cracow') == geo.GAZETTEER['Kraków']
+        assert parse_near('91,0') is None
+        assert parse_near('Atlantyda') is None
+        assert lookup(' zielona gora ') == geo.GAZETTEER['Zielona Góra']
+
+    def test_haversine(self):
+        assert haversine_km(*geo.GAZETTEER['Warszawa'], *geo.GAZETTEER['Kraków']) == pytest.approx(252, abs=2)
+
+    def test_bounding_box_contains_circle(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(52.0, 21.0, 50)
+        assert haversine_km(52.0, 21.0, max_lat, 21.0) == pytest.approx(50)
+        # Każdy punkt okręgu mieści się w prostokącie
+        closest = min(haversine_km(52.0, 21.0, 52.0 + i / 1000, max_lon) for i in range(-400, 401))
+        assert closest == pytest.approx(50, abs=0.01)
+
+    def test_exact_distance_after_box(self, conn):
+        krakow = geo.GAZETTEER['Kraków']
+        # Katowice (~70 km) mieszczą się w prostokącie 75 km, ale nie w okręgu 65 km
+        assert near(conn, *krakow, 65) == ['Bez znaków']
+        assert near(conn, *krakow, 75) == ['Tylko lokalizacja', 'Bez znaków']
+
+    def test_uses_rtree(self, conn):
+        clause, params = near_filter(conn, 52.0, 21.0, 50)
+        plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM events WHERE {clause}",
+                                                        params))
+        assert "VIRTUAL TABLE INDEX" in plan
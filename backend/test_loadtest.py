@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy harnessu obciążeniowego
+"""
+
+import pytest
+import random
+
+import loadtest
+from loadtest import LoadContext, Sample, parse_mix, summarize
+
+
+class TestLoadTestReport:
+    """Testy mieszanki scenariuszy i raportu"""
+
+    def test_parse_mix(self):
+        assert parse_mix("dashboard=4, search") == {'dashboard': 4.0, 'search': 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("unknown=1")
+        with pytest.raises(ValueError):
+            parse_mix("search=0")
+
+    def test_scenarios_build_calls(self):
+        rng = random.Random(1)
+        ctx = LoadContext(leads=[(7, 3)])
+        for name, scenario in loadtest.SCENARIOS.items():
+            calls = scenario(rng, ctx)
+            assert calls and all(path.startswith('/api/') for _, path, _ in calls), name
+        [(method, path, body)] = loadtest.scenario_offer_create(rng, ctx)
+        assert (method, path, body['lead_id'], body['event_id']) == ('POST', '/api/offers', 7, 3)
+
+    def test_summarize(self):
+        samples = [Sample('search', ms / 1000, True, 200) for ms in range(1, 101)]
+        samples += [Sample('dashboard', 0.5, False, 500), Sample('dashboard', 0.5, False)]
+
+        report = summarize(samples, elapsed=2.0)
+
+        assert report['requests'] == 102
+        assert report['throughput_rps'] == 51.0
+        assert report['error_rate'] == round(2 / 102, 4)
+        assert report['status_codes'] == {'200': 100, '500': 1, '0': 1}
+        search = report['scenarios']['search']
+        assert search['latency_ms'] == {'p50': 50.0, 'p95': 95.0, 'p99': 99.0, 'max': 100.0}
+        assert report['scenarios']['dashboard']['error_rate'] == 1.0
+
+
+@pytest.mark.slow
+class TestLoadTestRun:
+    """Krótki przebieg na prawdziwym uvicorn"""
+
+    async def test_short_run(self, tmp_path):
+        db_path = str(tmp_path / "load.db")
+        loadtest.seed_database(db_path, events=300, seed=1)
+
+        with loadtest.uvicorn_server(db_path) as base_url:
+            report = await loadtest.run_load(base_url, loadtest.DEFAULT_MIX, rps=20, duration=1.0)
+
+        assert report['requests'] == 20
+        assert report['error_rate'] == 0.0
+        assert set(report['scenarios']) <= set(loadtest.SCENARIOS)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy metryk Prometheus
+"""
+
+import sqlite3
+
+import metrics
+from metrics import Counter, Gauge, Histogram, Registry, TimedConnection, record_sync
+
+
+# ============= TESTY TYPÓW METRYK =============
+
+class TestMetricTypes:
+    """Testy liczników, gauge'y i histogramów"""
+
+    def test_counter_render(self):
+        registry = Registry()
+        counter = registry.register(Counter("test_total", "Test", ("route",)))
+        counter.inc("/a")
+        counter.inc("/a", amount=2)
+
+        text = registry.render()
+
+        assert "# TYPE test_total counter" in text
+        assert 'test_total{route="/a"} 3' in text
+
+    def test_gauge_inc_dec(self):
+        gauge = Gauge("test_gauge", "Test", ("method",))
+        gauge.inc("GET")
+        gauge.inc("GET")
+        gauge.dec("GET")
+        assert gauge.value("GET") == 1
+
+    def test_histogram_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value, "/a")
+
+        lines = histogram.samples()
+
+        assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{route="/a",le="1"} 3' in lines
+        assert 'test_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'test_seconds_count{route="/a"} 4' in lines
+        assert histogram.count("/a") == 4
+
+    def test_label_escaping(self):
+        counter = Counter("test_total", "Test", ("name",))
+        counter.inc('a"b\\c')
+        assert counter.samples() == ['test_total{name="a\\"b\\\\c"} 1']
+
+
+# ============= TESTY POMIARU SQL =============
+
+class TestTimedConnection:
+    """Testy akumulacji czasu SQL"""
+
+    def test_db_time_accumulated_in_context(self):
+        conn = sqlite3.connect(":memory:", factory=TimedConnection)
+        holder = [0.0]
+        token = metrics._db_time.set(holder)
+        try:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+        finally:
+            metrics._db_time.reset(token)
+            conn.close()
+        assert holder[0] > 0
+
+    def test_without_request_context(self):
+        conn = sqlite3.connect(":memory:", factory=TimedConnection)
+        conn.row_factory = sqlite3.Row
+        assert conn.execute("SELECT 1 AS x").fetchone()['x'] == 1
+        conn.close()
+
+
+class TestSyncMetrics:
+    """Testy metryk synchronizacji"""
+
+    def test_record_sync(self):
+        before = metrics.SYNC_RUNS.value("TestSource", "ok")
+        record_sync("TestSource", 0.2, 5, ok=True)
+        assert metrics.SYNC_RUNS.value("TestSource", "ok") == before + 1
+        assert metrics.SYNC_EVENTS.value("TestSource") >= 5
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy silnika analitycznego DuckDB
+"""
+
+import pytest
+
+import analytics
+import funnel
+import olap
+import snapshot
+from aggregator import Database
+from olap import DuckDBEngine, engine_from_env
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def db(tmp_path):
+    """Baza ze schematem aplikacji: wydarzenia z dwóch źródeł, leady z ofertami, remisy w podziałach"""
+    database = Database(str(tmp_path / "oltp.db"))
+    conn = database.conn
+    conn.executemany("INSERT INTO events (name, category, source, discovered_at) VALUES (?, ?, ?, ?)", [
+        ('Zimowy OCR', 'OCR', 'Runmageddon.pl', '2025-12-01T09:00:00'),
+        ('Wiosenny OCR', 'OCR', 'Runmageddon.pl', '2026-01-15T10:00:00'),
+        ('HYROX Poznań', 'Fitness', 'HYROX.com', '2026-01-20'),
+        ('Bez źródła', None, None, None),
+    ])
+    conn.executemany("INSERT INTO leads (event_id, company, status, value, package) VALUES (?, ?, ?, ?, ?)", [
+        (1, 'Firma A', 'won', 2490.0, 'standard'), (1, 'Firma B', 'lost', 990.0, 'basic'),
+        (2, 'Firma C', 'won', 4990.0, 'premium'), (3, 'Firma D', None, 990.0, 'basic'),
+        (None, 'Bez wydarzenia', 'new', 0.0, None),
+    ])
+    conn.executemany("INSERT INTO offers (lead_id, event_id, package) VALUES (?, ?, ?)", [
+        (1, 1, 'standard'), (1, 1, 'premium'), (3, 2, 'premium'),
+    ])
+    conn.commit()
+    yield database
+    conn.close()
+
+
+@pytest.fixture
+def parquet_engine(db, tmp_path):
+    if not (olap.DUCKDB_AVAILABLE and snapshot.PYARROW_AVAILABLE):
+        pytest.skip("duckdb lub pyarrow niedostępny")
+    snapshot.export_snapshot(db.conn, str(tmp_path / "snapshot"))
+    engine = DuckDBEngine(db.db_path, str(tmp_path / "snapshot"))
+    yield engine
+    engine.close()
+
+
+# ============= TESTY =============
+
+class TestParquetSource:
+    """Raporty z DuckDB na snapshocie Parquet = raporty z SQLite"""
+
+    def test_pipeline_matches_sqlite(self, db, parquet_engine):
+        assert parquet_engine.pipeline_report() == analytics.pipeline_report(db.conn)
+
+    @pytest.mark.parametrize("group_by", [["source", "category", "month"], ["source"], ["category", "month"]])
+    def test_funnel_matches_sqlite(self, db, parquet_engine, group_by):
+        assert parquet_engine.funnel_report(group_by) == funnel.report(db.conn, group_by)
+
+    def test_funnel_filters(self, db, parquet_engine):
+        expected = funnel.report(db.conn, ["month"], source="Runmageddon.pl", month_from="2026-01")
+        result = parquet_engine.funnel_report(["month"], source="Runmageddon.pl", month_from="2026-01")
+
+        assert result == expected
+        assert [g['month'] for g in result['groups']] == ['2026-01']
+
+    def test_new_snapshot_visible(self, db, parquet_engine):
+        parquet_engine.pipeline_report()
+        db.conn.execute("INSERT INTO leads (event_id, company, status, value) VALUES (3, 'Firma E', 'won', 100.0)")
+        db.conn.commit()
+        snapshot.export_snapshot(db.conn, parquet_engine.snapshot_dir)
+
+        assert parquet_engine.pipeline_report()['conversion']['won'] == 3
+
+    def test_version_follows_snapshot_files(self, db, parquet_engine):
+        before = parquet_engine.version(db.conn)
+        db.conn.execute("INSERT INTO leads (event_id, company) VALUES (3, 'Firma E')")
+        db.conn.commit()
+        assert parquet_engine.version(db.conn) == before
+
+        snapshot.export_snapshot(db.conn, parquet_engine.snapshot_dir)
+        assert parquet_engine.version(db.conn) != before
+
+    def test_invalid_dimension(self, parquet_engine):
+        with pytest.raises(ValueError):
+            parquet_engine.funnel_report(["city"])
+
+
+class TestSQLiteSource:
+    """ATTACH pliku SQLite tylko do odczytu (rozszerzenie sqlite_scanner DuckDB)"""
+
+    def test_matches_sqlite_next_to_generated_columns_and_rtree(self, db):
+        if not olap.DUCKDB_AVAILABLE:
+            pytest.skip("duckdb niedostępny")
+        hidden = [row[1] for row in db.conn.execute("PRAGMA table_xinfo(events)") if row[6]]
+        assert hidden and db.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_geo'").fetchone()
+        engine = DuckDBEngine(db.db_path)
+        try:
+            engine.connect()
+        except Exception as e:
+            pytest.skip(f"rozszerzenie sqlite_scanner niedostępne: {e}")
+        try:
+            assert engine.pipeline_report() == analytics.pipeline_report(db.conn)
+            assert engine.funnel_report(["source", "month"]) == funnel.report(db.conn, ["source", "month"])
+        finally:
+            engine.close()
+
+
+class TestEngineFromEnv:
+    """Testy wyboru silnika"""
+
+    def test_default_sqlite(self, monkeypatch):
+        monkeypatch.delenv("ANALYTICS_ENGINE", raising=False)
+        assert engine_from_env("x.db") is None
+
+    def test_duckdb(self, parquet_engine, monkeypatch):
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", parquet_engine.snapshot_dir)
+
+        engine = engine_from_env("x.db")
+        assert (engine.source, engine.snapshot_dir) == ("parquet", parquet_engine.snapshot_dir)
+        engine.close()
+
+    def test_missing_snapshot_falls_back(self, tmp_path, monkeypatch):
+        if not olap.DUCKDB_AVAILABLE:
+            pytest.skip("duckdb niedostępny")
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setenv("ANALYTICS_SNAPSHOT_DIR", str(tmp_path / "brak"))
+        assert engine_from_env("x.db") is None
+
+    def test_sqlite_extension_failure_falls_back(self, db, monkeypatch):
+        if not olap.DUCKDB_AVAILABLE:
+            pytest.skip("duckdb niedostępny")
+
+        def offline(conn):
+            raise RuntimeError('Failed to download extension "sqlite_scanner"')
+
+        monkeypatch.setattr(olap, 'load_sqlite_extension', offline)
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.delenv("ANALYTICS_SNAPSHOT_DIR", raising=False)
+        assert engine_from_env(db.db_path) is None
+
+    def test_duckdb_unavailable_falls_back(self, monkeypatch):
+        monkeypatch.setenv("ANALYTICS_ENGINE", "duckdb")
+        monkeypatch.setattr(olap, 'DUCKDB_AVAILABLE', False)
+        assert engine_from_env("x.db") is None
+
+    def test_unknown(self, monkeypatch):
+        monkeypatch.setenv("ANALYTICS_ENGINE", "clickhouse")
+        with pytest.raises(ValueError):
+            engine_from_env("x.db")
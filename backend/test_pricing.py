@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy silnika cenowego
+"""
+
+import pytest
+from dataclasses import FrozenInstanceError
+
+import pricing
+from pricing import PACKAGES, SERVICES, VAT_RATE, quote, quote_many
+from utils import PACKAGE_PRICES, ADDITIONAL_SERVICES_PRICES, calculate_offer_price
+
+
+# ============= TESTY CENNIKA =============
+
+class TestCatalog:
+    """Testy niezmiennego cennika"""
+
+    def test_catalog_is_read_only(self):
+        with pytest.raises(TypeError):
+            PACKAGES["basic"] = None
+        with pytest.raises(FrozenInstanceError):
+            PACKAGES["basic"].price = 1
+
+    def test_utils_prices_derived_from_catalog(self):
+        assert dict(PACKAGE_PRICES) == {code: p.price for code, p in PACKAGES.items()}
+        assert dict(ADDITIONAL_SERVICES_PRICES) == {code: s.price for code, s in SERVICES.items()}
+
+
+# ============= TESTY WYCENY =============
+
+class TestQuote:
+    """Testy wyceny ofert"""
+
+    def test_quote_matches_calculate_offer_price(self):
+        result = quote("standard", ["drone", "highlights"], 10)
+        assert result.to_dict() == calculate_offer_price("standard", ["drone", "highlights"], 10)
+        assert result.base_price == 2490
+        assert result.additional_total == 1300
+        assert result.vat == result.net * VAT_RATE
+
+    def test_quote_is_memoized_regardless_of_service_order(self):
+        pricing._quote.cache_clear()
+        first = quote("premium", ["vod", "drone"], 5)
+        second = quote("premium", ["drone", "vod"], 5.0)
+        assert first is second
+        assert pricing._quote.cache_info().hits == 1
+
+    def test_quote_unknown_items_priced_zero(self):
+        result = quote("nonexistent", ["nonexistent_service"])
+        assert result.base_price == 0
+        assert result.additional_total == 0
+
+    def test_quote_many(self):
+        results = quote_many([("basic", [], 0), ("premium", ["drone"], 20)])
+        assert [r.base_price for r in results] == [990, 4990]
+        assert results[1].discount == (4990 + 800) * 0.2
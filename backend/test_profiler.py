@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy profilera SQL
+"""
+
+import pytest
+import logging
+import sqlite3
+import time
+
+import profiler
+from profiler import QueryProfiler, ProfilingConnection, TimedConnection, normalize_sql, explain
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    """Połączenie z profilowaniem i czystym PROFILER"""
+    profiler.PROFILER.reset()
+    conn = sqlite3.connect(":memory:", factory=ProfilingConnection)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT, city TEXT)")
+    conn.executemany("INSERT INTO events (name, city) VALUES (?, ?)",
+                     [(f"Event {i}", "Poznań") for i in range(50)])
+    yield conn
+    conn.close()
+    profiler.PROFILER.reset()
+
+
+# ============= TESTY =============
+
+class TestNormalizeSql:
+    """Testy fingerprintów"""
+
+    def test_literals_and_whitespace(self):
+        assert normalize_sql("SELECT *  FROM events\n WHERE id = 5 AND name = 'x''y'") == \
+            "SELECT * FROM events WHERE id = ? AND name = ?"
+
+    def test_placeholder_lists_collapsed(self):
+        assert normalize_sql("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+            normalize_sql("SELECT * FROM t WHERE id IN (?,?)")
+
+
+class TestQueryProfiler:
+    """Testy statystyk per fingerprint"""
+
+    def test_percentiles(self):
+        qp = QueryProfiler()
+        for ms in range(1, 101):
+            qp.record(f"SELECT {ms}", ms / 1000)
+
+        [row] = qp.report()
+
+        assert row['fingerprint'] == "SELECT ?"
+        assert row['count'] == 100
+        assert row['p50_ms'] == 50
+        assert row['p95_ms'] == 95
+        assert row['max_ms'] == 100
+
+    def test_rolling_window(self):
+        qp = QueryProfiler(window=10)
+        for _ in range(100):
+            qp.record("SELECT 1", 1.0)
+        for _ in range(10):
+            qp.record("SELECT 1", 0.001)
+
+        [row] = qp.report()
+
+        assert row['count'] == 110
+        assert row['p95_ms'] == 1
+        assert row['max_ms'] == 1000
+
+    def test_profiling_connection_records(self, conn):
+        for city in ("Poznań", "Kraków"):
+            conn.execute("SELECT * FROM events WHERE city = ?", (city,)).fetchall()
+
+        report = {r['fingerprint']: r for r in profiler.PROFILER.report()}
+
+        assert report["SELECT * FROM events WHERE city = ?"]['count'] == 2
+        assert "INSERT INTO events (name, city) VALUES (?+)" in report
+
+    @pytest.mark.parametrize("read", [lambda c: c.fetchall(), lambda c: c.fetchmany(100), list])
+    def test_fetch_time_counted(self, conn, read):
+        conn.create_function("slow", 1, lambda x: time.sleep(0.002) or x)
+        cursor = conn.execute("SELECT slow(id) FROM events")
+        assert not [r for r in profiler.PROFILER.report() if "slow" in r['fingerprint']]
+
+        assert len(read(cursor)) == 50
+        [row] = [r for r in profiler.PROFILER.report() if "slow" in r['fingerprint']]
+        assert row['count'] == 1
+        assert row['max_ms'] >= 90
+
+    def test_unfinished_select_recorded_on_close(self, conn):
+        cursor = conn.execute("SELECT * FROM events WHERE city = ?", ("Poznań",))
+        cursor.fetchone()
+        cursor.close()
+
+        report = {r['fingerprint']: r for r in profiler.PROFILER.report()}
+        assert report["SELECT * FROM events WHERE city = ?"]['count'] == 1
+
+    def test_slow_query_logged_with_plan(self, conn, monkeypatch, caplog):
+        monkeypatch.setattr(profiler.PROFILER, 'slow_query_ms', 0)
+
+        with caplog.at_level(logging.WARNING, logger='QueryProfiler'):
+            conn.execute("SELECT * FROM events WHERE city = ?", ("Poznań",))
+
+        assert "Wolne zapytanie" in caplog.text
+        assert "SCAN events" in caplog.text
+
+    def test_explain(self, conn):
+        plan = explain(conn, "SELECT * FROM events WHERE id = ?", (1,))
+        assert any("events" in line for line in plan)
+
+
+class TestConnectionFactory:
+    """Testy włączania profilowania"""
+
+    def test_opt_in(self, monkeypatch):
+        monkeypatch.delenv("SQL_PROFILING", raising=False)
+        assert profiler.connection_factory() is TimedConnection
+        monkeypatch.setenv("SQL_PROFILING", "1")
+        assert profiler.connection_factory() is ProfilingConnection
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy masowego rescoringu
+"""
+
+import pytest
+import random
+import tempfile
+import os
+
+import scoring
+from aggregator import Database, Event
+from scoring import score_columns, rescore_events
+from utils import calculate_potential_score, HIGH_VALUE_CATEGORIES
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def temp_db():
+    """Tymczasowa baza danych"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = Database(path)
+    yield db
+    db.conn.close()
+    os.unlink(path)
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'python'])
+def numpy_mode(request, monkeypatch):
+    """Uruchamia test w trybie NumPy i w trybie czystego Pythona"""
+    if request.param and not scoring.NUMPY_AVAILABLE:
+        pytest.skip("NumPy niedostępny")
+    monkeypatch.setattr(scoring, 'NUMPY_AVAILABLE', request.param)
+    return request.param
+
+
+def _random_columns(n, seed=42):
+    rng = random.Random(seed)
+    categories = HIGH_VALUE_CATEGORIES + ["Festiwal", "Targi", "", "Inne"]
+    return (
+        [rng.choice([0, 500, 1000, 1001, 5000, 5001, 120000]) for _ in range(n)],
+        [rng.choice(categories) for _ in range(n)],
+        [rng.random() < 0.5 for _ in range(n)],
+        [rng.random() < 0.5 for _ in range(n)],
+    )
+
+
+# ============= TESTY SCORINGU KOLUMNOWEGO =============
+
+class TestScoreColumns:
+    """Zgodność scoringu kolumnowego z calculate_potential_score"""
+
+    def test_matches_scalar_scoring(self, numpy_mode):
+        audience, categories, emails, phones = _random_columns(2000)
+        expected = [calculate_potential_score(a, c, e, p)
+                    for a, c, e, p in zip(audience, categories, emails, phones)]
+        assert score_columns(audience, categories, emails, phones) == expected
+
+    def test_bounds(self, numpy_mode):
+        scores = score_columns([0, 100000], ["", "OCR"], [False, True], [False, True])
+        assert scores == [2, 5]
+
+
+# ============= TESTY RESCORINGU TABELI =============
+
+class TestRescoreEvents:
+    """Testy przeliczania potential_score w bazie"""
+
+    def test_rescore_updates_only_changed_rows(self, temp_db, numpy_mode):
+        temp_db.save_event(Event(name="Stale", organizer="A", date_start="2026-01-01",
+                                 category="OCR", estimated_audience=10000,
+                                 organizer_email="a@a.pl", organizer_phone="500000000",
+                                 potential_score=1))
+        temp_db.save_event(Event(name="Fresh", organizer="B", date_start="2026-01-02",
+                                 category="Inne", potential_score=2))
+
+        results = rescore_events(temp_db.conn)
+
+        assert results['scanned'] == 2
+        assert results['updated'] == 1
+        scores = {e['name']: e['potential_score'] for e in temp_db.get_events()}
+        assert scores == {"Stale": 5, "Fresh": 2}
+
+    def test_rescore_in_chunks(self, temp_db, numpy_mode):
+        for i in range(25):
+            temp_db.save_event(Event(name=f"Event {i}", organizer="X", date_start="2026-01-01",
+                                     estimated_audience=i * 500, potential_score=3))
+
+        results = rescore_events(temp_db.conn, chunk_size=4)
+
+        assert results['scanned'] == 25
+        for event in temp_db.get_events(limit=100):
+            assert event['potential_score'] == calculate_potential_score(event['estimated_audience'])
+
+        assert rescore_events(temp_db.conn, chunk_size=4)['updated'] == 0
+
+    def test_rescore_handles_nulls(self, temp_db, numpy_mode):
+        temp_db.conn.execute("INSERT INTO events (name, estimated_audience, category, potential_score) "
+                             "VALUES ('Null', NULL, NULL, 5)")
+        temp_db.conn.commit()
+
+        results = rescore_events(temp_db.conn)
+
+        assert results['updated'] == 1
+        assert temp_db.get_events()[0]['potential_score'] == 2
+
+    def test_rescore_empty_table(self, temp_db):
+        results = rescore_events(temp_db.conn)
+        assert results['scanned'] == 0
+        assert results['updated'] == 0
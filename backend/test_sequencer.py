@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy numeracji ofert i umów
+"""
+
+import pytest
+import tempfile
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from aggregator import Database
+from sequencer import NumberSequencer
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def db_path():
+    """Ścieżka do tymczasowej bazy"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    yield path
+    os.unlink(path)
+
+
+def _offer_numbers(args):
+    path, count = args
+    sequencer = NumberSequencer(path, block_size=7)
+    return [sequencer.offer_number() for _ in range(count)]
+
+
+# ============= TESTY =============
+
+class TestNumberSequencer:
+    """Testy licznika numerów"""
+
+    def test_offer_number_format(self, db_path):
+        sequencer = NumberSequencer(db_path)
+        number = sequencer.offer_number(datetime(2026, 3, 5))
+        assert number == "OF/2026/03/0001"
+
+    def test_contract_number_format(self, db_path):
+        sequencer = NumberSequencer(db_path)
+        assert sequencer.contract_number(now=datetime(2026, 1, 1)) == "STREAM/2026/000001"
+        assert sequencer.contract_number("CUSTOM", datetime(2026, 1, 1)) == "CUSTOM/2026/000001"
+
+    def test_counter_resets_each_month(self, db_path):
+        sequencer = NumberSequencer(db_path)
+        sequencer.offer_number(datetime(2026, 3, 31))
+        assert sequencer.offer_number(datetime(2026, 3, 31)) == "OF/2026/03/0002"
+        assert sequencer.offer_number(datetime(2026, 4, 1)) == "OF/2026/04/0001"
+
+    def test_block_reserved_once(self, db_path):
+        sequencer = NumberSequencer(db_path, block_size=10)
+        for _ in range(10):
+            sequencer.next_value("OF", "2026/03")
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT last_value FROM number_sequences").fetchone()[0] == 10
+        sequencer.next_value("OF", "2026/03")
+        assert conn.execute("SELECT last_value FROM number_sequences").fetchone()[0] == 20
+        conn.close()
+
+    def test_blocks_do_not_overlap_between_sequencers(self, db_path):
+        first = NumberSequencer(db_path, block_size=5)
+        second = NumberSequencer(db_path, block_size=5)
+        values = [first.next_value("OF", "p"), second.next_value("OF", "p"), first.next_value("OF", "p")]
+        assert values == [1, 6, 2]
+
+    def test_unique_across_threads(self, db_path):
+        sequencer = NumberSequencer(db_path, block_size=3)
+        numbers = []
+
+        def worker():
+            for _ in range(50):
+                numbers.append(sequencer.offer_number())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(numbers)) == 400
+
+    def test_unique_across_processes(self, db_path):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            batches = list(pool.map(_offer_numbers, [(db_path, 40)] * 4))
+        numbers = [n for batch in batches for n in batch]
+        assert len(set(numbers)) == len(numbers) == 160
+
+
+class TestOffersSchema:
+    """Migracja kolumny z numerem oferty"""
+
+    def test_database_adds_number_column_to_existing_offers(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE offers (id INTEGER PRIMARY KEY, lead_id INTEGER)")
+        conn.commit()
+        conn.close()
+
+        db = Database(db_path)
+        columns = {row['name'] for row in db.conn.execute("PRAGMA table_info(offers)")}
+        db.conn.close()
+        assert 'number' in columns
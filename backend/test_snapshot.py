@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy snapshotu Parquet / Arrow
+"""
+
+import pytest
+from datetime import date, datetime
+
+import snapshot
+from aggregator import Database
+from archive import archive_events
+from snapshot import export_snapshot
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def pa():
+    if not snapshot.PYARROW_AVAILABLE:
+        pytest.skip("pyarrow niedostępny")
+    import pyarrow
+    return pyarrow
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Baza ze schematem aplikacji: trzy wydarzenia, lead z ofertą"""
+    monkeypatch.delenv("ARCHIVE_DATABASE_PATH", raising=False)
+    database = Database(str(tmp_path / "snap.db"))
+    conn = database.conn
+    conn.executemany("INSERT INTO events (name, date_start, city, category, source, estimated_audience, "
+                     "discovered_at) VALUES (?, ?, ?, ?, ?, ?, ?)", [
+                         ('Zimowy OCR', '2025-01-10', 'Poznań', 'OCR', 'Runmageddon.pl', 3000,
+                          '2024-11-01T08:30:00.250000'),
+                         ('Letni HYROX', '2026-07-01T10:00:00', 'Gdańsk', 'Fitness', 'HYROX.com', 1500,
+                          '2026-01-01'),
+                         ('Bez daty', 'wkrótce', None, 'OCR', 'GoOut.net', None, None),
+                     ])
+    conn.execute("INSERT INTO leads (event_id, company, status, value, follow_up_date) "
+                 "VALUES (2, 'Firma A', 'won', 2490.5, '2026-05-01')")
+    conn.execute("INSERT INTO offers (lead_id, event_id, package, total_price) VALUES (1, 2, 'premium', 4990.0)")
+    conn.commit()
+    yield database
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestExportSnapshot:
+    """Testy eksportu"""
+
+    def test_parquet_types_and_values(self, pa, db, tmp_path):
+        import pyarrow.parquet as pq
+        results = export_snapshot(db.conn, str(tmp_path / "out"))
+
+        assert {t: info['rows'] for t, info in results['tables'].items()} == {'events': 3, 'leads': 1, 'offers': 1}
+        events = pq.read_table(results['tables']['events']['path'])
+        assert events.schema.field('date_start').type == pa.date32()
+        assert events.schema.field('discovered_at').type == pa.timestamp('ms')
+        assert events.schema.field('estimated_audience').type == pa.int64()
+        assert pa.types.is_dictionary(events.schema.field('category').type)
+        rows = events.to_pylist()
+        assert [r['date_start'] for r in rows] == [date(2025, 1, 10), date(2026, 7, 1), None]
+        assert rows[0]['discovered_at'] == datetime(2024, 11, 1, 8, 30, 0, 250000)
+        assert [r['category'] for r in rows] == ['OCR', 'Fitness', 'OCR']
+        assert rows[2]['city'] is None
+        assert pq.read_table(results['tables']['leads']['path']).to_pylist()[0]['value'] == 2490.5
+
+    def test_arrow_batches_share_dictionary(self, pa, db, tmp_path):
+        import pyarrow.ipc as ipc
+        results = export_snapshot(db.conn, str(tmp_path / "out"), fmt="arrow", tables=["events"], batch_rows=1)
+
+        reader = ipc.open_file(results['tables']['events']['path'])
+        assert reader.num_record_batches == 3
+        assert reader.read_all().column('source').to_pylist() == ['Runmageddon.pl', 'HYROX.com', 'GoOut.net']
+
+    def test_include_archived(self, pa, db, tmp_path):
+        import pyarrow.parquet as pq
+        archive_events(db.conn, before=date(2026, 1, 1))
+        hot = export_snapshot(db.conn, str(tmp_path / "hot"), tables=["events"])
+        full = export_snapshot(db.conn, str(tmp_path / "full"), tables=["events"], include_archived=True)
+
+        assert hot['tables']['events']['rows'] == 2
+        assert pq.read_table(full['tables']['events']['path']).column('id').to_pylist() == [1, 2, 3]
+
+    def test_invalid_arguments(self, pa, db, tmp_path):
+        with pytest.raises(ValueError):
+            export_snapshot(db.conn, str(tmp_path), fmt="csv")
+        with pytest.raises(ValueError):
+            export_snapshot(db.conn, str(tmp_path), tables=["users"])
+
+    def test_leaves_connection_idle(self, pa, db, tmp_path):
+        export_snapshot(db.conn, str(tmp_path / "out"))
+        assert not db.conn.in_transaction
+
+    def test_requires_pyarrow(self, db, tmp_path, monkeypatch):
+        monkeypatch.setattr(snapshot, 'PYARROW_AVAILABLE', False)
+        with pytest.raises(RuntimeError):
+            export_snapshot(db.conn, str(tmp_path))
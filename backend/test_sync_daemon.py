@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy demona synchronizacji
+"""
+
+import pytest
+import asyncio
+import random
+import sqlite3
+from types import SimpleNamespace
+
+import sync_daemon
+from sync_daemon import SyncScheduler, parse_intervals, list_schedule
+from sync_history import SourceRun
+
+
+# ============= FIXTURES =============
+
+class FakeClock:
+    def __init__(self, now: float = 1_800_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeAggregator:
+    """Agregator bez sieci: sync_source czeka na zdarzenie release"""
+
+    def __init__(self, names):
+        self.db = SimpleNamespace(conn=sqlite3.connect(":memory:"))
+        self.db.conn.executescript(sync_daemon.SCHEMA)
+        self.scrapers = [SimpleNamespace(name=name) for name in names]
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def sync_source(self, scraper, run_id):
+        self.calls.append(scraper.name)
+        await self.release.wait()
+        return SourceRun(run_id=run_id, source=scraper.name, started_at="", found=1, new=1)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def aggregator():
+    agg = FakeAggregator(['HYROX.com', 'Runmageddon.pl', 'MTP.pl'])
+    yield agg
+    agg.db.conn.close()
+
+
+def make_scheduler(aggregator, clock, **kwargs):
+    return SyncScheduler(aggregator, rng=random.Random(1), clock=clock, **kwargs)
+
+
+# ============= TESTY =============
+
+class TestParseIntervals:
+    """Testy parsowania --intervals"""
+
+    def test_parse(self):
+        assert parse_intervals("HYROX.com=900, MTP.pl=7200") == {'HYROX.com': 900.0, 'MTP.pl': 7200.0}
+        assert parse_intervals("") == {}
+
+    @pytest.mark.parametrize("text", ["HYROX.com", "=60", "MTP.pl=0"])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_intervals(text)
+
+
+class TestSyncScheduler:
+    """Testy kolejki priorytetowej"""
+
+    def test_high_yield_sources_shorter(self, aggregator, clock):
+        scheduler = make_scheduler(aggregator, clock)
+        assert scheduler.interval('HYROX.com') < scheduler.interval('MTP.pl')
+        assert scheduler.interval('Nieznane') == sync_daemon.DEFAULT_INTERVAL
+
+    def test_jitter_bounds(self, aggregator, clock):
+        scheduler = make_scheduler(aggregator, clock, jitter=0.2)
+        offsets = [scheduler.next_run('HYROX.com', 0) for _ in range(200)]
+        assert all(1440 <= o <= 2160 for o in offsets)
+        assert len(set(offsets)) > 1
+
+    def test_first_load_staggered(self, aggregator, clock):
+        scheduler = make_scheduler(aggregator, clock, startup_spread=60)
+        scheduler.load()
+
+        dues = sorted(due for due, _ in scheduler.heap)
+        assert all(clock.now <= due <= clock.now + 60 for due in dues)
+        assert len(set(dues)) == 3
+        assert len(list_schedule(aggregator.db.conn)) == 3
+
+    def test_restart_keeps_future_times(self, aggregator, clock):
+        conn = aggregator.db.conn
+        conn.execute("INSERT INTO sync_schedule (source, next_run_at) VALUES (?, ?)",
+                     ('MTP.pl', sync_daemon._iso(clock.now + 3600)))
+        conn.execute("INSERT INTO sync_schedule (source, next_run_at) VALUES (?, ?)",
+                     ('HYROX.com', sync_daemon._iso(clock.now - 86400)))
+
+        scheduler = make_scheduler(aggregator, clock, startup_spread=60)
+        scheduler.load()
+
+        dues = {source: due for due, source in scheduler.heap}
+        assert dues['MTP.pl'] == clock.now + 3600
+        assert clock.now <= dues['HYROX.com'] <= clock.now + 60
+
+    async def test_dispatch_and_skip_overlap(self, aggregator, clock):
+        scheduler = make_scheduler(aggregator, clock, startup_spread=0)
+        scheduler.load()
+
+        started = scheduler.dispatch_due()
+        await asyncio.sleep(0)
+        assert sorted(started) == ['HYROX.com', 'MTP.pl', 'Runmageddon.pl']
+
+        clock.now += 2 * 3600
+        assert scheduler.dispatch_due() == []
+        schedule = {row['source']: row for row in list_schedule(aggregator.db.conn)}
+        assert schedule['HYROX.com']['skipped'] == 1
+        assert schedule['MTP.pl']['skipped'] == 0
+
+        aggregator.release.set()
+        await asyncio.gather(*scheduler.running.values())
+        assert scheduler.running == {}
+        assert schedule['HYROX.com']['last_started_at'] is not None
+        assert list_schedule(aggregator.db.conn)[0]['last_status'] == 'ok'
+
+    async def test_run_until_stopped(self, aggregator):
+        aggregator.release.set()
+        scheduler = SyncScheduler(aggregator, startup_spread=0)
+        stop = asyncio.Event()
+
+        task = asyncio.create_task(scheduler.run(stop))
+        await asyncio.sleep(0.05)
+        stop.set()
+        await asyncio.wait_for(task, timeout=1)
+
+        assert sorted(aggregator.calls) == ['HYROX.com', 'MTP.pl', 'Runmageddon.pl']
+        assert scheduler.running == {}
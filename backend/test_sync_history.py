@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy historii synchronizacji
+"""
+
+import pytest
+import sqlite3
+
+from sync_history import SCHEMA, SourceRun, record_run, list_runs, summarize_runs
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def conn():
+    """Baza w pamięci ze schematem sync_runs"""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+
+# ============= TESTY =============
+
+class TestSyncHistory:
+    """Testy zapisu i odczytu przebiegów"""
+
+    def test_record_and_list(self, conn):
+        record_run(conn, SourceRun('a', 'HYROX.com', '2026-01-01T10:00:00', found=3, new=3))
+        record_run(conn, SourceRun('b', 'HYROX.com', '2026-01-02T10:00:00', found=3, unchanged=3))
+
+        runs = list_runs(conn)
+
+        assert [r['run_id'] for r in runs] == ['b', 'a']
+        assert runs[0]['unchanged'] == 3
+        assert runs[1]['new'] == 3
+
+    def test_filters_and_limit(self, conn):
+        for day in range(1, 6):
+            record_run(conn, SourceRun(str(day), 'MTP.pl', f'2026-01-0{day}T10:00:00'))
+        record_run(conn, SourceRun('x', 'GoOut.net', '2026-01-05T10:00:00'))
+
+        assert len(list_runs(conn, source='MTP.pl')) == 5
+        assert len(list_runs(conn, since='2026-01-04')) == 3
+        assert len(list_runs(conn, limit=2)) == 2
+
+    def test_summary_per_source(self, conn):
+        record_run(conn, SourceRun('a', 'MTP.pl', '2026-01-01', total_seconds=1.0, http_seconds=0.8,
+                                   bytes_downloaded=100))
+        record_run(conn, SourceRun('b', 'MTP.pl', '2026-01-02', total_seconds=3.0, http_seconds=2.0,
+                                   bytes_downloaded=300, status='error', error='timeout'))
+        record_run(conn, SourceRun('b', 'HYROX.com', '2026-01-02', total_seconds=0.5))
+
+        summary = summarize_runs(conn)
+
+        assert [s['source'] for s in summary] == ['MTP.pl', 'HYROX.com']
+        mtp = summary[0]
+        assert mtp['runs'] == 2
+        assert mtp['errors'] == 1
+        assert mtp['avg_total_seconds'] == 2.0
+        assert mtp['max_total_seconds'] == 3.0
+        assert mtp['bytes_downloaded'] == 400
+        assert mtp['last_run_at'] == '2026-01-02'
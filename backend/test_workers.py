@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+StreamFlow MVP - Testy trybu wielu workerów
+"""
+
+import pytest
+import sqlite3
+import threading
+
+import changefeed
+from metrics import TimedConnection
+from workers import VersionedCache, WriterLock, coordinated, enable_wal
+
+
+# ============= FIXTURES =============
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "app.db")
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+        CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, event_id INTEGER);
+        CREATE TABLE offers (id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER);
+    ''')
+    conn.executescript(changefeed.SCHEMA)
+    conn.close()
+    return path
+
+
+def blocked(lock: WriterLock) -> bool:
+    """Czy acquire() czeka (w osobnym wątku, jak drugi proces)"""
+    acquired = threading.Event()
+
+    def worker():
+        lock.acquire()
+        acquired.set()
+        lock.release()
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return not acquired.wait(0.2)
+
+
+# ============= TESTY =============
+
+class TestWriterLock:
+    """Testy kolejki zapisujących"""
+
+    def test_exclusive_between_handles(self, tmp_path):
+        first = WriterLock(str(tmp_path / "app.db.writer.lock"))
+        second = WriterLock(str(tmp_path / "app.db.writer.lock"))
+        first.acquire()
+
+        assert blocked(second)
+        first.release()
+        assert not blocked(WriterLock(second.path))
+        first.close()
+
+    def test_connection_holds_lock_from_write_to_commit(self, db_path):
+        conn = sqlite3.connect(db_path, factory=coordinated(TimedConnection))
+        other = WriterLock(conn.writer_lock.path)
+
+        conn.execute("SELECT COUNT(*) FROM events").fetchone()
+        assert not conn.writer_lock.held
+        conn.execute("INSERT INTO events (name) VALUES ('a')")
+        conn.execute("UPDATE events SET name = 'b'")
+        assert conn.writer_lock.held and blocked(other)
+        conn.commit()
+        assert not conn.writer_lock.held
+
+        conn.execute("DELETE FROM events")
+        conn.rollback()
+        assert not conn.writer_lock.held
+        conn.execute("  insert into events (name) values ('c')")
+        conn.close()
+        assert not blocked(other)
+
+    def test_connection_settings(self, db_path):
+        assert enable_wal(db_path) == "wal"
+        conn = sqlite3.connect(db_path, factory=coordinated(TimedConnection))
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert type(conn).__name__ == "CoordinatedTimedConnection"
+        conn.close()
+
+
+class TestVersionedCache:
+    """Testy cache unieważnianego wersją dziennika zmian"""
+
+    def test_hit_until_tracked_write(self, db_path):
+        conn = sqlite3.connect(db_path)
+        writer = sqlite3.connect(db_path)
+        cache = VersionedCache("test")
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+        assert cache.get(conn, "count", compute) == 0
+        assert cache.get(conn, "count", compute) == 0
+        writer.execute("INSERT INTO events (name) VALUES ('z innego procesu')")
+        writer.commit()
+
+        assert cache.get(conn, "count", compute) == 1
+        assert len(calls) == 2
+
+    def test_untracked_write_keeps_entry(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cache = VersionedCache("test")
+        cache.get(conn, "key", lambda: "stare")
+        conn.execute("CREATE TABLE notes (body TEXT)")
+        conn.execute("INSERT INTO notes VALUES ('bez wpływu na events/leads/offers')")
+        conn.commit()
+
+        assert cache.get(conn, "key", lambda: "nowe") == "stare"
+
+    def test_lru_limit(self, db_path):
+        conn = sqlite3.connect(db_path)
+        cache = VersionedCache("test", max_entries=2)
+        cache.get(conn, "a", lambda: 1)
+        cache.get(conn, "b", lambda: 2)
+        cache.get(conn, "a", lambda: 1)
+        cache.get(conn, "c", lambda: 3)
+
+        assert cache.get(conn, "a", lambda: "przeliczone") == 1
+        assert cache.get(conn, "b", lambda: "przeliczone") == "przeliczone"
@@ -7,10 +7,14 @@ Narzędzia do walidacji, formatowania i integracji
 import re
 import hashlib
 import json
+import secrets
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
+
+from pricing import PACKAGES, SERVICES, quote
 
 
 # ============= STAŁE =============
@@ -33,25 +37,10 @@ class LeadStatus(str, Enum):
     LOST = "lost"
 
 
-PACKAGE_PRICES = {
-    "basic": 990,
-    "standard": 2490,
-    "premium": 4990,
-    "enterprise": 0
-}
-
-ADDITIONAL_SERVICES_PRICES = {
-    "drone": 800,
-    "commentator": 600,
-    "graphics_custom": 400,
-    "highlights": 500,
-    "multistream": 300,
-    "vod": 200,
-    "led_screen": 1500,
-    "sound_system": 800,
-    "photographer": 700,
-    "transcript": 350
-}
+# Widoki tylko do odczytu na cennik z pricing.py (jedno źródło cen)
+PACKAGE_PRICES = MappingProxyType({code: p.price for code, p in PACKAGES.items()})
+
+ADDITIONAL_SERVICES_PRICES = MappingProxyType({code: s.price for code, s in SERVICES.items()})
 
 HIGH_VALUE_CATEGORIES = ["OCR", "CrossFit", "Fitness", "E-sport", "MMA", "Siatkówka"]
 
@@ -167,26 +156,7 @@ def calculate_offer_price(
     discount_percent: float = 0
 ) -> Dict[str, float]:
     """Oblicza cenę oferty"""
-    if additional_services is None:
-        additional_services = []
-    
-    base_price = PACKAGE_PRICES.get(package, 0)
-    additional_total = sum(ADDITIONAL_SERVICES_PRICES.get(s, 0) for s in additional_services)
-    subtotal = base_price + additional_total
-    discount_amount = subtotal * (discount_percent / 100)
-    net_total = subtotal - discount_amount
-    vat_amount = net_total * 0.23
-    gross_total = net_total + vat_amount
-    
-    return {
-        "base_price": base_price,
-        "additional_total": additional_total,
-        "subtotal": subtotal,
-        "discount": discount_amount,
-        "net": net_total,
-        "vat": vat_amount,
-        "gross": round(gross_total, 2)
-    }
+    return quote(package, additional_services or [], discount_percent).to_dict()
 
 
 def calculate_valid_until(days: int = 14) -> str:
@@ -197,16 +167,16 @@ def calculate_valid_until(days: int = 14) -> str:
 # ============= GENEROWANIE ID =============
 
 def generate_offer_number() -> str:
-    """Generuje numer oferty"""
+    """Generuje numer oferty (losowy; unikalne numery: sequencer.NumberSequencer)"""
     now = datetime.now()
-    random_part = hashlib.md5(str(now.timestamp()).encode()).hexdigest()[:4].upper()
+    random_part = secrets.token_hex(2).upper()
     return f"OF/{now.year}/{now.month:02d}/{random_part}"
 
 
 def generate_contract_number(prefix: str = "STREAM") -> str:
-    """Generuje numer umowy"""
+    """Generuje numer umowy (losowy; unikalne numery: sequencer.NumberSequencer)"""
     now = datetime.now()
-    random_part = hashlib.md5(str(now.timestamp()).encode()).hexdigest()[:6].upper()
+    random_part = secrets.token_hex(3).upper()
     return f"{prefix}/{now.year}/{random_part}"
 
 